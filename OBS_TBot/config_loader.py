@@ -1,70 +1,126 @@
 # config_loader.py
+import os
 import json
+import time
 import logging
+import threading
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Tuple
 
 logger = logging.getLogger(__name__)
 
 
+def freeze(obj: Any) -> Any:
+    """Превращает разобранный JSON в неизменяемый снимок (dict → mappingproxy, list → tuple)."""
+    if isinstance(obj, dict):
+        return MappingProxyType({key: freeze(value) for key, value in obj.items()})
+    if isinstance(obj, list):
+        return tuple(freeze(value) for value in obj)
+    return obj
+
+
+def thaw(obj: Any) -> Any:
+    """Обратное к freeze: изменяемая копия снимка, пригодная для json.dump."""
+    if isinstance(obj, (dict, MappingProxyType)):
+        return {key: thaw(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [thaw(value) for value in obj]
+    return obj
+
+
 class ConfigLoader:
-    """Класс для загрузки конфигураций из JSON файлов."""
+    """
+    Класс для загрузки конфигураций из JSON файлов.
+
+    Каждый файл разбирается один раз и хранится в общем для всех экземпляров
+    кэше как неизменяемый снимок. Файл перечитывается, только если изменились
+    его mtime или размер (проверка не чаще раза в CHECK_INTERVAL секунд), и
+    новый снимок подменяет старый целиком. save_commands_config пишет файл
+    атомарно и сразу обновляет кэш.
+    """
 
     COMMANDS_CONFIG_PATH = "./data/commands_config.json"
     BUTTONS_CONFIG_PATH = "./data/buttons_config.json"
+    CHECK_INTERVAL = 1.0
+
+    # path -> (подпись файла, время проверки, снимок)
+    _cache: Dict[str, Tuple[Tuple[int, int], float, Any]] = {}
+    # path -> номер версии снимка; растёт при каждой подмене
+    _generations: Dict[str, int] = {}
+    _lock = threading.Lock()
 
     def __init__(self):
         pass  # No need to pass paths anymore
 
-    def load_commands_config(self) -> dict:
-        """Загружает конфигурацию команд из JSON файла."""
-        try:
-            with open(self.COMMANDS_CONFIG_PATH, "r", encoding="utf-8") as f:
-                data = json.load(f)
-
-            return data  # Assumes commands are under "commands" key
-        except FileNotFoundError:
-            logger.error(f"Файл конфигурации не найден: {self.COMMANDS_CONFIG_PATH}")
-            return {}
-        except json.JSONDecodeError:
-            logger.error(
-                f"Ошибка декодирования JSON в файле: {self.COMMANDS_CONFIG_PATH}"
-            )
-            return {}
-        except KeyError:
-            logger.error(
-                f"Корневой ключ 'commands' не найден в файле: {self.COMMANDS_CONFIG_PATH}"
-            )
-            return {}
+    @staticmethod
+    def _signature(path: str) -> Tuple[int, int]:
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def _swap(self, path: str, signature: Tuple[int, int], snapshot: Any):
+        self._cache[path] = (signature, time.monotonic(), snapshot)
+        self._generations[path] = self._generations.get(path, 0) + 1
+
+    def _load_cached(self, path: str, extract: Callable[[Any], Any]) -> Any:
+        with self._lock:
+            cached = self._cache.get(path)
+            now = time.monotonic()
+            if cached is not None and now - cached[1] < self.CHECK_INTERVAL:
+                return cached[2]
+
+            try:
+                signature = self._signature(path)
+                if cached is not None and cached[0] == signature:
+                    self._cache[path] = (signature, now, cached[2])
+                    return cached[2]
+
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                snapshot = freeze(extract(data))
+            except FileNotFoundError:
+                logger.error(f"Файл конфигурации не найден: {path}")
+                return cached[2] if cached is not None else MappingProxyType({})
+            except json.JSONDecodeError:
+                # Файл могли сохранить наполовину — оставляем прежний снимок
+                logger.error(f"Ошибка декодирования JSON в файле: {path}")
+                return cached[2] if cached is not None else MappingProxyType({})
+            except KeyError as e:
+                logger.error(f"Корневой ключ {e} не найден в файле: {path}")
+                return cached[2] if cached is not None else MappingProxyType({})
+
+            self._swap(path, signature, snapshot)
+            if cached is not None:
+                logger.info(f"Конфигурация перечитана: {path}")
+            return snapshot
+
+    def generation(self, path: str) -> int:
+        """Номер версии снимка файла — удобно для инвалидации производных кэшей."""
+        return self._generations.get(path, 0)
+
+    def load_commands_config(self) -> MappingProxyType:
+        """Загружает конфигурацию команд из JSON файла (неизменяемый снимок)."""
+        return self._load_cached(self.COMMANDS_CONFIG_PATH, lambda data: data)
 
     def save_commands_config(self, commands_data):
-        """Сохраняет конфигурацию команд в JSON файл."""
+        """Сохраняет конфигурацию команд в JSON файл и обновляет кэш."""
+        path = self.COMMANDS_CONFIG_PATH
+        tmp_path = f"{path}.tmp"
         try:
-            with open(self.COMMANDS_CONFIG_PATH, "w", encoding="utf-8") as f:
-                json.dump(
-                    commands_data, f, indent=2, ensure_ascii=False
-                )  # Добавлен indent для читабельности
-            print(
-                f"Конфигурация команд успешно сохранена в '{self.COMMANDS_CONFIG_PATH}'."
-            )
+            data = thaw(commands_data)
+            with self._lock:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(
+                        data, f, indent=2, ensure_ascii=False
+                    )  # Добавлен indent для читабельности
+                os.replace(tmp_path, path)
+                self._swap(path, self._signature(path), freeze(data))
+            print(f"Конфигурация команд успешно сохранена в '{path}'.")
         except Exception as e:
             print(f"Ошибка при сохранении конфигурации команд: {e}")
 
-    def load_buttons_config(self) -> dict:
-        """Загружает конфигурацию кнопок из JSON файла."""
-        try:
-            with open(self.BUTTONS_CONFIG_PATH, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            return data["buttons"]  # Added ["buttons"]
-
-        except FileNotFoundError:
-            logger.error(f"Файл конфигурации не найден: {self.BUTTONS_CONFIG_PATH}")
-            return {}
-        except json.JSONDecodeError:
-            logger.error(
-                f"Ошибка декодирования JSON в файле: {self.BUTTONS_CONFIG_PATH}"
-            )
-            return {}
-        except KeyError:
-            logger.error(
-                f"Корневой ключ 'buttons' не найден в файле: {self.BUTTONS_CONFIG_PATH}"
-            )
-            return {}
+    def load_buttons_config(self) -> tuple:
+        """Загружает конфигурацию кнопок из JSON файла (неизменяемый снимок)."""
+        buttons = self._load_cached(
+            self.BUTTONS_CONFIG_PATH, lambda data: data["buttons"]
+        )
+        return buttons if isinstance(buttons, tuple) else ()
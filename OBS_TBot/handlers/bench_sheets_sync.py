@@ -0,0 +1,172 @@
+"""
+Проверка дельта-синхронизации с Google Sheets на листе в памяти.
+
+После каждого flush содержимое листа сравнивается с полной перезаписью:
+заголовок и по строке на каждую запись в порядке появления, с последними
+значениями. Отдельно проверяется лист со старым заголовком без колонки
+event_id и продолжение работы после перезапуска с кэшем строк на диске.
+
+Запуск из каталога бота: python -m handlers.bench_sheets_sync
+"""
+
+import os
+import random
+import logging
+import tempfile
+from typing import Dict, List
+
+from gspread.utils import a1_to_rowcol
+
+from .google_sheets import FIELDS_ORDER
+from .sheets_sync import SheetsSync, record_key
+
+OLD_FIELDS = ["user_id", "registered_at", "available"]
+EVENTS = [None, "python-101", "sql-basics"]
+
+
+def cell(value) -> str:
+    """Значение ячейки так, как его вернёт get_all_values."""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    return "" if value is None else str(value)
+
+
+class FakeWorksheet:
+    """Лист Google Sheets в памяти с методами, которые вызывает SheetsSync."""
+
+    spreadsheet_id = "fake-spreadsheet"
+    id = 0
+
+    def __init__(self, values: List[list] = (), row_count: int = 10):
+        self.grid = [[cell(v) for v in row] for row in values]
+        self.row_count = max(row_count, len(self.grid))
+        self.reads = 0
+        self.batches = 0
+        self.cells_written = 0
+
+    def _write(self, row: int, col: int, values: List[list]):
+        for r, row_values in enumerate(values, start=row - 1):
+            if r >= self.row_count:
+                raise IndexError(f"Строка {r + 1} за границей листа ({self.row_count})")
+            while len(self.grid) <= r:
+                self.grid.append([])
+            line = self.grid[r]
+            for c, value in enumerate(row_values, start=col - 1):
+                while len(line) <= c:
+                    line.append("")
+                line[c] = cell(value)
+                self.cells_written += 1
+
+    def get_all_values(self) -> List[list]:
+        self.reads += 1
+        width = max((len(row) for row in self.grid), default=0)
+        return [row + [""] * (width - len(row)) for row in self.grid]
+
+    def update(self, values: List[list], range_name: str = "A1"):
+        self._write(*a1_to_rowcol(range_name.split(":")[0]), values)
+
+    def batch_update(self, data: List[dict]):
+        self.batches += 1
+        for item in data:
+            self._write(*a1_to_rowcol(item["range"].split(":")[0]), item["values"])
+
+    def add_rows(self, rows: int):
+        self.row_count += rows
+
+
+class FullRewrite:
+    """Эталон: все записи листа, переписанные целиком при каждой отправке."""
+
+    def __init__(self, fields: List[str], values: List[list] = ()):
+        self.fields = fields
+        self.rows: Dict[str, list] = {}
+        if values:
+            header = values[0]
+            for row in values[1:]:
+                record = dict(zip(header, row))
+                self.rows[record_key(record)] = [record.get(f, "") for f in fields]
+
+    def send(self, records: List[dict]):
+        for record in records:
+            self.rows[record_key(record)] = [record.get(f, "") for f in self.fields]
+
+    def grid(self) -> List[list]:
+        return [self.fields] + list(self.rows.values())
+
+
+def normalized(grid: List[list], width: int) -> List[list]:
+    """Строки листа одной ширины, без пустых строк в конце."""
+    rows = [[cell(v) for v in row][:width] for row in grid]
+    rows = [row + [""] * (width - len(row)) for row in rows]
+    while rows and not any(rows[-1]):
+        rows.pop()
+    return rows
+
+
+def random_records(rng: random.Random, users: int, count: int) -> List[dict]:
+    records = []
+    for _ in range(count):
+        record = {
+            "user_id": rng.randrange(users),
+            "registered_at": f"2025-08-{rng.randint(1, 28):02d} 11:16:03",
+            "available": rng.random() < 0.7,
+        }
+        event_id = rng.choice(EVENTS)
+        if event_id:
+            record["event_id"] = event_id
+        records.append(record)
+    return records
+
+
+def run(name: str, initial: List[list], rounds: int = 40, seed: int = 1):
+    rng = random.Random(seed)
+    worksheet = FakeWorksheet(initial, row_count=5)
+    expected = FullRewrite(FIELDS_ORDER, initial)
+    width = len(FIELDS_ORDER)
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache_path = os.path.join(directory, "sheets_rows.json")
+        sync = SheetsSync(FIELDS_ORDER, cache_path)
+        full_cells = 0
+        for i in range(rounds):
+            records = random_records(rng, users=30, count=rng.randint(1, 8))
+            if i % 10 == 9:
+                # Повторная отправка без изменений не должна писать в лист
+                records = records + records
+            if i == rounds // 2:
+                # Перезапуск бота: кэш строк читается с диска, лист — нет
+                sync = SheetsSync(FIELDS_ORDER, cache_path)
+            sync.mark(records)
+            sync.flush(worksheet)
+            expected.send(records)
+            full_cells += len(expected.grid()) * width
+            assert normalized(worksheet.grid, width) == normalized(
+                expected.grid(), width
+            ), f"{name}: лист расходится с полной перезаписью после отправки {i + 1}"
+
+        # Всё уже отправлено: повтор тех же записей ничего не пишет
+        before = worksheet.batches
+        sync.mark(records)
+        assert sync.flush(worksheet) == 0 and worksheet.batches == before
+
+    print(
+        f"{name}: {len(expected.rows)} строк, {rounds} отправок, "
+        f"чтений листа {worksheet.reads}, batch_update {worksheet.batches}, "
+        f"записано ячеек {worksheet.cells_written} "
+        f"(полная перезапись — {full_cells}); совпадает с полной перезаписью"
+    )
+    assert worksheet.reads == 1, worksheet.reads
+
+
+def main():
+    logging.getLogger("google_sheets").setLevel(logging.WARNING)
+    run("Пустой лист", [])
+    old_sheet = [OLD_FIELDS] + [
+        [uid, "2025-08-01 10:00:00", uid % 2 == 0] for uid in range(0, 30, 3)
+    ]
+    run("Старый заголовок без event_id", old_sheet, seed=2)
+    print("Все проверки пройдены.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+# handlers/callback_index.py
+import os
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from config_loader import ConfigLoader
+from keyboards import keyboard_cache
+
+logger = logging.getLogger(__name__)
+
+# Категория клавиатуры, которую echo показывает на любое неизвестное сообщение
+ECHO_CATEGORY = "registration"
+# Ширина ряда клавиатур, которые открываются кнопками вида "keyboard"
+CALLBACK_ROW_WIDTH = 2
+
+
+class ButtonAction:
+    """Разобранная кнопка: всё, что нужно для ответа на нажатие, подготовлено заранее."""
+
+    __slots__ = (
+        "callback",
+        "response_type",
+        "answer",
+        "script_path",
+        "output",
+        "categories",
+        "keyboard",
+        "ambiguous",
+        "cache_ttl",
+        "timeout",
+    )
+
+    def __init__(self, button, buttons, ambiguous: bool = False):
+        self.callback = button["callback"]
+        self.response_type = button.get("response_type")
+        self.answer = button.get("answer")
+        self.output = button.get("output", "text")
+        # Необязательные настройки скриптов: кэш результата и таймаут, сек
+        self.cache_ttl = float(button.get("cache_ttl", 0))
+        self.timeout = button.get("timeout")
+        self.ambiguous = ambiguous
+
+        self.script_path = None
+        if self.response_type == "script" and button.get("path"):
+            self.script_path = os.path.abspath(button["path"])
+            if not os.path.exists(self.script_path):
+                logger.warning(
+                    f"Скрипт кнопки '{self.callback}' не найден: {self.script_path}"
+                )
+
+        self.categories = None
+        # Сериализованная разметка из keyboard_cache
+        self.keyboard: Optional[str] = None
+        if self.response_type == "keyboard" and button.get("categories"):
+            self.categories = button["categories"]
+            self.keyboard = keyboard_cache.serialized(
+                buttons, self.categories, CALLBACK_ROW_WIDTH
+            )
+
+
+def _referenced_categories(buttons, commands) -> List:
+    """Наборы категорий, по которым бот вообще строит клавиатуры."""
+    refs = [ECHO_CATEGORY]
+    for command in commands.values():
+        if command.get("response_type") == "keyboard" and command.get("category"):
+            refs.append(command["category"])
+    for button in buttons:
+        if button.get("response_type") == "keyboard" and button.get("categories"):
+            refs.append(button["categories"])
+    return refs
+
+
+class CallbackIndex:
+    """
+    Таблица диспетчеризации callback-запросов: callback_data -> ButtonAction.
+
+    Строится один раз на версию конфигурации кнопок и команд (см.
+    ConfigLoader.generation) и перестраивается только после её изменения.
+    Повторяющиеся callback разбираются при построении: если в клавиатурах
+    бота встречается ровно одна из дублирующих кнопок, выбирается она
+    (с предупреждением в логе), иначе callback помечается неоднозначным.
+    """
+
+    def __init__(self, loader: Optional[ConfigLoader] = None):
+        self.loader = loader or ConfigLoader()
+        self._version: Optional[Tuple[int, int]] = None
+        self._actions: Dict[str, ButtonAction] = {}
+
+    def _current_version(self) -> Tuple[int, int]:
+        return (
+            self.loader.generation(self.loader.BUTTONS_CONFIG_PATH),
+            self.loader.generation(self.loader.COMMANDS_CONFIG_PATH),
+        )
+
+    def _build(self, buttons, commands):
+        grouped: Dict[str, list] = {}
+        for button in buttons:
+            if button.get("callback"):
+                grouped.setdefault(button["callback"], []).append(button)
+
+        refs = _referenced_categories(buttons, commands)
+        actions = {}
+        for callback, candidates in grouped.items():
+            if len(candidates) == 1:
+                actions[callback] = ButtonAction(candidates[0], buttons)
+                continue
+
+            reachable = [
+                b
+                for b in candidates
+                if b.get("category") is not None
+                and any(b["category"] in ref for ref in refs)
+            ]
+            categories = [b.get("category") for b in candidates]
+            if len(reachable) == 1:
+                logger.warning(
+                    f"Callback '{callback}' повторяется в категориях {categories}, "
+                    f"используется кнопка категории '{reachable[0].get('category')}'"
+                )
+                actions[callback] = ButtonAction(reachable[0], buttons)
+            else:
+                logger.error(
+                    f"Callback '{callback}' повторяется в категориях {categories}, "
+                    f"выбрать кнопку однозначно нельзя"
+                )
+                actions[callback] = ButtonAction(candidates[0], buttons, ambiguous=True)
+        self._actions = actions
+
+    def get(self, callback_data: str) -> Optional[ButtonAction]:
+        # Загрузка из кэша ConfigLoader дешёвая и заодно замечает изменения файлов
+        buttons = self.loader.load_buttons_config()
+        commands = self.loader.load_commands_config()
+        version = self._current_version()
+        if version != self._version:
+            self._build(buttons, commands)
+            self._version = version
+        return self._actions.get(callback_data)
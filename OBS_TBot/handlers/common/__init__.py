@@ -1,15 +1,27 @@
 # handlers/__init__.py
 from ..reminder import on_startup_reg
+from ..sheets_queue import sheets_writer
+from ..job_scheduler import job_scheduler
+from ..storage import repository
+from ..script_runner import script_runner
 from ..common_button import register_callback_handler
 from .common import register_common_handler
 from .startup import on_startup_common
 
 
 async def on_startup(dp):
+    sheets_writer.start()
     await on_startup_common(dp)
     await on_startup_reg(dp)
 
 
+async def on_shutdown(dp):
+    await job_scheduler.stop()
+    await sheets_writer.stop()
+    repository.close()
+    script_runner.shutdown()
+
+
 # Также можно объединить регистрацию обработчиков
 def register_all_handlers(dp):
     register_callback_handler(dp)
@@ -1,13 +1,14 @@
-import json
 from aiogram import types
-from ..file_reader import load_json
+from ..registration.users import load_users, save_users
+from ..events import DEFAULT_EVENT_ID, EVENT_ID_PATTERN, get_event
 
 from ..logger import get_logger
+from ..storage import repository
 from ..common.users import (
     is_admin,
     add_admin,
     remove_admin,
-    load_all_users,
+    find_by_username,
 )
 
 logger = get_logger("common", "common.log")
@@ -27,15 +28,13 @@ async def add_admin_by_nickname(message: types.Message):
         print(f"Никнейм после удаления @: {nickname}")
 
         # Ищем пользователя по никнейму в базе всех пользователей
-        users = load_all_users()
-        print(f"Загружено {len(users)} пользователей из базы.")
-        user_info = next((user for user in users if user["username"] == nickname), None)
+        user_info = await repository.run(find_by_username, nickname)
 
         if user_info:
             user_id = user_info["id"]
             print(f"Пользователь @{nickname} найден с ID: {user_id}")
             # Добавляем его как администратора
-            added = add_admin(user_id)
+            added = await repository.run(add_admin, user_id)
             if added:
                 print(f"Пользователь @{nickname} добавлен в админы.")
                 await message.answer(f"✅ Админ @{nickname} добавлен.")
@@ -77,16 +76,14 @@ async def remove_admin_by_nickname(message: types.Message):
         print(f"Никнейм после удаления @: {nickname}")
 
         # Ищем пользователя по никнейму в базе всех пользователей
-        users = load_all_users()
-        print(f"Загружено {len(users)} пользователей из базы.")
-        user_info = next((user for user in users if user["username"] == nickname), None)
+        user_info = await repository.run(find_by_username, nickname)
 
         if user_info:
             user_id = user_info["id"]
             print(f"Пользователь @{nickname} найден с ID: {user_id}")
 
             # Удаляем права администратора
-            removed = remove_admin(user_id)
+            removed = await repository.run(remove_admin, user_id)
             if removed:
                 await message.answer(f"✅ Администратор @{nickname} удален.")
             else:
@@ -112,19 +109,28 @@ async def remove_all_registrations(message: types.Message):
     if not await admin_only(message):
         return
     try:
+        # /remove_all_registrations [event_id] — по умолчанию основной вебинар
+        event_id = message.get_args().strip() or DEFAULT_EVENT_ID
+
+        # id становится именем файла регистраций: до обращения к хранилищу
+        # проверяем формат и что такое событие есть в каталоге
+        if not EVENT_ID_PATTERN.match(event_id) or (
+            event_id != DEFAULT_EVENT_ID and get_event(event_id) is None
+        ):
+            await message.reply(
+                f"❌ Вебинар {event_id} не найден. Список вебинаров: /events"
+            )
+            return
+
         # Загружаем текущих пользователей
-        users = load_json("data/users.json", [])
+        users = await repository.run(load_users, event_id)
 
         if not users:
             await message.reply("📭 Список пользователей уже пуст.")
             return
 
-        # Очищаем список пользователей
-        users.clear()
-
-        # Сохраняем изменения в файл
-        with open("data/users.json", "w", encoding="utf-8") as f:
-            json.dump(users, f, ensure_ascii=False, indent=2)
+        # Очищаем список пользователей и сохраняем снимок
+        await repository.run(save_users, event_id, [])
 
         # Подтверждаем успешное выполнение
         await message.reply(
@@ -139,7 +145,7 @@ async def remove_all_registrations(message: types.Message):
 # Обработчик для команд, доступных только админам
 async def admin_only(message: types.Message):
     user_id = message.from_user.id
-    if not is_admin(user_id):
+    if not await repository.run(is_admin, user_id):
         await message.answer("❌ Эта команда доступна только администраторам.")
         return False
     return True
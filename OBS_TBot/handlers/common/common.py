@@ -20,7 +20,12 @@ from .webinar_handlers import (
     update_webinar_link,
     update_webinar_datetime,
     stop_reminders_command,
+    list_events,
+    add_event_command,
+    remove_event_command,
 )
+from .patent_handlers import search_patents
+from .currency_handlers import currency_history_command
 from ..common_file import (  # Import the functions from file_utils.py
     send_file_section,
     send_sections_list,
@@ -158,8 +163,8 @@ async def create_new_command(message: types.Message):
                 value = value.strip()
                 command_params[key] = value
 
-        # Load existing commands
-        commands = config_loader.load_commands_config()
+        # Load existing commands (copy: the cached snapshot is read-only)
+        commands = dict(config_loader.load_commands_config())
 
         # Add the new command
         commands[command_name] = command_params
@@ -214,6 +219,11 @@ def register_common_handler(dp: Dispatcher):
     )
     dp.register_message_handler(update_webinar_link, commands=["update_webinar_link"])
     dp.register_message_handler(stop_reminders_command, commands=["stop_reminders"])
+    dp.register_message_handler(list_events, commands=["events"])
+    dp.register_message_handler(add_event_command, commands=["add_event"])
+    dp.register_message_handler(remove_event_command, commands=["remove_event"])
+    dp.register_message_handler(search_patents, commands=["patents"])
+    dp.register_message_handler(currency_history_command, commands=["currency"])
     # ////////////////////////////////////////
 
     dp.register_message_handler(create_new_command, commands=["create_command"])
@@ -0,0 +1,51 @@
+# handlers/currency_handlers.py
+import os
+import sys
+import asyncio
+import threading
+
+from aiogram import types
+
+from ..logger import get_logger
+
+logger = get_logger("common", "common.log")
+
+# Каталог со скриптами (currency_history.py и currency_course.py), как
+# PATENTS_DB в patent_search — относительно каталога бота
+SCRIPTS_DIR = os.getenv("SCRIPTS_DIR") or os.path.join("..", "Scripts")
+
+# Хранилище истории общее: дозагрузку из нескольких запросов сразу не пускаем
+_report_lock = threading.Lock()
+
+
+def _currency_report(query: str) -> str:
+    """Отчёт currency_history.report; модуль импортируется при первом запросе."""
+    scripts = os.path.abspath(SCRIPTS_DIR)
+    if scripts not in sys.path:
+        sys.path.insert(0, scripts)
+    import currency_history
+
+    with _report_lock:
+        return currency_history.report(query)
+
+
+async def currency_history_command(message: types.Message):
+    """
+    Обработчик команды /currency [запрос]: история курсов ЦБ.
+    Запрос — "USD", "EUR/USD" или "CNY 90" (окно в днях); без запроса —
+    сводка по всем валютам.
+    """
+    query = message.get_args().strip()
+    try:
+        # Загрузка истории и чтение хранилища не должны блокировать цикл событий
+        text = await asyncio.to_thread(_currency_report, query)
+    except ImportError as e:
+        logger.error(f"Скрипт истории курсов недоступен: {e}")
+        await message.reply("❌ История курсов недоступна.")
+        return
+    except Exception as e:
+        logger.exception(f"Ошибка запроса истории курсов '{query}': {e}")
+        await message.reply("❌ Ошибка при получении курсов, попробуйте позже.")
+        return
+
+    await message.reply(text)
@@ -0,0 +1,37 @@
+# handlers/patent_handlers.py
+import asyncio
+import sqlite3
+
+from aiogram import types
+
+from ..logger import get_logger
+from ..patent_search import patent_index
+
+logger = get_logger("common", "common.log")
+
+
+async def search_patents(message: types.Message):
+    """Обработчик команды /patents <запрос>: поиск по аннотациям патентов."""
+    query = message.get_args().strip()
+    if not query:
+        await message.reply("❌ Укажите запрос. Пример: `/patents способ очистки воды`")
+        return
+
+    try:
+        hits = await asyncio.to_thread(patent_index.search, query)
+    except FileNotFoundError as e:
+        await message.reply(f"❌ {e}")
+        return
+    except sqlite3.Error as e:
+        logger.exception(f"Ошибка поиска патентов: {e}")
+        await message.reply("❌ Ошибка поиска, попробуйте позже.")
+        return
+
+    if not hits:
+        await message.reply("🔍 Ничего не найдено.")
+        return
+
+    lines = [f"🔍 Патенты по запросу «{query}»:"]
+    for hit in hits:
+        lines.append(f"\n• {hit.number} — {hit.url}\n{hit.snippet}")
+    await message.reply("\n".join(lines), disable_web_page_preview=True)
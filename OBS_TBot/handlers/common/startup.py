@@ -4,6 +4,7 @@ import asyncio
 from aiogram import types
 from aiogram.dispatcher import Dispatcher
 from .users import add_user
+from ..storage import repository
 from ..logger import get_logger
 
 logger = get_logger("startup", "startup.log")
@@ -58,7 +59,7 @@ async def cmd_start(message: types.Message):
     print(f"User: ID={user_id}, Username=@{username}")
 
     # Добавляем пользователя в файл all_users.json
-    added = add_user(user_id, username)
+    added = await repository.run(add_user, user_id, username)
     if added:
         print(f"✅ Привет! Твой ID сохранён: {user_id}")
     else:
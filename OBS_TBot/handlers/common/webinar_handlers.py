@@ -1,14 +1,16 @@
 # handlers/webinar_handlers.py
-import os
 from aiogram import types
 from datetime import datetime
 from aiogram.types import ParseMode
 
 from ..logger import get_logger
-from ..reminder import stop_reminders, start_reminders
+from ..settings import settings
+from ..reminder import stop_reminders, start_reminders, schedule_webinar_reminder
+from ..events import upcoming_events, add_event, remove_event, event_time
+from ..registration import EVENT_REG_PREFIX
+from keyboards.keyboard_builder import create_keyboard
 from .admin_handlers import admin_only
 
-
 logger = get_logger("common", "common.log")
 
 
@@ -28,23 +30,8 @@ async def update_webinar_link(message: types.Message):
             )
             return
 
-        # Заменяем значение переменной в файле .env
-        with open(".env", "r", encoding="utf-8") as file:
-            lines = file.readlines()
-
-        with open(".env", "w", encoding="utf-8") as file:
-            found = False
-            for line in lines:
-                if line.startswith("WEBINAR_LINK="):
-                    file.write(f'WEBINAR_LINK="{new_link}"\n')
-                    found = True
-                else:
-                    file.write(line)
-            if not found:
-                file.write(f'WEBINAR_LINK="{new_link}"\n')  # Добавляем, если не было
-
-        # Обновляем переменную окружения
-        os.environ["WEBINAR_LINK"] = new_link
+        # Атомарно записываем значение в .env и обновляем настройки
+        settings.update(WEBINAR_LINK=new_link)
 
         # Перезапускаем напоминание
         await stop_reminders()
@@ -86,24 +73,9 @@ async def update_webinar_datetime(message: types.Message):
             )
             return
 
-        # Заменяем значение переменной в файле .env
-        with open(".env", "r") as file:
-            lines = file.readlines()
-
-        # Открываем файл для записи
-        with open(".env", "w") as file:
-            for line in lines:
-                if line.startswith("WEBINAR_DATETIME="):
-                    # Заменяем старое значение на новое
-                    file.write(
-                        f"""WEBINAR_DATETIME="{new_webinar_datetime.strftime('%Y-%m-%d %H:%M:%S')}"\n"""
-                    )
-                else:
-                    file.write(line)
-
-        # Обновляем переменную окружения
-        os.environ["WEBINAR_DATETIME"] = new_webinar_datetime.strftime(
-            "%Y-%m-%d %H:%M:%S"
+        # Атомарно записываем значение в .env и обновляем настройки
+        settings.update(
+            WEBINAR_DATETIME=new_webinar_datetime.strftime("%Y-%m-%d %H:%M:%S")
         )
         # Перезапуск напоминания
         await stop_reminders()
@@ -124,3 +96,72 @@ async def stop_reminders_command(message: types.Message):
         return
     await stop_reminders()
     await message.reply("❌ Напоминание остановлено.")
+
+
+async def list_events(message: types.Message):
+    """Обработчик команды /events: ближайшие вебинары с кнопками записи."""
+    events = upcoming_events()
+    if not events:
+        await message.reply("📭 Ближайших вебинаров нет.")
+        return
+
+    lines = ["🗓 Ближайшие вебинары:"]
+    buttons = []
+    for event in events:
+        when = event_time(event).strftime("%d.%m.%Y %H:%M")
+        lines.append(f"• {event['title']} — {when}")
+        buttons.append(
+            (f"Записаться: {event['title']}", EVENT_REG_PREFIX + event["event_id"])
+        )
+
+    await message.reply("\n".join(lines), reply_markup=create_keyboard(buttons, 1))
+
+
+async def add_event_command(message: types.Message):
+    """
+    Обработчик команды /add_event для добавления (или изменения) вебинара.
+    Формат: /add_event <id> <YYYY-MM-DD> <HH:MM:SS> <ссылка> [название]
+    """
+    if not await admin_only(message):
+        return
+    try:
+        parts = message.get_args().split(maxsplit=4)
+        if len(parts) < 4:
+            await message.reply(
+                "❌ Формат: `/add_event <id> <YYYY-MM-DD> <HH:MM:SS> <ссылка> [название]`",
+                parse_mode=ParseMode.MARKDOWN,
+            )
+            return
+
+        event_id, date_part, time_part, link = parts[:4]
+        title = parts[4] if len(parts) > 4 else ""
+        try:
+            event = add_event(event_id, f"{date_part} {time_part}", link, title)
+        except ValueError as e:
+            await message.reply(f"❌ {e}")
+            return
+
+        await schedule_webinar_reminder(message.bot)
+        await message.reply(
+            f"✅ Вебинар '{event['title']}' ({event['event_id']}) запланирован на {event['datetime']}."
+        )
+
+    except Exception as e:
+        logger.exception(f"Ошибка в обработчике команды /add_event: {e}")
+        await message.reply(f"❌ Произошла ошибка при добавлении вебинара: {e}")
+
+
+async def remove_event_command(message: types.Message):
+    """Обработчик команды /remove_event <id>: удаляет вебинар и его напоминания."""
+    if not await admin_only(message):
+        return
+    event_id = message.get_args().strip()
+    if not event_id:
+        await message.reply("❌ Укажите id вебинара. Пример: /remove_event python_101")
+        return
+
+    if remove_event(event_id):
+        await schedule_webinar_reminder(message.bot)
+        await message.reply(f"✅ Вебинар {event_id} удалён, напоминания отменены.")
+    else:
+        await message.reply(f"❌ Вебинар {event_id} не найден.")
@@ -1,47 +1,47 @@
 # handlers/common_button.py
 import os
 import logging
-import importlib.util
-from typing import Union
+from typing import Optional, Union
 from aiogram import types
 from config_loader import ConfigLoader
 from aiogram.dispatcher import Dispatcher
-from .registration import process_simple_reg
-from keyboards import create_keyboard_from_file
+from .registration import (
+    process_simple_reg,
+    process_event_reg_callback,
+    EVENT_REG_PREFIX,
+)
+from keyboards import keyboard_cache
+from .callback_index import CallbackIndex
+from .script_runner import script_runner, ScriptTimeout
 
 logger = logging.getLogger(__name__)
 
 # --- Инициализация ConfigLoader ---
 config_loader = ConfigLoader()
+callback_index = CallbackIndex(config_loader)
 
 
 async def execute_script(
-    script_path: str, output_type: str = "text"
+    script_path: str,
+    output_type: str = "text",
+    status_message: Optional[types.Message] = None,
+    cache_ttl: float = 0,
+    timeout: Optional[float] = None,
 ) -> Union[str, types.InputFile]:
     """
-    Выполняет скрипт, импортируя его как модуль, и возвращает результат.
+    Выполняет скрипт в отдельном процессе (см. script_runner) и возвращает результат.
     """
     try:
-        module_name = os.path.splitext(os.path.basename(script_path))[
-            0
-        ]  # Get module name
-        spec = importlib.util.spec_from_file_location(
-            module_name, script_path
-        )  # Load the module
-
-        if spec is None:
-            logger.error(f"Could not load module from {script_path}")
-            return "Не удалось загрузить модуль."
-
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
-
-        # Call the main() function from the loaded module
         try:
-            result = module.main()
+            result = await script_runner.run(
+                script_path, output_type, status_message, cache_ttl, timeout
+            )
         except AttributeError:
             logger.error(f"No 'main' function found in script: {script_path}")
             return "В скрипте не найдена функция 'main'."
+        except ScriptTimeout as e:
+            logger.error(f"Script '{script_path}' timed out: {e}")
+            return f"Скрипт прерван: {e}."
 
         if output_type == "text":
             if isinstance(result, str):
@@ -87,7 +87,7 @@ async def send_keyboard(message: types.Message, description: str, category: str)
     """Отправляет клавиатуру с описанием."""
     try:
         buttons_config = config_loader.load_buttons_config()
-        keyboard = create_keyboard_from_file(
+        keyboard = keyboard_cache.serialized(
             buttons_config, category, 1
         )  # Assuming row_width=1
         if keyboard:
@@ -112,76 +112,96 @@ async def handle_callback(
         categories: Список категорий для фильтрации кнопок (если нужно создать клавиатуру на основе категорий).
         row_width: Ширина ряда кнопок (если нужно создать клавиатуру).
     """
-    callback_data = callback_query.data
-    buttons_config = config_loader.load_buttons_config()
-
-    for button in buttons_config:
-        if button["callback"] == callback_data:
-            await callback_query.answer()
+    action = callback_index.get(callback_query.data)
+    if action is None:
+        await callback_query.answer("Неизвестные callback данные.")
+        return
+    if action.ambiguous:
+        await callback_query.answer(
+            "Кнопка настроена неоднозначно, сообщите администратору."
+        )
+        return
+
+    await callback_query.answer()
 
-            try:
-
-                if button.get("response_type") == "keyboard":
-                    categories = button["categories"]
-                # If categories are provided, create a keyboard from categories
-                if categories:
-                    new_keyboard = create_keyboard_from_file(
-                        buttons_config, categories, row_width
-                    )
-                    await callback_query.message.answer(
-                        "Выберите опцию:", reply_markup=new_keyboard
-                    )
+    try:
+        # If categories are provided, create a keyboard from categories
+        if categories:
+            new_keyboard = keyboard_cache.serialized(
+                config_loader.load_buttons_config(), categories, row_width
+            )
+            await callback_query.message.answer(
+                "Выберите опцию:", reply_markup=new_keyboard
+            )
+
+        elif action.keyboard is not None:
+            await callback_query.message.answer(
+                "Выберите опцию:", reply_markup=action.keyboard
+            )
+
+        elif action.response_type == "reg":
+            # await cmd_reg(callback_query.message)
+            await process_simple_reg(callback_query)
+
+        elif action.response_type == "script":
+            output_type = action.output
+            status_message = await callback_query.message.answer("⏳ Скрипт запущен…")
+            script_result = await execute_script(
+                action.script_path,
+                output_type,
+                status_message,
+                cache_ttl=action.cache_ttl,
+                timeout=action.timeout,
+            )
+            await status_message.delete()
+
+            if isinstance(script_result, str) and output_type == "text":
+                await callback_query.message.answer(script_result)  # Send text
+            elif isinstance(script_result, str) and output_type == "file":
+                # await callback_query.message.answer_document(
+                #     document=script_result
+                # )  # Send document
+                logging.info(script_result)
+                if not os.path.exists(script_result):
+                    # execute_script вернул текст ошибки, а не путь к файлу
+                    await callback_query.message.answer(script_result)
+                    return
+                try:
+                    document = types.InputFile(script_result)
+                    await callback_query.message.answer_document(
+                        document=document
+                    )  # Send document
+                    # Закэшированный результат удалит script_runner по истечении TTL
+                    if not script_runner.keeps_file(script_result):
+                        os.remove(script_result)  # Delete the file
 
-                elif button.get("response_type") == "reg":
-                    # await cmd_reg(callback_query.message)
-                    await process_simple_reg(callback_query)
-
-                elif button.get("response_type") == "script":
-                    script_path = button["path"]
-                    output_type = button.get("output", "text")  # Default to "text"
-                    script_result = await execute_script(script_path, output_type)
-
-                    if isinstance(script_result, str) and output_type == "text":
-                        await callback_query.message.answer(script_result)  # Send text
-                    elif isinstance(script_result, str) and output_type == "file":
-                        # await callback_query.message.answer_document(
-                        #     document=script_result
-                        # )  # Send document
-                        logging.info(script_result)
-                        try:
-                            document = types.InputFile(script_result)
-                            await callback_query.message.answer_document(
-                                document=document
-                            )  # Send document
-                            os.remove(script_result)  # Delete the file
-
-                        except Exception as e:
-                            logger.exception(f"Error sending/deleting file: {e}")
-                            await callback_query.message.answer(
-                                f"Произошла ошибка при отправке или удалении файла: {e}"
-                            )
-                    else:
-                        logging.info("Чет не то")
-
-                # Otherwise, send the default answer as text (if present)
-                elif "answer" in button:
-                    await callback_query.message.answer(button["answer"])
-                else:
+                except Exception as e:
+                    logger.exception(f"Error sending/deleting file: {e}")
                     await callback_query.message.answer(
-                        "Действие не определено для этой кнопки."
+                        f"Произошла ошибка при отправке или удалении файла: {e}"
                     )
-            except Exception as e:
-                logger.exception(f"Ошибка при обработке callback: {e}")
-                await callback_query.message.answer(
-                    "Произошла ошибка при обработке запроса."
-                )
-            return
+            else:
+                logging.info("Чет не то")
 
-    await callback_query.answer("Неизвестные callback данные.")
+        # Otherwise, send the default answer as text (if present)
+        elif action.answer is not None:
+            await callback_query.message.answer(action.answer)
+        else:
+            await callback_query.message.answer(
+                "Действие не определено для этой кнопки."
+            )
+    except Exception as e:
+        logger.exception(f"Ошибка при обработке callback: {e}")
+        await callback_query.message.answer("Произошла ошибка при обработке запроса.")
 
 
 def register_callback_handler(dp: Dispatcher):
     """Регистрирует обработчик callback-запросов."""
     # dp.register_callback_query_handler(handle_callback)
 
+    dp.register_callback_query_handler(
+        process_event_reg_callback,
+        lambda c: c.data and c.data.startswith(EVENT_REG_PREFIX),
+        state="*",
+    )
     dp.register_callback_query_handler(handle_callback, state="*")
@@ -1,11 +1,14 @@
 # handlers/common_file.py
+import os
 import re
+import mmap
 import logging
+import threading
+from typing import Dict, List, Optional, Tuple
 from aiogram import types
 from aiogram.types import ParseMode
 from config_loader import ConfigLoader
 
-
 logger = logging.getLogger(__name__)
 
 # --- Инициализация ConfigLoader ---
@@ -18,6 +21,95 @@ def escape_specific_markdown(text: str) -> str:
     return re.sub(f"([{re.escape(escape_chars)}])", r"\\\1", text)
 
 
+SECTION_HEADER = re.compile(rb"# --- SECTION (\d+) ---")
+SECTION_PREFIX = b"# --- SECTION"
+
+
+def _decode(raw: bytes) -> str:
+    # Файлы раньше читались в текстовом режиме — сохраняем его перевод строк
+    return raw.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+
+
+class SectionIndex:
+    """
+    Индекс секций одного файла (# --- SECTION N ---).
+
+    Файл разбирается один раз через mmap: запоминаются байтовые смещения
+    секций, их краткие описания и уже экранированные тексты. Пока mtime и
+    размер файла не изменились, запросы /sec_N и списка секций обслуживаются
+    из памяти без чтения файла.
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.signature: Optional[Tuple[int, int]] = None
+        self.offsets: Dict[int, Tuple[int, int]] = {}
+        self.summaries: List[Tuple[int, str]] = []
+        self.bodies: Dict[int, str] = {}
+
+    def build(self, signature: Tuple[int, int]):
+        offsets, summaries, bodies = {}, [], {}
+        with open(self.filename, "rb") as f:
+            if signature[1] > 0:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    size = len(mm)
+                    headers = list(SECTION_HEADER.finditer(mm))
+                    for match in headers:
+                        number, header_end = int(match.group(1)), match.end()
+
+                        # Краткое описание — первая строка секции (до любого заголовка)
+                        if mm[header_end : header_end + 1] in (b"\n", b"\r"):
+                            stop = mm.find(SECTION_PREFIX, header_end)
+                            content = _decode(
+                                mm[header_end : stop if stop != -1 else size]
+                            )
+                            summaries.append((number, content.strip().split("\n")[0]))
+
+                        # Текст секции — до заголовка следующей секции или повтора текущей
+                        if number in offsets or match.group(1) != b"%d" % number:
+                            continue
+                        stops = [
+                            mm.find(b"# --- SECTION %d ---" % n, header_end)
+                            for n in (number, number + 1)
+                        ]
+                        stops = [pos for pos in stops if pos != -1]
+                        offsets[number] = (header_end, min(stops) if stops else size)
+
+                    for number, (begin, stop) in offsets.items():
+                        bodies[number] = escape_specific_markdown(
+                            _decode(mm[begin:stop]).strip()
+                        )
+
+        self.offsets, self.summaries, self.bodies = offsets, summaries, bodies
+        self.signature = signature
+
+
+class SectionStore:
+    """Индексы секций по файлам; индекс перестраивается при изменении файла."""
+
+    def __init__(self):
+        self._indexes: Dict[str, SectionIndex] = {}
+        self._lock = threading.Lock()
+
+    def get(self, filename: str) -> SectionIndex:
+        """Возвращает актуальный индекс. FileNotFoundError, если файла нет."""
+        stat = os.stat(filename)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            index = self._indexes.get(filename)
+            if index is None:
+                index = self._indexes[filename] = SectionIndex(filename)
+            if index.signature != signature:
+                index.build(signature)
+                logger.info(
+                    f"Индекс секций построен: {filename} ({len(index.offsets)})"
+                )
+            return index
+
+
+section_store = SectionStore()
+
+
 def get_section_summaries(filename: str) -> list[tuple[int, str]]:
     """
     Парсит файл и извлекает краткое описание каждой секции.
@@ -29,20 +121,7 @@ def get_section_summaries(filename: str) -> list[tuple[int, str]]:
         Список кортежей, где первый элемент - номер секции, а второй - ее краткое описание.
     """
     try:
-        with open(filename, "r", encoding="utf-8") as f:
-            content = f.read()
-
-        sections = re.findall(
-            r"# --- SECTION (\d+) ---\n(.*?)(?=# --- SECTION|\Z)", content, re.DOTALL
-        )
-
-        summaries = []
-        for section_number, section_content in sections:
-            # Разделяем контент на строки и берем первую строку, как краткое описание
-            first_line = section_content.strip().split("\n")[0]
-            summaries.append((int(section_number), first_line))
-
-        return summaries
+        return list(section_store.get(filename).summaries)
 
     except FileNotFoundError:
         print(f"Файл '{filename}' не найден.")
@@ -72,20 +151,10 @@ async def send_file_section(
 ):
     """Отправляет содержимое секции файла."""
     try:
-        with open(filename, "r", encoding="utf-8") as f:
-            content = f.read()
-
-        sections = content.split("# --- SECTION {} ---".format(section))
-
-        if len(sections) > 1:
-            text = (
-                sections[1].split("# --- SECTION {} ---".format(section + 1))[0].strip()
-            )  # Split to get content until next section
-            # if not parse_mode:
-            text = escape_specific_markdown(
-                text
-            )  # Escape specific MarkdownV2 special characters
+        # Текст секции уже экранирован (специальные символы MarkdownV2)
+        text = section_store.get(filename).bodies.get(section)
 
+        if text is not None:
             await message.answer(
                 f"{text}", parse_mode=parse_mode
             )  # Отправляем как отформатированный текст
@@ -124,7 +193,8 @@ async def send_commands_list(message: types.Message):
 async def delete_command(message: types.Message, command_name: str):
     """Удаляет команду из файла конфигурации команд."""
     try:
-        commands_data = config_loader.load_commands_config()
+        # Снимок конфигурации неизменяемый — правим его копию
+        commands_data = dict(config_loader.load_commands_config())
 
         # Проверяем, существует ли команда
         if command_name in commands_data:  # Исправлено: доступ к "command"
@@ -0,0 +1,123 @@
+# handlers/events.py
+import re
+import threading
+from datetime import datetime
+from typing import List, Optional
+
+from .logger import get_logger
+from .file_reader import (
+    load_json,
+    save_json_atomic,
+    get_timezone,
+    get_webinar_link,
+    get_webinar_time,
+)
+
+logger = get_logger("events", "events.log")
+
+EVENTS_FILE = "data/events.json"
+REGISTRATIONS_DIR = "data/registrations"
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Вебинар из .env (WEBINAR_DATETIME / WEBINAR_LINK) — событие по умолчанию,
+# его регистрации по-прежнему лежат в data/users.json
+DEFAULT_EVENT_ID = "default"
+DEFAULT_REGISTRATIONS = "data/users.json"
+
+# id события попадает в callback_data (лимит 64 байта) и в имя файла
+EVENT_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,32}$")
+
+_lock = threading.Lock()
+
+
+def registrations_path(event_id: str = DEFAULT_EVENT_ID) -> str:
+    """Файл регистраций события; ValueError, если id не годится в имя файла."""
+    if event_id == DEFAULT_EVENT_ID:
+        return DEFAULT_REGISTRATIONS
+    if not EVENT_ID_PATTERN.match(event_id):
+        raise ValueError(f"Некорректный id события: {event_id}")
+    return f"{REGISTRATIONS_DIR}/{event_id}.json"
+
+
+def _default_event() -> dict:
+    webinar_time = get_webinar_time()
+    if isinstance(webinar_time, datetime):
+        webinar_time = webinar_time.strftime(DATETIME_FORMAT)
+    return {
+        "event_id": DEFAULT_EVENT_ID,
+        "title": "Вебинар",
+        "datetime": webinar_time,
+        "link": get_webinar_link(),
+    }
+
+
+def _load_catalogue() -> List[dict]:
+    return load_json(EVENTS_FILE, []) or []
+
+
+def load_events(include_default: bool = True) -> List[dict]:
+    """Возвращает все события каталога (и событие по умолчанию из .env)."""
+    events = _load_catalogue()
+    if include_default:
+        events = [_default_event()] + events
+    return events
+
+
+def get_event(event_id: str = DEFAULT_EVENT_ID) -> Optional[dict]:
+    if event_id == DEFAULT_EVENT_ID:
+        return _default_event()
+    return next((e for e in _load_catalogue() if e["event_id"] == event_id), None)
+
+
+def event_time(event: dict) -> datetime:
+    """Время события с учётом временной зоны из .env."""
+    naive_dt = datetime.strptime(event["datetime"], DATETIME_FORMAT)
+    return naive_dt.replace(tzinfo=get_timezone())
+
+
+def upcoming_events(now: Optional[datetime] = None) -> List[dict]:
+    """События, которые ещё не начались, в порядке времени проведения."""
+    now = now or datetime.now(get_timezone())
+    events = []
+    for event in load_events():
+        try:
+            if event_time(event) > now:
+                events.append(event)
+        except (KeyError, TypeError, ValueError) as e:
+            logger.error(f"Некорректное событие {event.get('event_id')}: {e}")
+    return sorted(events, key=event_time)
+
+
+def add_event(event_id: str, dt_str: str, link: str, title: str = "") -> dict:
+    """
+    Добавляет или обновляет событие каталога.
+    Бросает ValueError при некорректном id или дате.
+    """
+    if not EVENT_ID_PATTERN.match(event_id) or event_id == DEFAULT_EVENT_ID:
+        raise ValueError(f"Некорректный id события: {event_id}")
+    datetime.strptime(dt_str, DATETIME_FORMAT)  # проверка формата
+
+    event = {
+        "event_id": event_id,
+        "title": title or event_id,
+        "datetime": dt_str,
+        "link": link,
+    }
+    with _lock:
+        events = [e for e in _load_catalogue() if e["event_id"] != event_id]
+        events.append(event)
+        save_json_atomic(EVENTS_FILE, events, indent=4)
+    logger.info(f"Событие сохранено: {event}")
+    return event
+
+
+def remove_event(event_id: str) -> bool:
+    with _lock:
+        events = _load_catalogue()
+        remaining = [e for e in events if e["event_id"] != event_id]
+        if len(remaining) == len(events):
+            return False
+        save_json_atomic(EVENTS_FILE, remaining, indent=4)
+    logger.info(f"Событие удалено: {event_id}")
+    return True
+
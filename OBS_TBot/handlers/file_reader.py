@@ -1,52 +1,35 @@
 # handlers/file_reader.py
 import os
 import json
+import threading
 from pathlib import Path
 from datetime import datetime
 from zoneinfo import ZoneInfo  # работает только с Python 3.9+
-from dotenv import load_dotenv
+from .settings import get_settings
 
 
 def get_timezone() -> ZoneInfo:
     """
     Возвращает объект временной зоны из переменной окружения TIMEZONE.
     """
-    load_dotenv()  # загружаем .env при каждом вызове
-    tz_name = os.getenv("TIMEZONE")
-    if not tz_name:
-        print(ValueError("TIMEZONE не указана в .env"))
-        return "Europe/Moscow"
-    return ZoneInfo(tz_name)
+    return get_settings().timezone
 
 
 def get_webinar_link():
     """
-    Возвращает объект временной зоны из переменной окружения WEBINAR_LINK.
+    Возвращает ссылку на вебинар из переменной окружения WEBINAR_LINK.
     """
-    load_dotenv()  # загружаем .env при каждом вызове
-    link_name = os.getenv("WEBINAR_LINK")
-    if not link_name:
-        print(ValueError("WEBINAR_LINK не указана в .env"))
-        return "https://example.com"
-    return link_name
+    return get_settings().webinar_link
 
 
 def get_webinar_time() -> datetime:
     """
     Возвращает объект datetime с учётом временной зоны, считанный из переменной окружения WEBINAR_DATETIME.
     """
-    load_dotenv()  # загружаем .env при каждом вызове
-    dt_str = os.getenv("WEBINAR_DATETIME")
-    if not dt_str:
-        print(ValueError("WEBINAR_DATETIME не указана в .env"))
-        return "2025-08-08 11:28:00"
-
-    try:
-        naive_dt = datetime.strptime(dt_str, "%Y-%m-%d %H:%M:%S")
-        tz = get_timezone()
-        return naive_dt.replace(tzinfo=tz)
-    except ValueError as e:
-        raise ValueError(f"Ошибка разбора даты из .env: {e}")
+    current = get_settings()
+    if current.webinar_time is None:
+        raise ValueError(current.datetime_error)
+    return current.webinar_time
 
 
 def init_json(file_path="data/default.json", default=None):
@@ -90,6 +73,29 @@ def load_json(file_path="data/default.json", default=None):
         return default
 
 
+def save_json_atomic(filename, data, indent=None):
+    """
+    Атомарно сохраняет данные в JSON файл: пишет во временный файл рядом
+    с целевым и подменяет его через os.replace, так что читатель никогда
+    не увидит наполовину записанный файл.
+    :param filename: Куда сохранить.
+    :param data: Что сохранять.
+    :param indent: Отступ JSON (None — компактная запись).
+    """
+    path = Path(filename)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
 def save_json(filename, data, default=None):
     """
     Сохраняет данные в JSON файл.
@@ -7,7 +7,10 @@ from requests.exceptions import HTTPError
 from google.auth.exceptions import GoogleAuthError
 from google.oauth2.service_account import Credentials
 
+from gspread.exceptions import APIError
+
 from .logger import get_logger
+from .sheets_sync import SheetsSync
 
 logger = get_logger("google_sheets", "google_sheets.log")
 
@@ -18,8 +21,13 @@ scope = [
     "https://www.googleapis.com/auth/drive",
 ]
 
+SPREADSHEET_NAME = "Регистрация на вебинар"
+
 CLIENT = None
-FIELDS_ORDER = ["user_id", "registered_at", "available"]
+WORKSHEET = None
+FIELDS_ORDER = ["user_id", "registered_at", "available", "event_id"]
+
+sync = SheetsSync(FIELDS_ORDER)
 
 
 def authorize_google_sheets():
@@ -35,7 +43,7 @@ def authorize_google_sheets():
 def is_google_sheets_connected():
     try:
         global CLIENT
-        spreadsheet = CLIENT.open("Регистрация на вебинар")
+        spreadsheet = CLIENT.open(SPREADSHEET_NAME)
         logger.info("Подключение к Google Sheets успешно.")
         return True
     except (HTTPError, GoogleAuthError) as e:
@@ -44,39 +52,35 @@ def is_google_sheets_connected():
         return False
 
 
+def get_worksheet():
+    """Возвращает лист регистрации, открывая таблицу только при первом обращении."""
+    global WORKSHEET
+    if WORKSHEET is None:
+        authorize_google_sheets()
+        WORKSHEET = CLIENT.open(SPREADSHEET_NAME).sheet1
+    return WORKSHEET
+
+
+def reset_connection():
+    """Сбрасывает клиента и лист — при следующем вызове авторизация повторится."""
+    global CLIENT, WORKSHEET
+    CLIENT = None
+    WORKSHEET = None
+
+
 def send_data_to_google_sheets(data: Union[dict, list[dict]]):
     """
     Универсальная функция для отправки данных в Google Sheets.
     Обновляет существующие строки по user_id и добавляет новые.
     Принимает словарь или список словарей.
+
+    Отправляются только изменившиеся записи, все одним batch_update;
+    номера строк берутся из локального кэша (см. sheets_sync.SheetsSync).
     """
     try:
-        global CLIENT
-        if CLIENT is None or not is_google_sheets_connected():
-            authorize_google_sheets()
-
-        worksheet = CLIENT.open("Регистрация на вебинар").sheet1
-
-        if isinstance(data, dict):
-            data = [data]
-
-        records = worksheet.get_all_records()
-        id_to_row = {str(r.get("user_id")): i + 2 for i, r in enumerate(records)}
-
-        new_rows = []
-        for user in data:
-            row_data = [user.get(f, "") for f in FIELDS_ORDER]
-            uid = str(user.get("user_id"))
-            if uid in id_to_row:
-                worksheet.update(f"A{id_to_row[uid]}:C{id_to_row[uid]}", [row_data])
-                logger.info(f"Обновлена запись в Google Sheets: user_id={uid}")
-            else:
-                new_rows.append(row_data)
-
-        if new_rows:
-            worksheet.append_rows(new_rows)
-            logger.info(f"Добавлено {len(new_rows)} новых строк в Google Sheets")
-
+        sync.mark(data)
+        if sync.pending():
+            sync.flush(get_worksheet())
         return "success"
 
     except TimeoutError as e:
@@ -85,8 +89,9 @@ def send_data_to_google_sheets(data: Union[dict, list[dict]]):
     except ConnectionError as e:
         logger.error(f"ConnectionError при работе с Google Sheets: {e}", exc_info=True)
         return "connection_error"
-    except (HTTPError, GoogleAuthError) as e:
+    except (HTTPError, GoogleAuthError, APIError) as e:
         logger.error(f"Ошибка Google API: {e}", exc_info=True)
+        reset_connection()
         return "api_error"
     except Exception as e:
         logger.exception(f"Неизвестная ошибка при работе с Google Sheets: {e}")
@@ -0,0 +1,257 @@
+# handlers/job_scheduler.py
+import time
+import heapq
+import asyncio
+import itertools
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from .logger import get_logger
+from .storage import Repository, repository as default_repository
+
+logger = get_logger("job_scheduler", "scheduler.log")
+
+# Пропущенное (например, пока бот был выключен) задание ещё выполняется,
+# если опоздание не превышает этого окна, иначе помечается как пропущенное
+MISSED_GRACE = 15 * 60
+# Выполненные задания старше этого срока удаляются из таблицы при старте
+KEEP_FINISHED = 7 * 24 * 60 * 60
+# Максимальный сон планировщика — страховка от перевода системных часов
+MAX_SLEEP = 60.0
+
+# Статусы заданий
+PENDING = "pending"
+FIRED = "fired"  # запущено; повторно после перезапуска не выполняется
+DONE = "done"
+FAILED = "failed"
+SKIPPED = "skipped"
+CANCELLED = "cancelled"
+
+JobHandler = Callable[[dict], Awaitable[None]]
+
+
+class JobScheduler:
+    """
+    Долговременный планировщик заданий.
+
+    Задания хранятся в таблице заданий хранилища (Repository: jobs.json
+    или таблица jobs в SQLite), поэтому переживают перезапуск: уже
+    сработавшие не повторяются, а пропущенные за время простоя догоняются
+    в пределах окна grace. Ядро — двоичная куча по времени запуска: вставка
+    и отмена O(log n) (отменённые записи кучи выбрасываются лениво). Каждое
+    задание выполняется в своей задаче, так что независимые напоминания
+    идут параллельно.
+
+    Таблица читается из хранилища не при создании объекта (импорте модуля),
+    а при запуске или первом обращении; дальше её индекс id -> задание
+    живёт в памяти, а каждое изменение записывается в хранилище. Задания,
+    прерванные остановкой планировщика (stop), возвращаются в ожидание и
+    догоняются после следующего запуска в пределах окна grace.
+    """
+
+    def __init__(
+        self, repository: Optional[Repository] = None, grace: float = MISSED_GRACE
+    ):
+        self.repository = repository or default_repository
+        self.grace = grace
+        self._table: Optional[Dict[str, dict]] = None
+        self._handlers: Dict[str, JobHandler] = {}
+        self._heap: List[Tuple[float, int, str]] = []
+        self._seq = itertools.count()
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._running: Set[asyncio.Task] = set()
+        self._stopping = False
+
+    # ——— Таблица заданий ———
+
+    def _load(self) -> Dict[str, dict]:
+        """Таблица заданий; читается из хранилища при первом обращении."""
+        if self._table is None:
+            self._table = {job["id"]: job for job in self.repository.jobs()}
+            self._prune_finished()
+            for job in self._table.values():
+                if job["status"] == PENDING:
+                    self._push(job)
+        return self._table
+
+    @property
+    def _store(self) -> Dict[str, dict]:
+        return self._load()
+
+    def _prune_finished(self):
+        border = time.time() - KEEP_FINISHED
+        finished = [
+            job["id"]
+            for job in self._table.values()
+            if job["status"] != PENDING and job["run_at"] < border
+        ]
+        for job_id in finished:
+            del self._table[job_id]
+        self.repository.delete_jobs(finished)
+
+    def _put(self, job: dict):
+        self._store[job["id"]] = job
+        self.repository.put_job(job)
+
+    def _push(self, job: dict):
+        heapq.heappush(self._heap, (job["run_at"], next(self._seq), job["id"]))
+        if self._wake is not None:
+            self._wake.set()
+
+    def _set_status(self, job: dict, status: str, **extra):
+        job = dict(job, status=status, **extra)
+        self._put(job)
+        return job
+
+    def register(self, kind: str, handler: JobHandler):
+        """Регистрирует корутину-обработчик для заданий вида kind."""
+        self._handlers[kind] = handler
+
+    def get(self, job_id: str) -> Optional[dict]:
+        job = self._store.get(job_id)
+        return dict(job) if job is not None else None
+
+    def jobs(self, prefix: str = "", status: Optional[str] = None) -> List[dict]:
+        return [
+            dict(job)
+            for job in self._store.values()
+            if job["id"].startswith(prefix)
+            and (status is None or job["status"] == status)
+        ]
+
+    def schedule(self, job_id: str, run_at: datetime, kind: str, payload: dict) -> bool:
+        """
+        Планирует задание. Повторный вызов с тем же job_id идемпотентен:
+        уже сработавшее задание не перепланируется, у ожидающего
+        обновляются время и данные.
+
+        :return: True, если задание (пере)запланировано.
+        """
+        current = self._store.get(job_id)
+        if current is not None and current["status"] in (FIRED, DONE, FAILED, SKIPPED):
+            return False
+
+        job = {
+            "id": job_id,
+            "kind": kind,
+            "run_at": run_at.timestamp(),
+            "payload": payload,
+            "status": PENDING,
+        }
+        if current == job:
+            return True
+        self._put(job)
+        self._push(job)
+        return True
+
+    def cancel(self, job_id: str) -> bool:
+        """Отменяет ожидающее задание. Запись в куче будет пропущена лениво."""
+        job = self._store.get(job_id)
+        if job is None or job["status"] != PENDING:
+            return False
+        self._set_status(job, CANCELLED)
+        return True
+
+    def cancel_prefix(self, prefix: str, keep: Optional[Set[str]] = None) -> int:
+        """Отменяет все ожидающие задания с id, начинающимся на prefix (кроме keep)."""
+        keep = keep or set()
+        cancelled = 0
+        for job in self.jobs(prefix, PENDING):
+            if job["id"] not in keep and self.cancel(job["id"]):
+                cancelled += 1
+        return cancelled
+
+    # ——— Цикл планировщика ———
+
+    async def _run(self):
+        # Флаг, а не только отмена: wait_for, разбуженный в момент отмены,
+        # возвращает результат и отмену проглатывает
+        while not self._stopping:
+            job = self._pop_due()
+            if job is None:
+                timeout = MAX_SLEEP
+                if self._heap:
+                    timeout = min(MAX_SLEEP, max(0.0, self._heap[0][0] - time.time()))
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+                continue
+
+            lateness = time.time() - job["run_at"]
+            if lateness > self.grace:
+                self._set_status(job, SKIPPED)
+                logger.warning(
+                    f"⏭ Пропущено задание '{job['id']}': опоздание {lateness:.0f} сек"
+                )
+                continue
+
+            job = self._set_status(job, FIRED, fired_at=time.time())
+            task = asyncio.create_task(self._fire(job))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    def _pop_due(self) -> Optional[dict]:
+        """Снимает с кучи ближайшее наступившее задание, пропуская устаревшие записи."""
+        now = time.time()
+        while self._heap and self._heap[0][0] <= now:
+            run_at, _, job_id = heapq.heappop(self._heap)
+            job = self._store.get(job_id)
+            if job is not None and job["status"] == PENDING and job["run_at"] == run_at:
+                return job
+        return None
+
+    async def _fire(self, job: dict):
+        handler = self._handlers.get(job["kind"])
+        if handler is None:
+            logger.error(f"Нет обработчика для заданий вида '{job['kind']}'")
+            self._set_status(job, FAILED)
+            return
+        try:
+            await handler(job["payload"])
+            self._set_status(job, DONE)
+        except asyncio.CancelledError:
+            if self._stopping:
+                # Остановка бота посреди рассылки: задание не потеряно, после
+                # перезапуска оно догоняется в пределах окна grace
+                logger.warning(
+                    f"Задание '{job['id']}' прервано остановкой, вернём в очередь"
+                )
+                self._push(self._set_status(job, PENDING))
+            else:
+                self._set_status(job, FAILED)
+            raise
+        except Exception as e:
+            logger.exception(f"Ошибка выполнения задания '{job['id']}': {e}")
+            self._set_status(job, FAILED)
+
+    def start(self):
+        """Запускает цикл планировщика (вызывать из работающего цикла событий)."""
+        if self._task is not None and not self._task.done():
+            return
+        self._stopping = False
+        self._wake = asyncio.Event()
+        self._load()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Останавливает цикл и выполняющиеся задания; прерванные задания
+        возвращаются в ожидание (PENDING).
+        """
+        self._stopping = True
+        # Сначала цикл, чтобы он не запустил новых заданий, пока прерываются
+        # выполняющиеся
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        tasks = list(self._running)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+job_scheduler = JobScheduler()
@@ -0,0 +1,189 @@
+# handlers/journal_store.py
+import os
+import json
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .logger import get_logger
+from .file_reader import load_json, save_json_atomic
+
+logger = get_logger("journal_store", "journal_store.log")
+
+# Сколько записей журнала накапливаем перед сжатием в снимок
+COMPACT_EVERY = 200
+
+
+class JournaledStore:
+    """
+    Хранилище записей-словарей с индексом key -> запись в памяти.
+
+    Снимок лежит в JSON файле (например, data/users.json), а каждое изменение
+    сначала дописывается одной строкой в журнал `<файл>.journal`. Раз в
+    COMPACT_EVERY записей журнал сворачивается в новый снимок, который
+    записывается атомарно (временный файл + os.replace).
+    """
+
+    def __init__(self, path: str, key: str = "id", compact_every: int = COMPACT_EVERY):
+        self.path = Path(path)
+        self.key = key
+        self.journal_path = self.path.with_name(self.path.name + ".journal")
+        self.compact_every = compact_every
+        self._lock = threading.RLock()
+        self._index: Dict[object, dict] = {}
+        self._journal_entries = 0
+        self._load()
+
+    # ——— Загрузка и журнал ———
+
+    def _load(self):
+        snapshot = load_json(str(self.path), [])
+        if not isinstance(snapshot, list):
+            logger.error(f"Снимок {self.path} повреждён, начинаем с пустого списка")
+            snapshot = []
+        for record in snapshot:
+            self._index[record[self.key]] = record
+
+        replayed = self._replay_journal()
+        if replayed or not self.path.exists():
+            # Сворачиваем журнал, оставшийся после прошлого запуска
+            self.compact()
+
+    def _replay_journal(self) -> int:
+        if not self.journal_path.exists():
+            return 0
+
+        replayed = 0
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Недописанная строка после аварийного завершения
+                    logger.warning(f"Пропущена повреждённая запись журнала: {line!r}")
+                    continue
+                self._apply(entry)
+                replayed += 1
+        logger.info(f"Из журнала {self.journal_path} применено {replayed} записей")
+        return replayed
+
+    def _apply(self, entry: dict):
+        op = entry.get("op")
+        if op == "put":
+            record = entry["record"]
+            self._index[record[self.key]] = record
+        elif op == "delete":
+            self._index.pop(entry["key"], None)
+
+    def _append(self, *entries: dict):
+        if self._journal_entries + len(entries) >= self.compact_every:
+            # Изменения уже в индексе — проще сразу записать снимок
+            self.compact()
+            return
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._journal_entries += len(entries)
+
+    def compact(self):
+        """Записывает снимок атомарно и очищает журнал."""
+        with self._lock:
+            save_json_atomic(str(self.path), list(self._index.values()), indent=4)
+            if self.journal_path.exists():
+                self.journal_path.unlink()
+            self._journal_entries = 0
+
+    # ——— Операции ———
+
+    def get(self, key) -> Optional[dict]:
+        with self._lock:
+            record = self._index.get(key)
+            return dict(record) if record is not None else None
+
+    def __contains__(self, key) -> bool:
+        return key in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def add(self, record: dict) -> bool:
+        """Добавляет запись, если такого ключа ещё нет. Возвращает True при добавлении."""
+        with self._lock:
+            if record[self.key] in self._index:
+                return False
+            self._put(record)
+            return True
+
+    def put(self, record: dict):
+        """Добавляет или заменяет запись."""
+        with self._lock:
+            self._put(record)
+
+    def _put(self, record: dict):
+        record = dict(record)
+        self._index[record[self.key]] = record
+        self._append({"op": "put", "record": record})
+
+    def update(self, records: List[dict]) -> int:
+        """
+        Обновляет только уже существующие записи (новые не добавляет)
+        и журналирует лишь реально изменившиеся. Возвращает число изменений.
+        """
+        entries = []
+        with self._lock:
+            for record in records:
+                current = self._index.get(record[self.key])
+                if current is None or current == record:
+                    continue
+                record = dict(record)
+                self._index[record[self.key]] = record
+                entries.append({"op": "put", "record": record})
+            if entries:
+                self._append(*entries)  # одна запись на диск на весь пакет
+        return len(entries)
+
+    def put_many(self, records: List[dict]):
+        """Добавляет или заменяет записи одной дозаписью журнала."""
+        with self._lock:
+            entries = []
+            for record in records:
+                record = dict(record)
+                self._index[record[self.key]] = record
+                entries.append({"op": "put", "record": record})
+            if entries:
+                self._append(*entries)
+
+    def delete(self, key) -> bool:
+        with self._lock:
+            if key not in self._index:
+                return False
+            del self._index[key]
+            self._append({"op": "delete", "key": key})
+            return True
+
+    def delete_many(self, keys) -> int:
+        """Удаляет записи одной дозаписью журнала, возвращает число удалённых."""
+        with self._lock:
+            entries = []
+            for key in keys:
+                if self._index.pop(key, None) is not None:
+                    entries.append({"op": "delete", "key": key})
+            if entries:
+                self._append(*entries)
+            return len(entries)
+
+    def all(self) -> List[dict]:
+        """Возвращает копии всех записей в порядке регистрации."""
+        with self._lock:
+            return [dict(r) for r in self._index.values()]
+
+    def replace_all(self, records: List[dict]):
+        """Полностью заменяет содержимое хранилища и сразу пишет снимок."""
+        with self._lock:
+            self._index = {r[self.key]: dict(r) for r in records}
+            self.compact()
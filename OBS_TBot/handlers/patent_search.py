@@ -0,0 +1,220 @@
+# handlers/patent_search.py
+"""
+Полнотекстовый поиск по аннотациям патентов, собранным
+Scripts/patent_requests.py.
+
+Индекс — таблица SQLite FTS5 в той же базе, что и аннотации. В индекс
+кладутся основы слов (russian_stemmer), поэтому «изобретения» находит
+«изобретение»; результаты ранжируются по BM25. Индекс обновляется
+инкрементально: переиндексируются только новые и перезагруженные патенты.
+
+Поиск индекс не обновляет: при запуске бота start() обновляет его в фоне
+и затем повторяет это каждые REFRESH_INTERVAL секунд. Обновление идёт
+через отдельное соединение, так что поиск по прежнему индексу не ждёт
+его окончания.
+
+Обновление вручную (из каталога бота):
+    python -m handlers.patent_search [--db ../Scripts/patents.db]
+"""
+
+import os
+import asyncio
+import sqlite3
+import argparse
+import threading
+from typing import List, NamedTuple, Optional
+
+from .logger import get_logger
+from .russian_stemmer import WORD, stem, stems
+
+logger = get_logger("patent_search", "patent_search.log")
+
+PATENTS_DB = os.path.join("..", "Scripts", "patents.db")
+NOT_FOUND = "Не найден текст в указанном div."
+SEARCH_LIMIT = 5
+SNIPPET_WORDS = 30
+REFRESH_INTERVAL = 10 * 60  # секунд между фоновыми обновлениями индекса
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS patent_index_docs ("
+    " id INTEGER PRIMARY KEY,"
+    " url TEXT UNIQUE NOT NULL,"
+    " fetched_at REAL NOT NULL)",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS patent_fts USING fts5("
+    " stems, tokenize = 'unicode61 remove_diacritics 0')",
+)
+
+STALE_SQL = (
+    "SELECT d.id FROM patent_index_docs d"
+    " LEFT JOIN patents p ON p.url = d.url"
+    " WHERE p.url IS NULL OR p.abstract IS NULL OR p.fetched_at != d.fetched_at"
+)
+NEW_SQL = (
+    "SELECT p.url, p.abstract, p.fetched_at FROM patents p"
+    " LEFT JOIN patent_index_docs d ON d.url = p.url"
+    " WHERE d.url IS NULL AND p.abstract IS NOT NULL AND p.abstract != ?"
+)
+SEARCH_SQL = (
+    "SELECT p.number, p.url, p.abstract, bm25(patent_fts) AS score"
+    " FROM patent_fts"
+    " JOIN patent_index_docs d ON d.id = patent_fts.rowid"
+    " JOIN patents p ON p.url = d.url"
+    " WHERE patent_fts MATCH ?"
+    " ORDER BY score LIMIT ?"
+)
+
+
+class PatentHit(NamedTuple):
+    number: str
+    url: str
+    snippet: str
+    score: float
+
+
+def snippet(text: str, terms: set, words: int = SNIPPET_WORDS) -> str:
+    """Фрагмент аннотации вокруг первого слова, совпавшего с запросом."""
+    tokens = text.split()
+    first = 0
+    for i, token in enumerate(tokens):
+        match = WORD.search(token.lower())
+        if match and stem(match.group()) in terms:
+            first = i
+            break
+    start = max(first - words // 3, 0)
+    fragment = " ".join(tokens[start : start + words])
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if start + words < len(tokens) else ""
+    return f"{prefix}{fragment}{suffix}"
+
+
+class PatentIndex:
+    def __init__(self, db_path: str = PATENTS_DB):
+        self.db_path = db_path
+        # Соединения поиска и обновления раздельные, у каждого своя блокировка
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._writer: Optional[sqlite3.Connection] = None
+        self._update_lock = threading.Lock()
+        # (число патентов, последняя загрузка) на момент обновления индекса
+        self._indexed_version = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _open(self) -> sqlite3.Connection:
+        if not os.path.exists(self.db_path):
+            raise FileNotFoundError(f"База патентов не найдена: {self.db_path}")
+        connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        for statement in SCHEMA:
+            connection.execute(statement)
+        connection.commit()
+        return connection
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._connection = self._open()
+        return self._connection
+
+    def _version(self, connection):
+        return connection.execute(
+            "SELECT count(*), max(fetched_at) FROM patents"
+        ).fetchone()
+
+    def update(self) -> int:
+        """Приводит индекс в соответствие с таблицей patents; возвращает число добавленных."""
+        with self._update_lock:
+            if self._writer is None:
+                self._writer = self._open()
+            connection = self._writer
+            version = self._version(connection)
+            if version == self._indexed_version:
+                return 0
+
+            with connection:
+                stale = [row[0] for row in connection.execute(STALE_SQL)]
+                connection.executemany(
+                    "DELETE FROM patent_fts WHERE rowid = ?", ((i,) for i in stale)
+                )
+                connection.executemany(
+                    "DELETE FROM patent_index_docs WHERE id = ?", ((i,) for i in stale)
+                )
+
+                added = 0
+                for url, abstract, fetched_at in connection.execute(
+                    NEW_SQL, (NOT_FOUND,)
+                ).fetchall():
+                    cursor = connection.execute(
+                        "INSERT INTO patent_index_docs (url, fetched_at) VALUES (?, ?)",
+                        (url, fetched_at),
+                    )
+                    connection.execute(
+                        "INSERT INTO patent_fts (rowid, stems) VALUES (?, ?)",
+                        (cursor.lastrowid, " ".join(stems(abstract))),
+                    )
+                    added += 1
+
+            self._indexed_version = version
+            if stale or added:
+                logger.info(
+                    f"Индекс патентов обновлён: удалено {len(stale)}, добавлено {added}"
+                )
+            return added
+
+    def search(self, query: str, limit: int = SEARCH_LIMIT) -> List[PatentHit]:
+        terms = list(dict.fromkeys(stems(query)))
+        if not terms:
+            return []
+        # Каждая основа — отдельная строка FTS5: все слова обязательны,
+        # а синтаксис запросов FTS5 из текста пользователя не применяется
+        match = " ".join(f'"{term}"' for term in terms)
+        with self._lock:
+            rows = self._connect().execute(SEARCH_SQL, (match, limit)).fetchall()
+        return [
+            PatentHit(number, url, snippet(abstract, set(terms)), score)
+            for number, url, abstract, score in rows
+        ]
+
+    async def _refresh(self, interval: float):
+        while True:
+            try:
+                await asyncio.to_thread(self.update)
+            except FileNotFoundError as e:
+                logger.warning(f"Индекс патентов не обновлён: {e}")
+            except sqlite3.Error as e:
+                logger.exception(f"Ошибка обновления индекса патентов: {e}")
+            await asyncio.sleep(interval)
+
+    def start(self, interval: float = REFRESH_INTERVAL):
+        """Запускает фоновое обновление индекса (вызывать из цикла событий)."""
+        if self._task is not None and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._refresh(interval))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+        with self._update_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+
+patent_index = PatentIndex(os.getenv("PATENTS_DB") or PATENTS_DB)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Обновление индекса патентов")
+    parser.add_argument("--db", default=os.getenv("PATENTS_DB") or PATENTS_DB)
+    args = parser.parse_args()
+    index = PatentIndex(args.db)
+    print(f"Добавлено в индекс: {index.update()}")
+    index.close()
@@ -1,3 +1,7 @@
-from .registration import process_simple_reg
-from .users import add_user, load_users, save_users
+from .registration import (
+    process_simple_reg,
+    process_event_reg_callback,
+    EVENT_REG_PREFIX,
+)
+from .users import add_user, load_users, save_users, update_users
 from .messages import format_registration_message
@@ -1,22 +1,39 @@
 # handlers/registration.py
 import json
-from typing import Union  # ← добавь этот импорт
+from typing import Optional, Union  # ← добавь этот импорт
 from aiogram import types
 
 from ..logger import get_logger
 from .users import add_user
-from ..file_reader import get_webinar_time
-from ..google_sheets import send_data_to_google_sheets
+from ..storage import repository
+from ..events import (
+    DEFAULT_EVENT_ID,
+    get_event,
+    event_time,
+)
+from ..sheets_queue import sheets_writer
 from .messages import format_registration_message
 
 logger = get_logger("registration", "registration.log")
 
 
-async def process_simple_reg(obj: Union[types.Message, types.CallbackQuery]):
+# callback_data кнопок регистрации на конкретное событие: "reg:<event_id>"
+EVENT_REG_PREFIX = "reg:"
+
+
+async def process_simple_reg(
+    obj: Union[types.Message, types.CallbackQuery], event_id: Optional[str] = None
+):
     user_id = obj.from_user.id
-    logger.info(f"process_simple_reg: ID={user_id}, Username=@{obj.from_user.username}")
+    if event_id is None and isinstance(obj, types.Message):
+        event_id = obj.get_args().strip() or None  # /reg <event_id>
+    event_id = event_id or DEFAULT_EVENT_ID
+    logger.info(
+        f"process_simple_reg: ID={user_id}, Username=@{obj.from_user.username}, "
+        f"event={event_id}"
+    )
 
-    response = save_registration_without_full_name(user_id)
+    response = await save_registration_without_full_name(user_id, event_id)
 
     target = obj.message if isinstance(obj, types.CallbackQuery) else obj
     if isinstance(obj, types.CallbackQuery):
@@ -24,18 +41,32 @@ async def process_simple_reg(obj: Union[types.Message, types.CallbackQuery]):
     await target.answer(response, parse_mode="HTML")
 
 
-def save_registration_without_full_name(user_id: int) -> str:
+async def process_event_reg_callback(callback_query: types.CallbackQuery):
+    """Регистрация по кнопке из списка событий (/events)."""
+    event_id = callback_query.data[len(EVENT_REG_PREFIX) :]
+    await process_simple_reg(callback_query, event_id)
+
+
+async def save_registration_without_full_name(
+    user_id: int, event_id: str = DEFAULT_EVENT_ID
+) -> str:
     try:
-        user = add_user(user_id)
+        event = get_event(event_id)
+        if event is None:
+            return "❌ Вебинар не найден. Список вебинаров: /events"
+
+        # Запись в хранилище — в его рабочем потоке, цикл событий не ждёт
+        user = await repository.run(add_user, user_id, event_id)
         if user is None:
             return (
                 "⚠️ <b>Вы уже зарегистрированы</b> на вебинар.\n\n"
                 "Не волнуйтесь — напоминание придет вовремя!"
             )
 
-        tmp_time = get_webinar_time()
-        gs_result = send_data_to_google_sheets(user)
-        return format_registration_message(tmp_time, gs_result)
+        tmp_time = event_time(event)
+        # В Google Sheets запись уйдёт в фоне, ответ пользователю не ждёт API
+        sheets_writer.enqueue(user)
+        return format_registration_message(tmp_time)
 
     except (AttributeError, OSError, json.JSONDecodeError) as e:
         logger.error(
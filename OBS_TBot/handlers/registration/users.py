@@ -1,30 +1,30 @@
-import os
-import json
 from datetime import datetime
 from typing import Optional, Dict
-from ..file_reader import load_json, save_json
+from ..events import DEFAULT_EVENT_ID
+from ..storage import repository
 
 
-def load_users(path="data/users.json") -> list:
-    if not os.path.exists(path):
-        with open(path, "w", encoding="utf-8") as f:
-            f.write("[]")
-    return load_json(path, [])
+def load_users(event_id: str = DEFAULT_EVENT_ID) -> list:
+    return repository.registrations(event_id)
 
 
-def save_users(path, users):
-    save_json(path, users, [])
+def save_users(event_id: str, users):
+    repository.replace_registrations(event_id, users or [])
 
 
-def add_user(user_id: int, path="data/users.json") -> Optional[Dict]:
-    users = load_users(path)
-    if any(u["user_id"] == user_id for u in users):
-        return None  # уже зарегистрирован
+def update_users(users, event_id: str = DEFAULT_EVENT_ID) -> int:
+    """Сохраняет изменения существующих записей, не затирая новые регистрации."""
+    return repository.update_registrations(event_id, users)
+
+
+def add_user(user_id: int, event_id: str = DEFAULT_EVENT_ID) -> Optional[Dict]:
     user = {
         "user_id": user_id,
         "registered_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         "available": True,
     }
-    users.append(user)
-    save_users(path, users)
+    if event_id != DEFAULT_EVENT_ID:
+        user["event_id"] = event_id
+    if not repository.add_registration(event_id, user):
+        return None  # уже зарегистрирован
     return user
@@ -0,0 +1,106 @@
+# handlers/reminder/availability.py
+import time
+import asyncio
+from typing import Dict, Iterable, List, Optional, Tuple
+from aiogram import Bot
+
+from ..logger import get_logger
+from . import broadcast as engine
+from .broadcast import (
+    TokenBucket,
+    PERMANENT_ERRORS,
+    SENT,
+    UNAVAILABLE,
+)
+
+logger = get_logger("availability", "broadcast.log")
+
+# Сколько секунд результат проверки пользователя считается актуальным
+PROBE_TTL = 6 * 60 * 60
+PROBE_WORKERS = 10
+# Проверки берут токены из общего с рассылками bucket (лимит Telegram на
+# бота один), а собственный bucket не даёт им занять больше PROBE_RATE
+# из него — остальное остаётся напоминаниям
+PROBE_RATE = 10.0
+# Поле записи регистрации: время (time.time()) последнего достоверного
+# результата; хранится в репозитории и переживает перезапуск
+CHECKED_AT = "checked_at"
+
+probe_bucket = TokenBucket(rate=PROBE_RATE)
+
+
+def mark(user: dict, now: Optional[float] = None):
+    """Запоминает в записи момент, когда доступность пользователя стала известна."""
+    user[CHECKED_AT] = time.time() if now is None else now
+
+
+def is_fresh(user: dict, ttl: float = PROBE_TTL) -> bool:
+    checked = user.get(CHECKED_AT)
+    return checked is not None and time.time() - checked < ttl
+
+
+def learn_from_results(users: list, results: Dict[int, str]) -> Tuple[list, list]:
+    """
+    Пассивно обновляет доступность по итогам рассылки.
+    SENT — пользователь доступен, UNAVAILABLE — нет, FAILED ничего не говорит.
+
+    :return: (checked, changed) — записи с новым временем проверки (их
+             нужно сохранить) и те из них, у которых изменился статус.
+    """
+    now = time.time()
+    checked: List[dict] = []
+    changed: List[dict] = []
+    for user in users:
+        status = results.get(user.get("user_id"))
+        if status not in (SENT, UNAVAILABLE):
+            continue
+        available = status == SENT
+        mark(user, now)
+        checked.append(user)
+        if user.get("available") != available:
+            user["available"] = available
+            changed.append(user)
+    return checked, changed
+
+
+async def _probe_one(bot: Bot, user_id: int) -> Optional[bool]:
+    await probe_bucket.acquire()
+    await engine.bucket.acquire()
+    try:
+        await bot.send_chat_action(user_id, "choose_sticker")
+        return True
+    except PERMANENT_ERRORS as e:
+        logger.info(f"❌ Не доступен: {user_id} | {e}")
+        return False
+    except Exception as e:
+        logger.warning(f"⚠️ Ошибка {user_id}: {type(e).__name__}: {e}")
+        return None
+
+
+async def probe_users(
+    bot: Bot, user_ids: Iterable[int], workers: int = PROBE_WORKERS
+) -> Dict[int, bool]:
+    """
+    Параллельно проверяет доступность пользователей через send_chat_action.
+
+    :return: Словарь user_id -> доступен ли (пользователи с неопределённым
+             результатом в словарь не попадают).
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    for user_id in user_ids:
+        queue.put_nowait(user_id)
+
+    results: Dict[int, bool] = {}
+
+    async def worker():
+        while True:
+            try:
+                user_id = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            available = await _probe_one(bot, user_id)
+            if available is not None:
+                results[user_id] = available
+
+    await asyncio.gather(*(worker() for _ in range(min(workers, queue.qsize()))))
+    return results
@@ -0,0 +1,148 @@
+"""
+Проверка движка рассылки на поддельном боте: пропускная способность,
+общий лимит и лимит на чат, пауза при RetryAfter, снижение скорости вдвое
+и её постепенное восстановление (AIMD).
+
+Запуск из каталога бота: python -m handlers.reminder.bench_broadcast
+"""
+
+import asyncio
+from typing import List, Tuple
+
+from aiogram.utils.exceptions import RetryAfter
+
+from . import broadcast as engine
+
+SEND_LATENCY = 0.005  # секунд на ответ Telegram
+TOLERANCE = 0.02  # погрешность таймеров цикла событий, секунд
+
+
+class FakeBot:
+    """
+    Бот-заглушка: запоминает время и чат каждой отправки и скорость
+    общего token bucket на момент вызова; на вызовах с номерами из
+    flood_at бросает RetryAfter(flood_timeout).
+    """
+
+    def __init__(self, flood_at=(), flood_timeout: int = 1):
+        self.flood_at = set(flood_at)
+        self.flood_timeout = flood_timeout
+        self.calls = 0
+        self.sends: List[Tuple[float, int]] = []
+        self.rates: List[float] = []
+        self.floods: List[float] = []
+        self.paused_rates: List[float] = []
+
+    async def send_message(self, chat_id: int, text: str, **kwargs):
+        now = asyncio.get_running_loop().time()
+        self.calls += 1
+        self.rates.append(engine.bucket.rate)
+        if self.calls in self.flood_at:
+            self.floods.append(now)
+            # Скорость сразу после обработки RetryAfter отправителем
+            asyncio.get_running_loop().call_soon(
+                lambda: self.paused_rates.append(engine.bucket.rate)
+            )
+            raise RetryAfter(self.flood_timeout)
+        self.sends.append((now, chat_id))
+        await asyncio.sleep(SEND_LATENCY)
+
+
+def reset_limiters():
+    """Свежие общие лимитеры: каждая проверка начинается с полной скоростью."""
+    engine.bucket = engine.TokenBucket()
+    engine.chat_limiter = engine.ChatLimiter()
+
+
+def max_in_window(times: List[float], window: float) -> int:
+    """Наибольшее число отправок в любом окне длиной window секунд."""
+    best = 0
+    start = 0
+    for end, moment in enumerate(times):
+        while moment - times[start] >= window:
+            start += 1
+        best = max(best, end - start + 1)
+    return best
+
+
+async def check_global_limit(chats: int = 150):
+    reset_limiters()
+    bot = FakeBot()
+    results = await engine.broadcast(bot, range(chats), "текст")
+    assert all(status == engine.SENT for status in results.values()), results
+
+    times = [moment for moment, _ in bot.sends]
+    duration = times[-1] - times[0]
+    rate, capacity = engine.bucket.base_rate, engine.bucket.capacity
+    busiest = max_in_window(times, 1.0)
+    print(
+        f"Общий лимит: {chats} сообщений за {duration:.2f} сек "
+        f"({chats / duration:.1f} сообщ/сек), максимум за секунду {busiest} "
+        f"(лимит Telegram {engine.TELEGRAM_RATE})"
+    )
+    # Token bucket: за окно W не больше capacity + rate * W отправок, и при
+    # W = 1 сек это не больше лимита Telegram (+1 на погрешность таймеров)
+    assert capacity + rate <= engine.TELEGRAM_RATE, (capacity, rate)
+    assert busiest <= engine.TELEGRAM_RATE + 1, busiest
+    # После начального запаса токенов скорость не выше rate
+    assert (chats - capacity) / duration <= rate * 1.05, duration
+
+
+async def check_chat_limit(chats: int = 10, rounds: int = 3):
+    reset_limiters()
+    bot = FakeBot()
+    # Несколько рассылок одновременно в одни и те же чаты
+    await asyncio.gather(
+        *(engine.broadcast(bot, range(chats), "текст") for _ in range(rounds))
+    )
+    by_chat = {}
+    for moment, chat_id in bot.sends:
+        by_chat.setdefault(chat_id, []).append(moment)
+    gap = min(
+        later - earlier
+        for times in by_chat.values()
+        for earlier, later in zip(times, times[1:])
+    )
+    print(
+        f"Лимит на чат: {rounds} рассылки в {chats} чатов, "
+        f"минимальный интервал в чате {gap:.3f} сек "
+        f"(допустимо {engine.PER_CHAT_INTERVAL} сек)"
+    )
+    assert all(len(times) == rounds for times in by_chat.values()), by_chat
+    assert gap >= engine.PER_CHAT_INTERVAL - TOLERANCE, gap
+
+
+async def check_backoff(chats: int = 200, flood_at: int = 40, flood_timeout: int = 1):
+    reset_limiters()
+    bot = FakeBot(flood_at=(flood_at,), flood_timeout=flood_timeout)
+    base_rate = engine.bucket.base_rate
+    results = await engine.broadcast(bot, range(chats), "текст")
+    # Чат, на котором сработал flood control, получает сообщение повторно
+    assert all(status == engine.SENT for status in results.values()), results
+
+    flood = bot.floods[0]
+    after = [moment for moment, _ in bot.sends if moment > flood]
+    pause = after[0] - flood
+    halved = bot.paused_rates[0]
+    # Скорость на каждом вызове после RetryAfter не убывает
+    rates = bot.rates[flood_at:]
+    print(
+        f"RetryAfter {flood_timeout} сек на {flood_at}-й отправке: "
+        f"пауза {pause:.2f} сек, скорость {base_rate:.0f} -> {halved:.1f} -> "
+        f"{engine.bucket.rate:.1f} сообщ/сек"
+    )
+    assert pause >= flood_timeout - TOLERANCE, pause
+    assert halved == base_rate / 2, halved
+    assert all(later >= earlier for earlier, later in zip(rates, rates[1:])), rates
+    assert engine.bucket.rate == base_rate, engine.bucket.rate
+
+
+async def main():
+    await check_global_limit()
+    await check_chat_limit()
+    await check_backoff()
+    print("Все проверки пройдены.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
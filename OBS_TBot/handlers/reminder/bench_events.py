@@ -0,0 +1,187 @@
+"""
+Проверка планирования и рассылки напоминаний для каталога из сотен событий
+на поддельном боте.
+
+Во временном каталоге создаются EVENTS событий с REGISTRANTS
+регистрациями каждое и напоминания за несколько секунд до начала.
+schedule_webinar_reminder заносит их в таблицу JobScheduler — время
+планирования и повторного (идемпотентного) планирования ограничено
+PLAN_LIMIT. Затем планировщик запускается, и каждое напоминание должно
+дойти ровно один раз ровно до участников своего события не позже
+FANOUT_LIMIT секунд после срока.
+
+Запуск из каталога бота: python -m handlers.reminder.bench_events
+"""
+
+import os
+import time
+import asyncio
+import logging
+import tempfile
+import contextlib
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import List, Tuple
+
+from ..events import DATETIME_FORMAT
+from ..file_reader import get_timezone, save_json_atomic
+from ..job_scheduler import DONE, JobScheduler
+from ..sheets_queue import SheetsWriteBehind
+from ..storage import JsonRepository
+from . import broadcast as engine
+from . import reminder, users
+
+EVENTS = 300
+REGISTRANTS = 5
+# Напоминания за LEAD - 1 ... 1 секунд до начала, последнее — со ссылкой
+LEAD = 4
+REMINDERS = [
+    {
+        "time": f"{seconds} seconds",
+        "text": f"Событие через {seconds} сек. ",
+        "label": f"за {seconds} сек",
+        "last": seconds == 1,
+    }
+    for seconds in range(LEAD - 1, 0, -1)
+]
+PLAN_LIMIT = 2.0  # секунд на планирование всего каталога
+FANOUT_LIMIT = 1.5  # секунд от срока напоминания до последней отправки
+WAIT_LIMIT = LEAD + 10.0  # секунд на срабатывание всех заданий
+
+
+class FakeBot:
+    """Бот-заглушка: запоминает время, чат и текст каждого сообщения."""
+
+    def __init__(self):
+        self.sends: List[Tuple[float, int, str]] = []
+
+    async def send_message(self, chat_id: int, text: str, **kwargs):
+        self.sends.append((time.time(), chat_id, text))
+
+
+@contextlib.contextmanager
+def quiet():
+    """Отчёты планировщика и рассылки о каждом событии не выводятся."""
+    with open(os.devnull, "w") as null, contextlib.redirect_stdout(null):
+        yield
+
+
+def make_catalogue(repository: JsonRepository) -> Tuple[datetime, dict]:
+    """Создаёт события и регистрации; возвращает время начала и event_id -> участники."""
+    start = datetime.now(get_timezone()).replace(microsecond=0) + timedelta(
+        seconds=LEAD + 1
+    )
+    events, registrants = [], {}
+    for number in range(EVENTS):
+        event_id = f"event{number}"
+        events.append(
+            {
+                "event_id": event_id,
+                "title": f"Событие {number}",
+                "datetime": start.strftime(DATETIME_FORMAT),
+                "link": f"https://example.com/{event_id}",
+            }
+        )
+        chat_ids = [number * REGISTRANTS + i + 1 for i in range(REGISTRANTS)]
+        repository.replace_registrations(
+            event_id,
+            [{"user_id": chat_id, "event_id": event_id} for chat_id in chat_ids],
+        )
+        registrants[event_id] = chat_ids
+    save_json_atomic("data/events.json", events, indent=4)
+    save_json_atomic("data/reminders.json", REMINDERS, indent=4)
+    return start, registrants
+
+
+async def check_planning(bot: FakeBot):
+    with quiet():
+        started = time.perf_counter()
+        await reminder.schedule_webinar_reminder(bot)
+        planning = time.perf_counter() - started
+
+        started = time.perf_counter()
+        await reminder.schedule_webinar_reminder(bot)
+        replanning = time.perf_counter() - started
+
+    jobs = reminder.job_scheduler.jobs(reminder.REMINDER_JOB_PREFIX)
+    print(
+        f"Планирование: {EVENTS} событий, {len(jobs)} заданий за {planning:.3f} сек, "
+        f"повторно — за {replanning:.3f} сек (допустимо {PLAN_LIMIT} сек)"
+    )
+    assert len(jobs) == EVENTS * len(REMINDERS), len(jobs)
+    assert planning <= PLAN_LIMIT, planning
+    assert replanning <= PLAN_LIMIT, replanning
+
+
+async def check_fanout(bot: FakeBot, start: datetime, registrants: dict):
+    scheduler = reminder.job_scheduler
+    scheduler.register("reminder", reminder.make_reminder_handler(bot))
+    scheduler.start()
+    try:
+        deadline = time.time() + WAIT_LIMIT
+        with quiet():
+            while len(scheduler.jobs(reminder.REMINDER_JOB_PREFIX, DONE)) < (
+                EVENTS * len(REMINDERS)
+            ):
+                assert time.time() < deadline, "напоминания не сработали вовремя"
+                await asyncio.sleep(0.05)
+    finally:
+        await scheduler.stop()
+
+    owner = {
+        chat_id: event_id
+        for event_id, chat_ids in registrants.items()
+        for chat_id in chat_ids
+    }
+    received = Counter((chat_id, text) for _, chat_id, text in bot.sends)
+    for event_id, chat_ids in registrants.items():
+        texts = [
+            item["text"] + (f"https://example.com/{event_id}" if item["last"] else "")
+            for item in REMINDERS
+        ]
+        expected = Counter((chat_id, text) for chat_id in chat_ids for text in texts)
+        got = Counter(
+            {key: count for key, count in received.items() if owner[key[0]] == event_id}
+        )
+        assert got == expected, (event_id, got, expected)
+
+    last_due = (start - timedelta(seconds=1)).timestamp()
+    fanout = max(moment for moment, _, _ in bot.sends) - last_due
+    print(
+        f"Рассылка: {len(bot.sends)} сообщений {EVENTS * REGISTRANTS} участникам, "
+        f"последнее — через {fanout:.2f} сек после срока "
+        f"(допустимо {FANOUT_LIMIT} сек)"
+    )
+    assert len(bot.sends) == EVENTS * REGISTRANTS * len(REMINDERS), len(bot.sends)
+    assert set(owner) == {chat_id for _, chat_id, _ in bot.sends}
+    assert fanout <= FANOUT_LIMIT, fanout
+
+
+async def main():
+    for name in ("broadcast", "job_scheduler", "journal_store"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+    bot_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            os.makedirs("data/registrations")
+            repository = JsonRepository()
+            repository.init()
+            users.repository = repository
+            users.sheets_writer = SheetsWriteBehind("data/sheets_pending.json")
+            reminder.job_scheduler = JobScheduler(repository)
+            # Проверяется планирование, а не лимиты Telegram — их снимаем
+            engine.bucket = engine.TokenBucket(rate=1e6, capacity=1e6)
+            engine.chat_limiter = engine.ChatLimiter(interval=0.0)
+
+            start, registrants = make_catalogue(repository)
+            bot = FakeBot()
+            await check_planning(bot)
+            await check_fanout(bot, start, registrants)
+        finally:
+            os.chdir(bot_dir)
+    print("Все проверки пройдены.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,195 @@
+# handlers/reminder/broadcast.py
+import asyncio
+from typing import Dict, Iterable, Optional
+from aiogram import Bot
+from aiogram.utils.exceptions import (
+    RetryAfter,
+    Unauthorized,
+    ChatNotFound,
+    CantInitiateConversation,
+    CantTalkWithBots,
+)
+
+from ..logger import get_logger
+
+logger = get_logger("broadcast", "broadcast.log")
+
+# Лимиты Telegram: ~30 сообщений в секунду на бота и 1 сообщение в секунду в один чат
+TELEGRAM_RATE = 30
+# Запас токенов (всплеск) сверх скорости: за любую секунду уходит не больше
+# BURST + GLOBAL_RATE сообщений, то есть не больше лимита Telegram
+BURST = 2
+GLOBAL_RATE = float(TELEGRAM_RATE - BURST)
+PER_CHAT_INTERVAL = 1.0
+WORKERS = 20
+MAX_ATTEMPTS = 3
+MAX_FLOOD_WAITS = 5
+RETRY_BASE_DELAY = 1.0
+
+# Статусы доставки
+SENT = "sent"
+UNAVAILABLE = "unavailable"  # бот заблокирован / чат не найден — повтор бесполезен
+FAILED = "failed"  # временная ошибка, попытки исчерпаны
+
+PERMANENT_ERRORS = (
+    Unauthorized,  # BotBlocked, UserDeactivated, BotKicked
+    ChatNotFound,
+    CantInitiateConversation,
+    CantTalkWithBots,
+)
+
+
+class TokenBucket:
+    """
+    Асинхронный token bucket с адаптивной скоростью.
+
+    При RetryAfter скорость уменьшается вдвое и все отправители ставятся на
+    паузу; после каждой успешной отправки скорость плавно растёт обратно
+    до базовой (AIMD). Ёмкость (capacity) — небольшой всплеск: полное ведро
+    не должно пропускать сверх скорости ещё секунду сообщений.
+    """
+
+    def __init__(self, rate: float = GLOBAL_RATE, capacity: float = BURST):
+        self.base_rate = rate
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = self.capacity
+        self._updated = None
+        self._paused_until = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _refill(self, now: float):
+        if self._updated is None:
+            self._updated = now
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    async def acquire(self):
+        loop = asyncio.get_running_loop()
+        if self._lock is None:
+            self._lock = asyncio.Lock()  # создаём внутри работающего цикла
+        async with self._lock:
+            while True:
+                now = loop.time()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def pause(self, seconds: float):
+        """Останавливает выдачу токенов на seconds и снижает скорость."""
+        loop = asyncio.get_running_loop()
+        self._paused_until = max(self._paused_until, loop.time() + seconds)
+        self._tokens = 0
+        self.rate = max(1.0, self.rate / 2)
+
+    def recover(self):
+        """Аддитивно возвращает скорость к базовой после успешной отправки."""
+        if self.rate < self.base_rate:
+            self.rate = min(self.base_rate, self.rate + 0.1)
+
+
+class ChatLimiter:
+    """
+    Следит, чтобы в один чат уходило не чаще одного сообщения в interval секунд.
+
+    wait() занимает очередь чата до ожидания общего token bucket, а hold()
+    вызывается перед самой отправкой: ожидание токена у сообщений разное, и
+    без него следующее сообщение в чат могло уйти раньше interval после
+    предыдущего.
+    """
+
+    def __init__(self, interval: float = PER_CHAT_INTERVAL):
+        self.interval = interval
+        self._next_allowed: Dict[int, float] = {}
+        self._send_at: Dict[int, float] = {}
+
+    async def wait(self, chat_id: int):
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        ready_at = self._next_allowed.get(chat_id, now)
+        self._next_allowed[chat_id] = max(ready_at, now) + self.interval
+        if ready_at > now:
+            await asyncio.sleep(ready_at - now)
+
+    async def hold(self, chat_id: int):
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        send_at = max(
+            now, self._send_at.get(chat_id, now - self.interval) + self.interval
+        )
+        self._send_at[chat_id] = send_at
+        if send_at > now:
+            await asyncio.sleep(send_at - now)
+
+
+# Общие для всех рассылок лимитеры: лимит Telegram действует на бота целиком
+bucket = TokenBucket()
+chat_limiter = ChatLimiter()
+
+
+async def _send_one(bot: Bot, chat_id: int, text: str, **kwargs) -> str:
+    attempt = 0
+    flood_waits = 0
+    while True:
+        await chat_limiter.wait(chat_id)
+        await bucket.acquire()
+        await chat_limiter.hold(chat_id)
+        try:
+            await bot.send_message(chat_id, text, **kwargs)
+            bucket.recover()
+            return SENT
+        except RetryAfter as e:
+            flood_waits += 1
+            logger.warning(f"Flood control: пауза {e.timeout} сек (чат {chat_id})")
+            bucket.pause(e.timeout)
+            if flood_waits > MAX_FLOOD_WAITS:
+                return FAILED
+        except PERMANENT_ERRORS as e:
+            logger.info(f"Не доступен: {chat_id} | {e}")
+            return UNAVAILABLE
+        except Exception as e:
+            attempt += 1
+            if attempt >= MAX_ATTEMPTS:
+                logger.error(f"Ошибка отправки {chat_id}: {type(e).__name__}: {e}")
+                return FAILED
+            await asyncio.sleep(RETRY_BASE_DELAY * 2 ** (attempt - 1))
+
+
+async def broadcast(
+    bot: Bot, chat_ids: Iterable[int], text: str, workers: int = WORKERS, **kwargs
+) -> Dict[int, str]:
+    """
+    Рассылает text всем chat_ids пулом из workers параллельных отправителей.
+
+    Скорость ограничивается общим token bucket и лимитом на чат, RetryAfter
+    обрабатывается паузой всей рассылки, временные ошибки — повторами.
+    Дополнительные kwargs передаются в bot.send_message (например, parse_mode).
+
+    :return: Словарь chat_id -> статус (SENT, UNAVAILABLE или FAILED).
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    for chat_id in dict.fromkeys(chat_ids):  # без дублей, порядок сохраняется
+        queue.put_nowait(chat_id)
+
+    results: Dict[int, str] = {}
+
+    async def worker():
+        while True:
+            try:
+                chat_id = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            results[chat_id] = await _send_one(bot, chat_id, text, **kwargs)
+
+    await asyncio.gather(*(worker() for _ in range(min(workers, queue.qsize()))))
+
+    sent = sum(1 for status in results.values() if status == SENT)
+    logger.info(f"Рассылка завершена: {sent}/{len(results)} доставлено")
+    return results
@@ -2,42 +2,86 @@ import asyncio
 from datetime import datetime
 from aiogram import Bot
 from ..scheduler import TaskScheduler
+from ..job_scheduler import job_scheduler
 from .time_utils import calculate_reminder_time
 from .users import update_user_block_status, send_reminder_to_users
-from ..file_reader import load_json, get_webinar_time, get_timezone
+from ..file_reader import load_json, get_timezone
+from ..events import DEFAULT_EVENT_ID, load_events, event_time
 
 scheduler = TaskScheduler()
 
 
+REMINDER_JOB_PREFIX = "reminder:"
+
+
+def reminder_job_id(event_id: str, event_dt: datetime, reminder: dict) -> str:
+    return f"{REMINDER_JOB_PREFIX}{event_id}:{event_dt.isoformat()}:{reminder['time']}"
+
+
+def _plan_event(event: dict, reminders: list, now: datetime, wanted: set) -> int:
+    """Планирует напоминания одного события, возвращает число новых заданий."""
+    event_id = event["event_id"]
+    try:
+        event_dt = event_time(event)
+    except (KeyError, TypeError, ValueError) as e:
+        print(f"⚠️ Некорректная дата события '{event_id}': {e}")
+        return 0
+
+    planned = 0
+    for reminder in reminders:
+        job_id = reminder_job_id(event_id, event_dt, reminder)
+        remind_at = calculate_reminder_time(event_dt, reminder["time"])
+
+        if remind_at <= now and job_scheduler.get(job_id) is None:
+            continue  # устарело ещё до планирования
+
+        wanted.add(job_id)
+        payload = {
+            "event_id": event_id,
+            "text": reminder["text"],
+            "label": reminder["label"],
+            "last": bool(reminder.get("last")),
+        }
+        if job_scheduler.get(job_id) is None:
+            planned += 1
+        job_scheduler.schedule(job_id, remind_at, "reminder", payload)
+    return planned
+
+
 async def schedule_webinar_reminder(bot: Bot):
-    webinar_time = get_webinar_time()
+    """
+    Заносит напоминания всех событий каталога в общую постоянную таблицу заданий.
+    Уже сработавшие напоминания повторно не планируются, а задания
+    удалённых событий и прежних дат отменяются.
+    """
     reminders = load_json("data/reminders.json", [])
-
     if not reminders:
         print("📭 Нет напоминаний для планирования.")
+        job_scheduler.cancel_prefix(REMINDER_JOB_PREFIX)
         return
 
     now = datetime.now(get_timezone())
+    wanted = set()
+    events = load_events()
+    planned = sum(_plan_event(event, reminders, now, wanted) for event in events)
 
-    for reminder in reminders:
-        delay = (
-            calculate_reminder_time(webinar_time, reminder["time"]) - now
-        ).total_seconds()
-
-        if delay <= 0:
-            print(f"⏭ Пропущено: '{reminder['label']}' (устарело)")
-            continue
+    cancelled = job_scheduler.cancel_prefix(REMINDER_JOB_PREFIX, keep=wanted)
+    print(
+        f"⏳ Событий: {len(events)}, активных напоминаний: {len(wanted)} "
+        f"(новых {planned}, отменено {cancelled})"
+    )
 
-        print(f"⏳ Напоминание '{reminder['label']}' через {delay:.0f} сек")
-        await asyncio.sleep(delay)
 
-        await update_user_block_status(bot)
+def make_reminder_handler(bot: Bot):
+    async def send_reminder(payload: dict):
+        # Статусы не перепроверяем заранее: недоступность выясняется по ходу рассылки
+        event_id = payload.get("event_id", DEFAULT_EVENT_ID)
         sent = await send_reminder_to_users(
-            bot, reminder["text"], bool(reminder.get("last"))
+            bot, payload["text"], payload["last"], event_id
         )
+        print(f"📬 '{payload['label']}' ({event_id}) отправлено {sent} пользователям.")
 
-        print(f"📬 '{reminder['label']}' отправлено {sent} пользователям.")
-        now = datetime.now(get_timezone())
+    return send_reminder
 
 
 async def schedule_periodic_task(bot: Bot, interval: int = 10):
@@ -48,11 +92,14 @@ async def schedule_periodic_task(bot: Bot, interval: int = 10):
 
 
 async def start_reminders(bot: Bot):
-    scheduler.add_task("webinar_reminder", schedule_webinar_reminder, bot)
+    job_scheduler.register("reminder", make_reminder_handler(bot))
+    job_scheduler.start()
+    await schedule_webinar_reminder(bot)
     scheduler.add_task("periodic_task", schedule_periodic_task, bot, 86400)
 
 
 async def stop_reminders():
+    job_scheduler.cancel_prefix(REMINDER_JOB_PREFIX)
     await scheduler.stop_all()
 
 
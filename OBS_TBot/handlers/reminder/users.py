@@ -1,65 +1,101 @@
-import asyncio
+import time
 from aiogram import Bot
-from aiogram.utils.exceptions import BotBlocked, ChatNotFound, UserDeactivated
-from ..google_sheets import send_data_to_google_sheets
-from ..file_reader import save_json, load_json, get_webinar_link
+from ..sheets_queue import sheets_writer
+from ..events import DEFAULT_EVENT_ID, get_event, load_events
+from ..storage import repository
+from .broadcast import broadcast, SENT
+from .availability import is_fresh, mark, probe_users, learn_from_results
 
 
-async def update_user_block_status(bot: Bot):
-    users = load_json("data/users.json", [])
-    if not users:
+async def _save_checked(checked: list, changed: list, event_id: str):
+    """
+    Сохраняет время проверки (checked) в репозиторий; в таблицу уходят
+    только записи с изменившимся статусом (changed — их подмножество).
+    """
+    if checked:
+        await repository.run(repository.update_registrations, event_id, checked)
+    if changed:
+        sheets_writer.enqueue(changed)
+
+
+async def update_user_block_status(bot: Bot, force: bool = False):
+    """
+    Проверяет доступность пользователей всех событий, чей статус устарел
+    (старше PROBE_TTL). Пользователи, проверенные недавно или получившие
+    рассылку, пропускаются; записанный на несколько событий проверяется один раз.
+    """
+    registrations = {}
+    for event in load_events():
+        event_id = event["event_id"]
+        users = await repository.run(repository.registrations, event_id)
+        if users:
+            registrations[event_id] = users
+
+    if not registrations:
         print("📭 Нет пользователей для обновления статуса.")
         return
 
-    updated_count = 0
-    for user in users:
-        user_id = user.get("user_id")
-        if not user_id:
-            continue
-
-        try:
-            await bot.send_chat_action(user_id, "choose_sticker")
-            user["available"] = True
-            print(f"✅ Доступен: {user_id}")
-        except (BotBlocked, ChatNotFound, UserDeactivated) as e:
-            user["available"] = False
-            print(f"❌ Не доступен: {user_id} | {e}")
-        except Exception as e:
-            print(f"⚠️ Ошибка {user_id}: {type(e).__name__}: {e}")
-            continue
-
-        updated_count += 1
-        await asyncio.sleep(0.05)
-
-    try:
-        send_data_to_google_sheets(users)
-    except Exception as e:
-        print(f"⚠️ Ошибка отправки в Google Sheets: {e}")
-
-    save_json("data/users.json", users, [])
-    print(f"📊 Статус обновлён для {updated_count} пользователей.")
-
-
-async def send_reminder_to_users(bot: Bot, text: str, include_link: bool = False):
-    users = load_json("data/users.json", [])
+    stale_ids = {
+        u["user_id"]
+        for users in registrations.values()
+        for u in users
+        if u.get("user_id") and (force or not is_fresh(u))
+    }
+    if not stale_ids:
+        print("✅ Статусы всех пользователей актуальны.")
+        return
+
+    results = await probe_users(bot, stale_ids)
+
+    now = time.time()
+    changed_total = 0
+    for event_id, users in registrations.items():
+        checked, changed = [], []
+        for user in users:
+            available = results.get(user.get("user_id"))
+            if available is None:
+                continue
+            mark(user, now)
+            checked.append(user)
+            if user.get("available") != available:
+                user["available"] = available
+                changed.append(user)
+        await _save_checked(checked, changed, event_id)
+        changed_total += len(changed)
+
+    print(
+        f"📊 Статус обновлён для {len(results)} пользователей, изменился у {changed_total}."
+    )
+
+
+async def send_reminder_to_users(
+    bot: Bot, text: str, include_link: bool = False, event_id: str = DEFAULT_EVENT_ID
+):
+    event = get_event(event_id)
+    if event is None:
+        print(f"📭 Событие '{event_id}' не найдено, рассылка отменена.")
+        return 0
+
+    users = await repository.run(repository.registrations, event_id)
     if not users:
-        print("📭 Нет пользователей для рассылки.")
+        print(f"📭 Нет пользователей для рассылки ({event_id}).")
         return 0
 
-    sent_count = 0
-    full_text = text + (get_webinar_link() if include_link else "")
-
-    for user in users:
-        user_id = user.get("user_id")
-        if not user_id or not user.get("available", False):
-            continue
-
-        try:
-            await bot.send_message(user_id, full_text, parse_mode="HTML")
-            print(f"✅ Отправлено: {user_id}")
-            sent_count += 1
-        except Exception as e:
-            print(f"❌ Ошибка отправки {user_id}: {e}")
-        await asyncio.sleep(0.05)
+    full_text = text + (event["link"] if include_link else "")
+    # Пользователям с устаревшим статусом тоже отправляем: сама рассылка
+    # и служит проверкой доступности
+    recipients = [
+        user["user_id"]
+        for user in users
+        if user.get("user_id") and (user.get("available", False) or not is_fresh(user))
+    ]
+
+    results = await broadcast(bot, recipients, full_text, parse_mode="HTML")
+    await _save_checked(*learn_from_results(users, results), event_id)
+
+    sent_count = sum(1 for status in results.values() if status == SENT)
+    failed = len(results) - sent_count
+    if failed:
+        print(f"❌ Не доставлено {failed} пользователям ({event_id}).")
 
     return sent_count
@@ -0,0 +1,147 @@
+# handlers/russian_stemmer.py
+"""
+Стеммер русского языка по алгоритму Snowball (Porter):
+https://snowballstem.org/algorithms/russian/stemmer.html
+"""
+
+import re
+from functools import lru_cache
+
+VOWELS = "аеиоуыэюя"
+
+PERFECTIVE_GERUND_1 = ("вшись", "вши", "в")  # после а/я
+PERFECTIVE_GERUND_2 = ("ившись", "ывшись", "ивши", "ывши", "ив", "ыв")
+
+ADJECTIVE = (
+    "ими", "ыми", "его", "ого", "ему", "ому",
+    "ее", "ие", "ые", "ое", "ей", "ий", "ый", "ой", "ем", "им", "ым", "ом",
+    "их", "ых", "ую", "юю", "ая", "яя", "ою", "ею",
+)  # fmt: skip
+PARTICIPLE_1 = ("ем", "нн", "вш", "ющ", "щ")  # после а/я
+PARTICIPLE_2 = ("ивш", "ывш", "ующ")
+
+REFLEXIVE = ("ся", "сь")
+
+VERB_1 = (
+    "ете", "йте", "ешь", "нно",
+    "ла", "на", "ли", "ем", "ло", "но", "ет", "ют", "ны", "ть",
+    "й", "л", "н",
+)  # fmt: skip; после а/я
+VERB_2 = (
+    "ейте", "уйте",
+    "ила", "ыла", "ена", "ите", "или", "ыли", "ило", "ыло", "ено", "ует",
+    "уют", "ены", "ить", "ыть", "ишь",
+    "ей", "уй", "ил", "ыл", "им", "ым", "ен", "ят", "ит", "ыт", "ую",
+    "ю",
+)  # fmt: skip
+
+NOUN = (
+    "иями", "ями", "ами", "ией", "иям", "ием", "иях",
+    "ев", "ов", "ие", "ье", "еи", "ии", "ей", "ой", "ий", "ям", "ем", "ам",
+    "ом", "ах", "ях", "ию", "ью", "ия", "ья",
+    "а", "е", "и", "й", "о", "у", "ы", "ь", "ю", "я",
+)  # fmt: skip
+
+SUPERLATIVE = ("ейше", "ейш")
+DERIVATIONAL = ("ость", "ост")
+
+WORD = re.compile(r"\w+")
+
+
+def _regions(word: str):
+    """Начала областей RV и R2 (индексы в слове)."""
+    rv = len(word)
+    for i, char in enumerate(word):
+        if char in VOWELS:
+            rv = i + 1
+            break
+
+    def next_region(start: int) -> int:
+        for i in range(start + 1, len(word)):
+            if word[i] not in VOWELS and word[i - 1] in VOWELS:
+                return i + 1
+        return len(word)
+
+    r1 = next_region(0)
+    r2 = next_region(r1)
+    return rv, r2
+
+
+def _ending(word: str, start: int, endings, after_a=()) -> int:
+    """
+    Длина самого длинного окончания из endings (или из after_a — тогда
+    перед ним должна стоять а или я), целиком лежащего в области с start;
+    0, если такого нет.
+    """
+    best = 0
+    for ending in after_a:
+        if (
+            len(ending) > best
+            and word.endswith(ending)
+            and len(word) - len(ending) - 1 >= start
+            and word[-len(ending) - 1] in "ая"
+        ):
+            best = len(ending)
+    for ending in endings:
+        if (
+            len(ending) > best
+            and word.endswith(ending)
+            and len(word) - len(ending) >= start
+        ):
+            best = len(ending)
+    return best
+
+
+@lru_cache(maxsize=65536)
+def stem(word: str) -> str:
+    word = word.lower().replace("ё", "е")
+    rv, r2 = _regions(word)
+
+    # Шаг 1
+    cut = _ending(word, rv, PERFECTIVE_GERUND_2, PERFECTIVE_GERUND_1)
+    if cut:
+        word = word[:-cut]
+    else:
+        cut = _ending(word, rv, REFLEXIVE)
+        if cut:
+            word = word[:-cut]
+
+        cut = _ending(word, rv, ADJECTIVE)
+        if cut:
+            word = word[:-cut]
+            cut = _ending(word, rv, PARTICIPLE_2, PARTICIPLE_1)
+            if cut:
+                word = word[:-cut]
+        else:
+            cut = _ending(word, rv, VERB_2, VERB_1)
+            if not cut:
+                cut = _ending(word, rv, NOUN)
+            if cut:
+                word = word[:-cut]
+
+    # Шаг 2
+    if _ending(word, rv, ("и",)):
+        word = word[:-1]
+
+    # Шаг 3
+    cut = _ending(word, r2, DERIVATIONAL)
+    if cut:
+        word = word[:-cut]
+
+    # Шаг 4
+    if _ending(word, rv, ("нн",)):
+        word = word[:-1]
+    else:
+        cut = _ending(word, rv, SUPERLATIVE)
+        if cut:
+            word = word[:-cut]
+            if _ending(word, rv, ("нн",)):
+                word = word[:-1]
+        elif _ending(word, rv, ("ь",)):
+            word = word[:-1]
+    return word
+
+
+def stems(text: str):
+    """Основы всех слов текста (числа и латиница — как есть, в нижнем регистре)."""
+    return [stem(word) for word in WORD.findall(text.lower())]
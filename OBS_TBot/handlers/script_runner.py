@@ -0,0 +1,308 @@
+# handlers/script_runner.py
+import os
+import sys
+import time
+import queue
+import asyncio
+import marshal
+import multiprocessing
+from typing import Any, Dict, Optional, Set, Tuple
+
+from aiogram import types
+
+import script_worker
+from .logger import get_logger
+
+logger = get_logger("script_runner", "script_runner.log")
+
+SCRIPT_WORKERS = 2  # скриптов, выполняемых одновременно (каждый в своём процессе)
+SCRIPT_CONCURRENCY = 1  # одновременных запусков одного скрипта
+SCRIPT_TIMEOUT = 600.0  # секунд на один запуск
+EXIT_GRACE = 5.0  # секунд на завершение процесса после ответа
+PROGRESS_INTERVAL = 3.0  # не чаще редактируем сообщение с прогрессом
+PROGRESS_MAX_LENGTH = 300
+
+
+class ScriptTimeout(Exception):
+    pass
+
+
+class ScriptCrashed(Exception):
+    """Процесс скрипта завершился, не вернув результат (например, был убит)."""
+
+
+def _pool_context():
+    # fork не перезапускает main.py в процессах скриптов (spawn импортировал бы
+    # его заново вместе со всеми хранилищами); на Windows fork недоступен
+    if sys.platform == "win32":
+        return multiprocessing.get_context("spawn")
+    return multiprocessing.get_context("fork")
+
+
+class ScriptRunner:
+    """
+    Запуск скриптов кнопок в отдельных процессах.
+
+    Исходник компилируется один раз на версию файла (mtime/размер) и
+    передаётся процессу в виде marshal-байтов. Каждый запуск получает
+    собственный процесс, поэтому модуль и его вспомогательные модули
+    импортируются заново, как и при прежнем importlib, а зависший скрипт
+    по таймауту убивается один, не задевая чужие запуски. Цикл событий
+    бота не блокируется; одновременно выполняется не больше workers
+    скриптов, а одного скрипта — не больше concurrency запусков.
+    Строки, которые скрипт печатает, показываются в чате как прогресс.
+    Результаты идемпотентных скриптов (cache_ttl > 0) кэшируются.
+    """
+
+    def __init__(
+        self,
+        workers: int = SCRIPT_WORKERS,
+        concurrency: int = SCRIPT_CONCURRENCY,
+        timeout: float = SCRIPT_TIMEOUT,
+    ):
+        self.workers = workers
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self._manager = None
+        self._code: Dict[str, Tuple[Tuple[int, int], bytes]] = {}
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._processes: Set[multiprocessing.process.BaseProcess] = set()
+        # (path, output_type) -> (истекает, результат)
+        self._results: Dict[Tuple[str, str], Tuple[float, Any]] = {}
+
+    # ——— Код и процессы ———
+
+    def compiled(self, path: str) -> bytes:
+        """marshal-байты кода скрипта; перекомпилируется только изменённый файл."""
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = self._code.get(path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        with open(path, "rb") as f:
+            code = compile(f.read(), path, "exec")
+        code_bytes = marshal.dumps(code)
+        self._code[path] = (signature, code_bytes)
+        return code_bytes
+
+    def _progress_queue(self):
+        if self._manager is None:
+            self._manager = _pool_context().Manager()
+        return self._manager.Queue()
+
+    async def _execute(
+        self,
+        module_name: str,
+        path: str,
+        code_bytes: bytes,
+        progress_queue,
+        timeout: float,
+    ) -> Any:
+        """
+        Выполняет скрипт в новом процессе и ждёт ответа не дольше timeout.
+        При таймауте или отмене убивается только этот процесс.
+        """
+        context = _pool_context()
+        receiver, sender = context.Pipe(duplex=False)
+        process = context.Process(
+            target=script_worker.run_in_process,
+            args=(sender, module_name, path, code_bytes, progress_queue),
+            name=f"script-{module_name}",
+            daemon=True,
+        )
+        process.start()
+        # У бота остаётся только читающий конец: EOF — процесс завершился
+        sender.close()
+        self._processes.add(process)
+
+        reply = asyncio.ensure_future(asyncio.to_thread(_receive, receiver))
+        try:
+            done, _ = await asyncio.wait({reply}, timeout=timeout)
+            if not done:
+                raise ScriptTimeout(f"Скрипт выполнялся дольше {timeout:.0f} сек")
+            # Ответив, процесс сразу завершается
+            await asyncio.to_thread(process.join, EXIT_GRACE)
+        finally:
+            self._processes.discard(process)
+            if process.is_alive():
+                process.terminate()
+                logger.warning(f"Процесс скрипта {path} остановлен")
+                # Дожидаемся в фоне, чтобы не оставлять зомби
+                asyncio.get_running_loop().run_in_executor(None, process.join)
+
+        result = reply.result()
+        if result is None:
+            raise ScriptCrashed(
+                f"Процесс скрипта завершился с кодом {process.exitcode} без результата"
+            )
+        status, value = result
+        if status == "error":
+            raise value
+        return value
+
+    def _semaphore(self, path: str) -> asyncio.Semaphore:
+        if path not in self._semaphores:
+            self._semaphores[path] = asyncio.Semaphore(self.concurrency)
+        return self._semaphores[path]
+
+    # ——— Кэш результатов ———
+
+    def _cached_result(self, key: Tuple[str, str]):
+        entry = self._results.get(key)
+        if entry is None:
+            return None
+        expires, result = entry
+        output_missing = key[1] == "file" and not (
+            isinstance(result, str) and os.path.exists(result.strip())
+        )
+        if expires < time.monotonic() or output_missing:
+            self._drop_result(key)
+            return None
+        return result
+
+    def _drop_result(self, key: Tuple[str, str], keep: Any = None):
+        _, result = self._results.pop(key)
+        if result == keep:
+            return  # новый запуск перезаписал тот же файл
+        if (
+            key[1] == "file"
+            and isinstance(result, str)
+            and os.path.exists(result.strip())
+        ):
+            try:
+                os.remove(result.strip())
+            except OSError as e:
+                logger.error(f"Не удалось удалить устаревший результат {result}: {e}")
+
+    def keeps_file(self, file_path: str) -> bool:
+        """True, если файл — закэшированный результат и удалять его после отправки нельзя."""
+        target = os.path.abspath(file_path)
+        return any(
+            key[1] == "file"
+            and isinstance(result, str)
+            and os.path.abspath(result.strip()) == target
+            for key, (_, result) in self._results.items()
+        )
+
+    # ——— Запуск ———
+
+    async def _report_progress(self, progress_queue, message: types.Message):
+        last_text = None
+        while True:
+            await asyncio.sleep(PROGRESS_INTERVAL)
+            line = await asyncio.to_thread(_drain, progress_queue)
+            if line is None:
+                continue
+            text = f"⏳ {line[:PROGRESS_MAX_LENGTH]}"
+            if text == last_text:
+                continue
+            try:
+                await message.edit_text(text)
+                last_text = text
+            except Exception as e:
+                logger.debug(f"Не удалось обновить прогресс: {e}")
+
+    async def run(
+        self,
+        script_path: str,
+        output_type: str = "text",
+        status_message: Optional[types.Message] = None,
+        cache_ttl: float = 0,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """
+        Выполняет main() скрипта в отдельном процессе и возвращает его результат.
+
+        :param status_message: сообщение, в котором показывается прогресс.
+        :param cache_ttl: сколько секунд переиспользовать результат (0 — не кэшировать).
+        :raises FileNotFoundError, AttributeError, ScriptTimeout, ScriptCrashed: как и сам скрипт.
+        """
+        path = os.path.abspath(script_path)
+        key = (path, output_type)
+        if cache_ttl:
+            cached = self._cached_result(key)
+            if cached is not None:
+                logger.info(f"Результат скрипта {path} взят из кэша")
+                return cached
+
+        code_bytes = self.compiled(path)
+        module_name = os.path.splitext(os.path.basename(path))[0]
+
+        semaphore = self._semaphore(path)
+        if semaphore.locked() and status_message is not None:
+            await status_message.edit_text(
+                "⏳ Скрипт уже выполняется, запрос в очереди…"
+            )
+
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)  # внутри работающего цикла
+
+        async with semaphore, self._slots:
+            # Пока ждали очереди, результат мог появиться в кэше
+            if cache_ttl:
+                cached = self._cached_result(key)
+                if cached is not None:
+                    return cached
+
+            progress_queue = None
+            reporter = None
+            if status_message is not None:
+                progress_queue = await asyncio.to_thread(self._progress_queue)
+                reporter = asyncio.create_task(
+                    self._report_progress(progress_queue, status_message)
+                )
+
+            started = time.monotonic()
+            try:
+                result = await self._execute(
+                    module_name,
+                    path,
+                    code_bytes,
+                    progress_queue,
+                    timeout or self.timeout,
+                )
+            finally:
+                if reporter is not None:
+                    reporter.cancel()
+
+            logger.info(
+                f"Скрипт {path} выполнен за {time.monotonic() - started:.1f} сек"
+            )
+            if cache_ttl:
+                if key in self._results:
+                    self._drop_result(key, keep=result)
+                self._results[key] = (time.monotonic() + cache_ttl, result)
+            return result
+
+    def shutdown(self):
+        for process in list(self._processes):
+            if process.is_alive():
+                process.terminate()
+        self._processes.clear()
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+
+def _receive(receiver) -> Optional[Tuple[str, Any]]:
+    """Ответ процесса скрипта или None, если он завершился, ничего не прислав."""
+    try:
+        return receiver.recv()
+    except EOFError:
+        return None
+    finally:
+        receiver.close()
+
+
+def _drain(progress_queue) -> Optional[str]:
+    """Забирает все накопившиеся строки прогресса, возвращает последнюю."""
+    line = None
+    while True:
+        try:
+            line = progress_queue.get_nowait()
+        except queue.Empty:
+            return line
+
+
+script_runner = ScriptRunner()
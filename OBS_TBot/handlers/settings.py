@@ -0,0 +1,153 @@
+# handlers/settings.py
+import os
+import time
+import threading
+from datetime import datetime
+from typing import NamedTuple, Optional, Tuple
+from zoneinfo import ZoneInfo  # работает только с Python 3.9+
+
+from dotenv import dotenv_values
+
+from .logger import get_logger
+
+logger = get_logger("settings", "settings.log")
+
+ENV_FILE = ".env"
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+# .env проверяется на изменения не чаще раза в столько секунд
+CHECK_INTERVAL = 1.0
+
+DEFAULT_TIMEZONE = "Europe/Moscow"
+DEFAULT_WEBINAR_LINK = "https://example.com"
+DEFAULT_WEBINAR_DATETIME = "2025-08-08 11:28:00"
+
+
+class Settings(NamedTuple):
+    """Неизменяемый снимок настроек вебинара."""
+
+    timezone: ZoneInfo
+    webinar_link: str
+    # None, если WEBINAR_DATETIME не разбирается (текст ошибки — в datetime_error)
+    webinar_time: Optional[datetime]
+    datetime_error: Optional[str] = None
+
+
+def _parse(values: dict) -> Settings:
+    tz_name = values.get("TIMEZONE")
+    if not tz_name:
+        print(ValueError("TIMEZONE не указана в .env"))
+        tz_name = DEFAULT_TIMEZONE
+    timezone = ZoneInfo(tz_name)
+
+    link = values.get("WEBINAR_LINK")
+    if not link:
+        print(ValueError("WEBINAR_LINK не указана в .env"))
+        link = DEFAULT_WEBINAR_LINK
+
+    dt_str = values.get("WEBINAR_DATETIME")
+    if not dt_str:
+        print(ValueError("WEBINAR_DATETIME не указана в .env"))
+        dt_str = DEFAULT_WEBINAR_DATETIME
+    try:
+        webinar_time = datetime.strptime(dt_str, DATETIME_FORMAT).replace(
+            tzinfo=timezone
+        )
+        error = None
+    except ValueError as e:
+        webinar_time, error = None, f"Ошибка разбора даты из .env: {e}"
+        logger.error(error)
+
+    return Settings(timezone, link, webinar_time, error)
+
+
+class SettingsService:
+    """
+    Настройки из .env, разобранные один раз в неизменяемый Settings.
+
+    Значения из файла .env важнее переменных окружения процесса (в них .env
+    уже загружен при старте, и правки файла иначе не были бы видны);
+    переменные окружения используются для ключей, которых в файле нет.
+    Снимок перечитывается, только когда меняются mtime или размер .env,
+    и подменяется целиком.
+    """
+
+    KEYS = ("TIMEZONE", "WEBINAR_LINK", "WEBINAR_DATETIME")
+
+    def __init__(self, env_file: str = ENV_FILE):
+        self.env_file = env_file
+        self._lock = threading.Lock()
+        self._settings: Optional[Settings] = None
+        self._signature: Optional[Tuple[int, int]] = None
+        self._checked_at = 0.0
+
+    def _file_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.env_file)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _reload(self, signature: Optional[Tuple[int, int]]):
+        values = {key: os.getenv(key) for key in self.KEYS}
+        if signature is not None:
+            values.update(
+                (key, value)
+                for key, value in dotenv_values(self.env_file).items()
+                if key in self.KEYS and value
+            )
+        self._settings = _parse(values)
+        self._signature = signature
+        logger.info(f"Настройки загружены из {self.env_file}")
+
+    def get(self) -> Settings:
+        with self._lock:
+            now = time.monotonic()
+            if self._settings is not None and now - self._checked_at < CHECK_INTERVAL:
+                return self._settings
+            self._checked_at = now
+            signature = self._file_signature()
+            if self._settings is None or signature != self._signature:
+                self._reload(signature)
+            return self._settings
+
+    def update(self, **values: str) -> Settings:
+        """
+        Атомарно записывает значения в .env (остальные строки сохраняются)
+        и сразу подменяет снимок настроек.
+        """
+        with self._lock:
+            lines = []
+            if os.path.exists(self.env_file):
+                with open(self.env_file, "r", encoding="utf-8") as f:
+                    lines = f.readlines()
+
+            pending = dict(values)
+            new_lines = []
+            for line in lines:
+                key = line.split("=", 1)[0].strip()
+                if "=" in line and key in pending:
+                    new_lines.append(f'{key}="{pending.pop(key)}"\n')
+                else:
+                    new_lines.append(line)
+            if new_lines and not new_lines[-1].endswith("\n"):
+                new_lines[-1] += "\n"
+            new_lines.extend(f'{key}="{value}"\n' for key, value in pending.items())
+
+            tmp_path = f"{self.env_file}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.writelines(new_lines)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.env_file)
+
+            os.environ.update(values)
+            self._reload(self._file_signature())
+            self._checked_at = time.monotonic()
+            return self._settings
+
+
+settings = SettingsService()
+
+
+def get_settings() -> Settings:
+    return settings.get()
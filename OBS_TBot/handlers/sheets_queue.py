@@ -0,0 +1,159 @@
+# handlers/sheets_queue.py
+import asyncio
+from typing import Dict, List, Optional, Union
+
+from .logger import get_logger
+from .file_reader import load_json, save_json_atomic
+from .journal_store import JournaledStore
+from .google_sheets import send_data_to_google_sheets
+from .sheets_sync import record_key
+
+logger = get_logger("google_sheets", "google_sheets.log")
+
+PENDING_FILE = "data/sheets_pending.json"
+FLUSH_SIZE = 50  # сбрасываем сразу, как только накопилось столько пользователей
+FLUSH_INTERVAL = 5.0  # ...или не реже, чем раз в столько секунд
+MAX_RETRY_DELAY = 300.0
+
+
+class SheetsWriteBehind:
+    """
+    Очередь отложенной записи в Google Sheets.
+
+    Обработчики вызывают enqueue() и сразу возвращаются, а фоновая задача
+    собирает записи (последняя запись пользователя в событии побеждает) и отправляет
+    их пачкой в отдельном потоке, чтобы gspread не блокировал цикл событий.
+    Неотправленные записи хранятся в PENDING_FILE и переживают перезапуск:
+    это журналируемое хранилище (JournaledStore), так что enqueue дописывает
+    в журнал только новые записи, а не переписывает всю очередь, даже
+    когда таблица долго недоступна. С диска очередь читается при запуске
+    или первой записи, а не при импорте.
+    """
+
+    def __init__(
+        self,
+        pending_path: str = PENDING_FILE,
+        flush_size: int = FLUSH_SIZE,
+        flush_interval: float = FLUSH_INTERVAL,
+    ):
+        self.pending_path = pending_path
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._store: Optional[JournaledStore] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._retry_delay = flush_interval
+        self._stopping = False
+
+    def _pending(self) -> JournaledStore:
+        """Очередь на диске: {"key": record_key, "record": запись} на пользователя."""
+        if self._store is None:
+            legacy = load_json(self.pending_path, None)
+            if isinstance(legacy, dict):
+                # Прежний формат — словарь record_key -> запись целиком
+                save_json_atomic(
+                    self.pending_path,
+                    [
+                        {"key": record_key(record), "record": record}
+                        for record in legacy.values()
+                    ],
+                )
+            self._store = JournaledStore(self.pending_path, key="key")
+        return self._store
+
+    def enqueue(self, data: Union[dict, List[dict]]):
+        """Ставит записи в очередь на отправку и сразу возвращает управление."""
+        if isinstance(data, dict):
+            data = [data]
+        pending = self._pending()
+        try:
+            pending.put_many(
+                [{"key": record_key(record), "record": record} for record in data]
+            )
+        except OSError as e:
+            logger.error(f"Не удалось сохранить очередь Google Sheets: {e}")
+
+        if self._wake is not None and len(pending) >= self.flush_size:
+            self._wake.set()
+
+    def pending(self) -> int:
+        return len(self._pending())
+
+    async def flush(self) -> bool:
+        """Отправляет всё накопленное. Возвращает True, если очередь пуста."""
+        pending = self._pending()
+        if not len(pending):
+            return True
+
+        batch: Dict[str, dict] = {item["key"]: item["record"] for item in pending.all()}
+        result = await asyncio.to_thread(
+            send_data_to_google_sheets, list(batch.values())
+        )
+        if result != "success":
+            logger.warning(
+                f"Google Sheets недоступна ({result}), в очереди {len(batch)} записей"
+            )
+            return False
+
+        # Запись могла обновиться, пока шла отправка — тогда оставляем новую
+        sent = [
+            key
+            for key, record in batch.items()
+            if (pending.get(key) or {}).get("record") == record
+        ]
+        try:
+            await asyncio.to_thread(pending.delete_many, sent)
+        except OSError as e:
+            logger.error(f"Не удалось сохранить очередь Google Sheets: {e}")
+        return not len(pending)
+
+    async def _run(self):
+        # Флаг, а не только отмена: wait_for, разбуженный в момент отмены,
+        # возвращает результат и отмену проглатывает
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self._retry_delay)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+            try:
+                ok = await self.flush()
+            except Exception as e:
+                logger.exception(f"Ошибка фоновой отправки в Google Sheets: {e}")
+                ok = False
+
+            # При ошибках увеличиваем паузу, чтобы не долбить недоступный API
+            if ok:
+                self._retry_delay = self.flush_interval
+            else:
+                self._retry_delay = min(MAX_RETRY_DELAY, self._retry_delay * 2)
+
+    def start(self):
+        """Запускает фоновую задачу (вызывать из работающего цикла событий)."""
+        if self._task is not None and not self._task.done():
+            return
+        self._stopping = False
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        if self.pending():
+            logger.info(f"В очереди Google Sheets {self.pending()} записей")
+            self._wake.set()
+
+    async def stop(self):
+        """Останавливает фоновую задачу, пытаясь напоследок всё отправить."""
+        self._stopping = True
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Не удалось отправить очередь при остановке: {e}")
+
+
+sheets_writer = SheetsWriteBehind()
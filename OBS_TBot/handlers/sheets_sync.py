@@ -0,0 +1,185 @@
+# handlers/sheets_sync.py
+import threading
+from typing import Dict, List, Optional, Union
+
+from gspread.utils import rowcol_to_a1
+
+from .logger import get_logger
+from .file_reader import load_json, save_json_atomic
+
+logger = get_logger("google_sheets", "google_sheets.log")
+
+ROW_CACHE_FILE = "data/sheets_rows.json"
+# На сколько строк расширять лист, когда новые записи выходят за его границы
+GROW_ROWS = 1000
+
+
+def record_key(record: dict) -> str:
+    """
+    Ключ строки листа: user_id для вебинара по умолчанию и
+    "<event_id>:<user_id>" для регистраций на остальные события.
+    """
+    event_id = record.get("event_id")
+    uid = str(record.get("user_id"))
+    return f"{event_id}:{uid}" if event_id else uid
+
+
+class SheetsSync:
+    """
+    Дельта-синхронизация записей пользователей с листом Google Sheets.
+
+    Хранит на диске кэш user_id -> {номер строки, последние отправленные
+    значения}. Изменённые записи помечаются «грязными» через mark(), а flush()
+    отправляет только их одним запросом worksheet.batch_update. Полное
+    чтение листа выполняется лишь один раз — когда кэша ещё нет или он
+    относится к другому листу.
+    """
+
+    def __init__(self, fields: List[str], cache_path: str = ROW_CACHE_FILE):
+        self.fields = fields
+        self.cache_path = cache_path
+        self._lock = threading.Lock()
+        self._dirty: Dict[str, list] = {}
+        cache = load_json(cache_path, {}) or {}
+        self._sheet_key: Optional[str] = cache.get("sheet")
+        self._next_row: int = cache.get("next_row", 0)
+        self._rows: Dict[str, dict] = cache.get("rows", {})
+
+    # ——— Кэш ———
+
+    def _save_cache(self):
+        save_json_atomic(
+            self.cache_path,
+            {"sheet": self._sheet_key, "next_row": self._next_row, "rows": self._rows},
+        )
+
+    def invalidate(self):
+        """Сбрасывает кэш строк — при следующем flush лист будет перечитан."""
+        with self._lock:
+            self._sheet_key = None
+            self._rows = {}
+            self._next_row = 0
+
+    def _bootstrap(self, worksheet, sheet_key: str):
+        values = worksheet.get_all_values()
+        if not values:
+            worksheet.update([self.fields], "A1")
+            values = [self.fields]
+
+        header = values[0]
+        if len(header) < len(self.fields) and header == self.fields[: len(header)]:
+            # В листе ещё нет новых колонок (например, event_id) — дописываем заголовок
+            worksheet.update([self.fields], "A1")
+            header = self.fields
+
+        def column(name):
+            return header.index(name) if name in header else None
+
+        id_col = column("user_id") or 0
+        event_col = column("event_id")
+        rows = {}
+        for i, row in enumerate(values[1:], start=2):
+            record = {
+                "user_id": row[id_col] if id_col < len(row) else "",
+                "event_id": (
+                    row[event_col]
+                    if event_col is not None and event_col < len(row)
+                    else ""
+                ),
+            }
+            if record["user_id"]:
+                rows[record_key(record)] = {
+                    "row": i,
+                    "values": row[: len(self.fields)],
+                }
+
+        self._sheet_key = sheet_key
+        self._rows = rows
+        self._next_row = len(values) + 1
+        logger.info(f"Кэш строк Google Sheets построен: {len(rows)} записей")
+
+    # ——— Синхронизация ———
+
+    def _row_values(self, record: dict) -> list:
+        return [record.get(f, "") for f in self.fields]
+
+    def mark(self, data: Union[dict, List[dict]]) -> int:
+        """
+        Помечает записи для отправки. Записи, совпадающие с уже отправленными,
+        пропускаются. Возвращает число помеченных записей.
+        """
+        if isinstance(data, dict):
+            data = [data]
+        marked = 0
+        with self._lock:
+            for record in data:
+                uid = record_key(record)
+                values = self._row_values(record)
+                cached = self._rows.get(uid)
+                if cached is not None and cached["values"] == values:
+                    self._dirty.pop(uid, None)
+                    continue
+                self._dirty[uid] = values
+                marked += 1
+        return marked
+
+    def pending(self) -> int:
+        return len(self._dirty)
+
+    def flush(self, worksheet) -> int:
+        """
+        Отправляет все грязные записи одним batch_update.
+        При ошибке записи остаются грязными и будут отправлены при следующем flush.
+        Возвращает число отправленных строк.
+        """
+        with self._lock:
+            if not self._dirty:
+                return 0
+
+            sheet_key = f"{worksheet.spreadsheet_id}:{worksheet.id}"
+            if self._sheet_key != sheet_key:
+                self._bootstrap(worksheet, sheet_key)
+                # После перечитывания часть записей может оказаться неизменной
+                self._dirty = {
+                    uid: values
+                    for uid, values in self._dirty.items()
+                    if self._rows.get(uid, {}).get("values") != values
+                }
+                if not self._dirty:
+                    self._save_cache()
+                    return 0
+
+            next_row = self._next_row
+            placement = {}
+            for uid in self._dirty:
+                if uid in self._rows:
+                    placement[uid] = self._rows[uid]["row"]
+                else:
+                    placement[uid] = next_row
+                    next_row += 1
+
+            if next_row - 1 > worksheet.row_count:
+                worksheet.add_rows(max(GROW_ROWS, next_row - 1 - worksheet.row_count))
+
+            last_col = len(self.fields)
+            data = [
+                {
+                    "range": f"{rowcol_to_a1(row, 1)}:{rowcol_to_a1(row, last_col)}",
+                    "values": [self._dirty[uid]],
+                }
+                for uid, row in placement.items()
+            ]
+            worksheet.batch_update(data)
+
+            for uid, row in placement.items():
+                self._rows[uid] = {"row": row, "values": self._dirty[uid]}
+            sent = len(self._dirty)
+            new_rows = next_row - self._next_row
+            self._next_row = next_row
+            self._dirty = {}
+            self._save_cache()
+
+        logger.info(
+            f"Google Sheets: отправлено {sent} строк ({new_rows} новых) одним запросом"
+        )
+        return sent
@@ -0,0 +1,21 @@
+# handlers/storage/__init__.py
+import os
+
+from .base import Repository
+from .json_backend import JsonRepository
+from .sqlite_backend import SQLiteRepository, STORAGE_DB
+
+# STORAGE_BACKEND=json (по умолчанию) или sqlite; STORAGE_DB — путь к базе
+BACKENDS = ("json", "sqlite")
+
+
+def create_repository(backend: str = None) -> Repository:
+    backend = (backend or os.getenv("STORAGE_BACKEND") or "json").lower()
+    if backend == "sqlite":
+        return SQLiteRepository(os.getenv("STORAGE_DB") or STORAGE_DB)
+    if backend != "json":
+        raise ValueError(f"Неизвестное хранилище STORAGE_BACKEND={backend}")
+    return JsonRepository()
+
+
+repository = create_repository()
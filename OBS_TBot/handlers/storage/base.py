@@ -0,0 +1,90 @@
+# handlers/storage/base.py
+import asyncio
+import functools
+from typing import List, Optional
+
+
+class Repository:
+    """
+    Единый интерфейс хранилища состояния бота.
+
+    Регистрации на события (ключ — event_id + user_id), справочник всех
+    пользователей бота (ключ — id, поиск по username) и таблица заданий
+    JobScheduler (ключ — id задания). Методы синхронные;
+    обработчики вызывают их (и обёртки над ними) только через run(),
+    который выполняет их вне цикла событий.
+    """
+
+    # ——— Регистрации ———
+
+    def registrations(self, event_id: str) -> List[dict]:
+        """Регистрации события в порядке записи."""
+        raise NotImplementedError
+
+    def add_registration(self, event_id: str, record: dict) -> bool:
+        """Добавляет регистрацию. False, если пользователь уже записан."""
+        raise NotImplementedError
+
+    def update_registrations(self, event_id: str, records: List[dict]) -> int:
+        """Обновляет только существующие регистрации, возвращает число изменённых."""
+        raise NotImplementedError
+
+    def replace_registrations(self, event_id: str, records: List[dict]):
+        """Полностью заменяет регистрации события."""
+        raise NotImplementedError
+
+    # ——— Пользователи бота ———
+
+    def get_user(self, user_id: int) -> Optional[dict]:
+        raise NotImplementedError
+
+    def find_user_by_username(self, username: str) -> Optional[dict]:
+        raise NotImplementedError
+
+    def all_users(self) -> List[dict]:
+        raise NotImplementedError
+
+    def add_user(self, user_id: int, username: str) -> bool:
+        """Добавляет пользователя (True, если он новый); сменившийся никнейм обновляется."""
+        raise NotImplementedError
+
+    def replace_users(self, users: List[dict]):
+        raise NotImplementedError
+
+    def set_admin(self, user_id: int, admin: bool) -> bool:
+        """Меняет флаг админа. False, если пользователя нет или флаг уже такой."""
+        raise NotImplementedError
+
+    def is_admin(self, user_id: int) -> bool:
+        user = self.get_user(user_id)
+        return bool(user and user.get("admin", False))
+
+    # ——— Задания планировщика ———
+
+    def jobs(self) -> List[dict]:
+        """Все задания JobScheduler (записи-словари с ключом id)."""
+        raise NotImplementedError
+
+    def put_job(self, job: dict):
+        """Добавляет или заменяет задание."""
+        raise NotImplementedError
+
+    def delete_jobs(self, job_ids: List[str]) -> int:
+        """Удаляет задания, возвращает число удалённых."""
+        raise NotImplementedError
+
+    def replace_jobs(self, jobs: List[dict]):
+        """Полностью заменяет таблицу заданий."""
+        raise NotImplementedError
+
+    # ——— Жизненный цикл ———
+
+    def init(self):
+        """Подготавливает хранилище при старте бота."""
+
+    def close(self):
+        """Освобождает ресурсы хранилища."""
+
+    async def run(self, method, *args, **kwargs):
+        """Выполняет метод хранилища в рабочем потоке, не блокируя цикл событий."""
+        return await asyncio.to_thread(functools.partial(method, *args, **kwargs))
@@ -0,0 +1,195 @@
+# handlers/storage/json_backend.py
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from ..events import registrations_path
+from ..file_reader import load_json, save_json_atomic
+from ..journal_store import JournaledStore
+from .base import Repository
+
+ALL_USERS_FILE = "data/all_users.json"
+JOBS_FILE = "data/jobs.json"
+
+
+class RegistrationStore(JournaledStore):
+    """Журналируемое хранилище регистраций с индексом user_id -> запись."""
+
+    def __init__(self, path: str):
+        super().__init__(path, key="user_id")
+
+
+class UserDirectory:
+    """
+    Справочник всех пользователей бота (all_users.json) в памяти.
+
+    Записи проиндексированы по id и по username, так что проверка прав
+    и поиск по никнейму не разбирают файл. Каждое изменение сразу атомарно
+    записывается на диск. Если файл поменяли вручную (например, назначили
+    первого админа), справочник перечитывает его по изменившемуся mtime.
+    """
+
+    def __init__(self, path: str = ALL_USERS_FILE):
+        self.path = path
+        self._lock = threading.RLock()
+        self._users: List[dict] = []
+        self._by_id: Dict[int, dict] = {}
+        self._by_username: Dict[str, dict] = {}
+        self._signature: Optional[Tuple[int, int]] = None
+
+    def _file_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _reindex(self):
+        self._by_id = {u["id"]: u for u in self._users}
+        self._by_username = {u["username"]: u for u in self._users if u.get("username")}
+
+    def _refresh(self):
+        signature = self._file_signature()
+        if signature is not None and signature == self._signature:
+            return
+        self._users = load_json(self.path, []) or []
+        self._signature = signature
+        self._reindex()
+
+    def _save(self):
+        save_json_atomic(self.path, self._users, indent=4)
+        self._signature = self._file_signature()
+
+    def init(self):
+        """Создаёт пустой файл, если его нет, и загружает справочник."""
+        with self._lock:
+            if not os.path.exists(self.path):
+                self._users = []
+                self._save()
+            self._refresh()
+
+    def all(self) -> List[dict]:
+        with self._lock:
+            self._refresh()
+            return [dict(u) for u in self._users]
+
+    def get(self, user_id: int) -> Optional[dict]:
+        with self._lock:
+            self._refresh()
+            user = self._by_id.get(user_id)
+            return dict(user) if user else None
+
+    def find_by_username(self, username: str) -> Optional[dict]:
+        with self._lock:
+            self._refresh()
+            user = self._by_username.get(username)
+            return dict(user) if user else None
+
+    def add(self, user_id: int, username: str) -> bool:
+        """Добавляет пользователя. Сменившийся никнейм обновляется в справочнике."""
+        with self._lock:
+            self._refresh()
+            user = self._by_id.get(user_id)
+            if user is None:
+                self._users.append(
+                    {"id": user_id, "username": username, "admin": False}
+                )
+            elif username and user.get("username") != username:
+                user["username"] = username
+            else:
+                return False
+            self._reindex()
+            self._save()
+            return user is None
+
+    def replace(self, users: List[dict]):
+        with self._lock:
+            self._users = [dict(u) for u in users]
+            self._reindex()
+            self._save()
+
+    def set_admin(self, user_id: int, admin: bool) -> bool:
+        with self._lock:
+            self._refresh()
+            user = self._by_id.get(user_id)
+            if user is None or user.get("admin", False) == admin:
+                return False
+            user["admin"] = admin
+            self._save()
+            return True
+
+
+class JsonRepository(Repository):
+    """
+    Хранилище на JSON файлах: регистрации каждого события — журналируемый
+    файл (см. registrations_path), пользователи бота — data/all_users.json,
+    задания планировщика — журналируемый data/jobs.json (открывается при
+    первом обращении).
+    """
+
+    def __init__(self, users_path: str = ALL_USERS_FILE, jobs_path: str = JOBS_FILE):
+        self._stores: Dict[str, RegistrationStore] = {}
+        self._stores_lock = threading.Lock()
+        self.users = UserDirectory(users_path)
+        self.jobs_path = jobs_path
+        self._jobs: Optional[JournaledStore] = None
+
+    def store(self, event_id: str) -> RegistrationStore:
+        """Общий экземпляр хранилища регистраций события."""
+        key = os.path.abspath(registrations_path(event_id))
+        with self._stores_lock:
+            store = self._stores.get(key)
+            if store is None:
+                store = self._stores[key] = RegistrationStore(key)
+            return store
+
+    def registrations(self, event_id: str) -> List[dict]:
+        return self.store(event_id).all()
+
+    def add_registration(self, event_id: str, record: dict) -> bool:
+        return self.store(event_id).add(record)
+
+    def update_registrations(self, event_id: str, records: List[dict]) -> int:
+        return self.store(event_id).update(records)
+
+    def replace_registrations(self, event_id: str, records: List[dict]):
+        self.store(event_id).replace_all(records or [])
+
+    def get_user(self, user_id: int) -> Optional[dict]:
+        return self.users.get(user_id)
+
+    def find_user_by_username(self, username: str) -> Optional[dict]:
+        return self.users.find_by_username(username)
+
+    def all_users(self) -> List[dict]:
+        return self.users.all()
+
+    def add_user(self, user_id: int, username: str) -> bool:
+        return self.users.add(user_id, username)
+
+    def replace_users(self, users: List[dict]):
+        self.users.replace(users)
+
+    def set_admin(self, user_id: int, admin: bool) -> bool:
+        return self.users.set_admin(user_id, admin)
+
+    def jobs_store(self) -> JournaledStore:
+        with self._stores_lock:
+            if self._jobs is None:
+                self._jobs = JournaledStore(self.jobs_path, key="id")
+            return self._jobs
+
+    def jobs(self) -> List[dict]:
+        return self.jobs_store().all()
+
+    def put_job(self, job: dict):
+        self.jobs_store().put(job)
+
+    def delete_jobs(self, job_ids: List[str]) -> int:
+        return self.jobs_store().delete_many(job_ids)
+
+    def replace_jobs(self, jobs: List[dict]):
+        self.jobs_store().replace_all(jobs or [])
+
+    def init(self):
+        self.users.init()
@@ -0,0 +1,74 @@
+# handlers/storage/migrate.py
+"""
+Перенос состояния бота из JSON файлов в SQLite.
+
+Запуск из каталога бота:
+    python -m handlers.storage.migrate [--db data/bot.db]
+
+Импортируются регистрации всех событий (включая журналы, оставшиеся после
+аварийного завершения), справочник all_users.json и таблица заданий
+планировщика jobs.json. Повторный запуск
+перезаписывает данные в базе, так что миграцию можно безопасно повторять.
+"""
+
+import argparse
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from ..events import REGISTRATIONS_DIR, load_events
+from .json_backend import JsonRepository
+from .sqlite_backend import SQLiteRepository, STORAGE_DB
+
+
+def _event_ids() -> list:
+    event_ids = [event["event_id"] for event in load_events()]
+    # Регистрации событий, уже удалённых из каталога, тоже переносим
+    for path in sorted(Path(REGISTRATIONS_DIR).glob("*.json")):
+        if path.stem not in event_ids:
+            event_ids.append(path.stem)
+    return event_ids
+
+
+def migrate(db_path: str = STORAGE_DB) -> dict:
+    """Копирует JSON хранилище в SQLite. Возвращает число записей по таблицам."""
+    source = JsonRepository()
+    target = SQLiteRepository(db_path)
+    counts = {"registrations": 0, "users": 0, "jobs": 0}
+    try:
+        for event_id in _event_ids():
+            records = source.registrations(event_id)
+            target.replace_registrations(event_id, records)
+            counts["registrations"] += len(records)
+            print(f"📥 {event_id}: {len(records)} регистраций")
+
+        users = source.all_users()
+        target.replace_users(users)
+        counts["users"] = len(users)
+        print(f"📥 Пользователей бота: {len(users)}")
+
+        jobs = source.jobs()
+        target.replace_jobs(jobs)
+        counts["jobs"] = len(jobs)
+        print(f"📥 Заданий планировщика: {len(jobs)}")
+    finally:
+        target.close()
+    return counts
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--db", default=STORAGE_DB, help="путь к базе SQLite")
+    args = parser.parse_args()
+
+    counts = migrate(args.db)
+    print(
+        f"✅ Перенесено в {args.db}: {counts['registrations']} регистраций, "
+        f"{counts['users']} пользователей, {counts['jobs']} заданий. "
+        f"Включите STORAGE_BACKEND=sqlite в .env."
+    )
+
+
+if __name__ == "__main__":
+    main()
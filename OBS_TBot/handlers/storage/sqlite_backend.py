@@ -0,0 +1,298 @@
+# handlers/storage/sqlite_backend.py
+import json
+import asyncio
+import sqlite3
+import functools
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from ..events import DEFAULT_EVENT_ID
+from ..logger import get_logger
+from .base import Repository
+
+logger = get_logger("storage", "storage.log")
+
+STORAGE_DB = "data/bot.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS registrations (
+    event_id TEXT NOT NULL,
+    user_id INTEGER NOT NULL,
+    registered_at TEXT,
+    available INTEGER NOT NULL DEFAULT 1,
+    extra TEXT,
+    UNIQUE (event_id, user_id)
+);
+CREATE INDEX IF NOT EXISTS idx_registrations_user_id ON registrations (user_id);
+
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY,
+    username TEXT,
+    admin INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_users_username ON users (username);
+
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    run_at REAL NOT NULL,
+    job TEXT NOT NULL
+);
+"""
+
+# Запросы — константы с параметрами: sqlite3 кэширует их подготовленными
+SELECT_REGISTRATIONS = (
+    "SELECT event_id, user_id, registered_at, available, extra "
+    "FROM registrations WHERE event_id = ? ORDER BY rowid"
+)
+INSERT_REGISTRATION = (
+    "INSERT OR IGNORE INTO registrations "
+    "(event_id, user_id, registered_at, available, extra) VALUES (?, ?, ?, ?, ?)"
+)
+UPDATE_REGISTRATION = (
+    "UPDATE registrations SET registered_at = ?, available = ?, extra = ? "
+    "WHERE event_id = ? AND user_id = ? "
+    "AND (registered_at IS NOT ? OR available IS NOT ? OR extra IS NOT ?)"
+)
+DELETE_REGISTRATIONS = "DELETE FROM registrations WHERE event_id = ?"
+
+SELECT_USER = "SELECT id, username, admin FROM users WHERE id = ?"
+SELECT_USER_BY_USERNAME = (
+    "SELECT id, username, admin FROM users WHERE username = ? ORDER BY id LIMIT 1"
+)
+SELECT_USERS = "SELECT id, username, admin FROM users ORDER BY rowid"
+INSERT_USER = "INSERT OR IGNORE INTO users (id, username, admin) VALUES (?, ?, ?)"
+RENAME_USER = "UPDATE users SET username = ? WHERE id = ? AND username IS NOT ?"
+SET_ADMIN = "UPDATE users SET admin = ? WHERE id = ? AND admin != ?"
+
+# Задание целиком хранится в JSON (job); status и run_at — для выборок вручную
+SELECT_JOBS = "SELECT job FROM jobs ORDER BY run_at"
+PUT_JOB = "INSERT OR REPLACE INTO jobs (id, status, run_at, job) VALUES (?, ?, ?, ?)"
+DELETE_JOB = "DELETE FROM jobs WHERE id = ?"
+
+_REGISTRATION_FIELDS = ("user_id", "registered_at", "available", "event_id")
+
+
+def _registration_row(event_id: str, record: dict) -> tuple:
+    extra = {k: v for k, v in record.items() if k not in _REGISTRATION_FIELDS}
+    return (
+        event_id,
+        record["user_id"],
+        record.get("registered_at"),
+        int(bool(record.get("available", True))),
+        json.dumps(extra, ensure_ascii=False) if extra else None,
+    )
+
+
+def _registration_record(row: sqlite3.Row) -> dict:
+    # Форма записи совпадает с JSON хранилищем: event_id только у
+    # регистраций не на событие по умолчанию
+    record = {
+        "user_id": row["user_id"],
+        "registered_at": row["registered_at"],
+        "available": bool(row["available"]),
+    }
+    if row["event_id"] != DEFAULT_EVENT_ID:
+        record["event_id"] = row["event_id"]
+    if row["extra"]:
+        record.update(json.loads(row["extra"]))
+    return record
+
+
+def _job_row(job: dict) -> tuple:
+    return (
+        job["id"],
+        job["status"],
+        job["run_at"],
+        json.dumps(job, ensure_ascii=False),
+    )
+
+
+def _user_record(row: Optional[sqlite3.Row]) -> Optional[dict]:
+    if row is None:
+        return None
+    return {"id": row["id"], "username": row["username"], "admin": bool(row["admin"])}
+
+
+class SQLiteRepository(Repository):
+    """
+    Хранилище в SQLite (режим WAL, индексы по user_id и username).
+
+    Соединение принадлежит единственному рабочему потоку: все запросы
+    выполняются в нём по очереди, синхронные вызовы ждут результата,
+    а run() отдаёт операцию потоку без блокировки цикла событий.
+    """
+
+    def __init__(self, path: str = STORAGE_DB):
+        self.path = path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+        self._thread_id: Optional[int] = None
+        self._conn: Optional[sqlite3.Connection] = None
+        self._call(self._connect)
+
+    def _connect(self):
+        self._thread_id = threading.get_ident()
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, cached_statements=128)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        self._conn = conn
+        logger.info(f"SQLite хранилище открыто: {self.path}")
+
+    def _call(self, func, *args):
+        if threading.get_ident() == self._thread_id:
+            return func(*args)
+        return self._executor.submit(func, *args).result()
+
+    async def run(self, method, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(method, *args, **kwargs)
+        )
+
+    # ——— Регистрации ———
+
+    def registrations(self, event_id: str) -> List[dict]:
+        def query():
+            rows = self._conn.execute(SELECT_REGISTRATIONS, (event_id,))
+            return [_registration_record(row) for row in rows]
+
+        return self._call(query)
+
+    def add_registration(self, event_id: str, record: dict) -> bool:
+        def query():
+            with self._conn:
+                cursor = self._conn.execute(
+                    INSERT_REGISTRATION, _registration_row(event_id, record)
+                )
+            return cursor.rowcount > 0
+
+        return self._call(query)
+
+    def update_registrations(self, event_id: str, records: List[dict]) -> int:
+        def query():
+            params = []
+            for record in records:
+                _, user_id, registered_at, available, extra = _registration_row(
+                    event_id, record
+                )
+                params.append(
+                    (registered_at, available, extra, event_id, user_id)
+                    + (registered_at, available, extra)
+                )
+            with self._conn:
+                cursor = self._conn.executemany(UPDATE_REGISTRATION, params)
+            return max(cursor.rowcount, 0)
+
+        return self._call(query) if records else 0
+
+    def replace_registrations(self, event_id: str, records: List[dict]):
+        def query():
+            with self._conn:
+                self._conn.execute(DELETE_REGISTRATIONS, (event_id,))
+                self._conn.executemany(
+                    INSERT_REGISTRATION,
+                    [_registration_row(event_id, r) for r in records or []],
+                )
+
+        self._call(query)
+
+    # ——— Пользователи бота ———
+
+    def get_user(self, user_id: int) -> Optional[dict]:
+        return self._call(
+            lambda: _user_record(self._conn.execute(SELECT_USER, (user_id,)).fetchone())
+        )
+
+    def find_user_by_username(self, username: str) -> Optional[dict]:
+        return self._call(
+            lambda: _user_record(
+                self._conn.execute(SELECT_USER_BY_USERNAME, (username,)).fetchone()
+            )
+        )
+
+    def all_users(self) -> List[dict]:
+        return self._call(
+            lambda: [_user_record(row) for row in self._conn.execute(SELECT_USERS)]
+        )
+
+    def add_user(self, user_id: int, username: str) -> bool:
+        def query():
+            with self._conn:
+                cursor = self._conn.execute(INSERT_USER, (user_id, username, 0))
+                if cursor.rowcount > 0:
+                    return True
+                if username:
+                    self._conn.execute(RENAME_USER, (username, user_id, username))
+            return False
+
+        return self._call(query)
+
+    def replace_users(self, users: List[dict]):
+        def query():
+            with self._conn:
+                self._conn.execute("DELETE FROM users")
+                self._conn.executemany(
+                    INSERT_USER,
+                    [
+                        (u["id"], u.get("username"), int(bool(u.get("admin", False))))
+                        for u in users
+                    ],
+                )
+
+        self._call(query)
+
+    def set_admin(self, user_id: int, admin: bool) -> bool:
+        def query():
+            with self._conn:
+                cursor = self._conn.execute(
+                    SET_ADMIN, (int(admin), user_id, int(admin))
+                )
+            return cursor.rowcount > 0
+
+        return self._call(query)
+
+    # ——— Задания планировщика ———
+
+    def jobs(self) -> List[dict]:
+        return self._call(
+            lambda: [json.loads(row["job"]) for row in self._conn.execute(SELECT_JOBS)]
+        )
+
+    def put_job(self, job: dict):
+        def query():
+            with self._conn:
+                self._conn.execute(PUT_JOB, _job_row(job))
+
+        self._call(query)
+
+    def delete_jobs(self, job_ids: List[str]) -> int:
+        def query():
+            with self._conn:
+                cursor = self._conn.executemany(
+                    DELETE_JOB, [(job_id,) for job_id in job_ids]
+                )
+            return max(cursor.rowcount, 0)
+
+        return self._call(query) if job_ids else 0
+
+    def replace_jobs(self, jobs: List[dict]):
+        def query():
+            with self._conn:
+                self._conn.execute("DELETE FROM jobs")
+                self._conn.executemany(PUT_JOB, [_job_row(job) for job in jobs or []])
+
+        self._call(query)
+
+    def close(self):
+        def query():
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+        self._call(query)
+        self._executor.shutdown(wait=True)
@@ -1,3 +1,4 @@
 from .keyboard_builder import (
     create_keyboard_from_file,
+    keyboard_cache,
 )  # get_agro_keyboard, get_help_keyboard
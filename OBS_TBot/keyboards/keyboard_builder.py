@@ -1,4 +1,6 @@
 import json
+import threading
+from typing import Dict, Hashable, Optional, Tuple
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
 
@@ -28,3 +30,41 @@ def create_keyboard_from_file(
                 InlineKeyboardButton(button["text"], callback_data=button["callback"])
             )
     return keyboard
+
+
+def _categories_key(categories) -> Hashable:
+    """Строка остаётся строкой (для неё `in` — поиск подстроки), список — кортеж."""
+    if categories is None or isinstance(categories, str):
+        return categories
+    return tuple(categories)
+
+
+class KeyboardCache:
+    """
+    Кэш готовых клавиатур по ключу (categories, row_width).
+
+    Клавиатура хранится сразу сериализованной в JSON: строку reply_markup
+    aiogram передаёт в запрос как есть, без повторной сборки кнопок.
+    Кэш привязан к снимку конфигурации кнопок (ConfigLoader отдаёт один и тот
+    же объект, пока файл не изменился) и сбрасывается при его смене.
+    """
+
+    def __init__(self):
+        self._buttons = None
+        self._serialized: Dict[Tuple[Hashable, int], str] = {}
+        self._lock = threading.Lock()
+
+    def serialized(self, buttons, categories, row_width: int) -> Optional[str]:
+        key = (_categories_key(categories), row_width)
+        with self._lock:
+            if buttons is not self._buttons:
+                self._buttons = buttons
+                self._serialized = {}
+            cached = self._serialized.get(key)
+            if cached is None:
+                markup = create_keyboard_from_file(buttons, categories, row_width)
+                cached = self._serialized[key] = markup.as_json()
+            return cached
+
+
+keyboard_cache = KeyboardCache()
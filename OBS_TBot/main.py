@@ -2,7 +2,7 @@
 import logging
 from create_bot import dp
 from aiogram import executor
-from handlers import register_all_handlers, on_startup
+from handlers import register_all_handlers, on_startup, on_shutdown
 
 
 logging.basicConfig(level=logging.INFO)
@@ -13,5 +13,6 @@ if __name__ == "__main__":
     executor.start_polling(
         dp,
         on_startup=on_startup,
+        on_shutdown=on_shutdown,
         skip_updates=False,  # False — чтобы мы могли обработать вручную
     )
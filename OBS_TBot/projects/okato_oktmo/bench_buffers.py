@@ -0,0 +1,88 @@
+"""
+Сравнение сборки таблиц глубины: прежний pd.concat на каждый ответ API
+против столбцовых буферов DepthBuffer.
+
+Запуск: python projects/okato_oktmo/bench_buffers.py [территорий] [на ответ]
+"""
+
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from okato_crawler import DepthBuffer, parse_response
+
+TERRITORIES = 100_000
+PER_RESPONSE = 50
+
+
+def make_responses(territories: int, per_response: int):
+    """Ответы API одной глубины; у каждого десятого ответа есть лишнее свойство."""
+    parents = [
+        {"feature_collection_level": 1, "name": f"Родитель {i}", "oktmo": f"{i:08d}"}
+        for i in range(territories // per_response)
+    ]
+    responses = []
+    for i, parent in enumerate(parents):
+        features = []
+        for j in range(per_response):
+            properties = {
+                "name": f"Территория {i}-{j}",
+                "oktmo": f"{i:08d}{j:03d}",
+                "hasChildren": False,
+            }
+            if i % 10 == 0:
+                properties["okato"] = f"{i:06d}{j:03d}"
+            features.append({"properties": properties})
+        data = {"data": {"properties": {"level": 2}, "features": features}}
+        responses.append((data, [{"feature_collection_level": 0}, parent]))
+    return responses
+
+
+def concat_rows(responses) -> pd.DataFrame:
+    """Прежний алгоритм: DataFrame на ответ и concat с уже собранным."""
+    result = None
+    for data, parents in responses:
+        block, _ = parse_response(data, parents)
+        rows = [block.constants + list(values) for values in zip(*block.columns)]
+        df = pd.DataFrame(rows, columns=block.header)
+        result = df if result is None else pd.concat([result, df], ignore_index=True)
+    return result
+
+
+def buffer_rows(responses) -> pd.DataFrame:
+    buffer = DepthBuffer()
+    for data, parents in responses:
+        block, _ = parse_response(data, parents)
+        buffer.add(block)
+    return buffer.to_frame()
+
+
+def measure(func, responses):
+    started = time.perf_counter()
+    df = func(responses)
+    return time.perf_counter() - started, df
+
+
+def main():
+    territories = int(sys.argv[1]) if len(sys.argv) > 1 else TERRITORIES
+    per_response = int(sys.argv[2]) if len(sys.argv) > 2 else PER_RESPONSE
+    responses = make_responses(territories, per_response)
+
+    concat_time, expected = measure(concat_rows, responses)
+    buffer_time, df = measure(buffer_rows, responses)
+
+    same = list(df.columns) == list(expected.columns) and df.fillna("").astype(
+        str
+    ).equals(expected.fillna("").astype(str))
+    print(f"{len(df)} строк, {len(responses)} ответов по {per_response} территорий")
+    print(f"pd.concat на ответ: {concat_time:.2f} сек")
+    print(f"DepthBuffer:        {buffer_time:.2f} сек")
+    print(f"Ускорение: x{concat_time / buffer_time:.1f}, таблицы совпадают: {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Проверка продолжения прерванного обхода ОКАТО/ОКТМО на сервере-заглушке.
+
+Обход с контрольными точками прерывается посреди глубины (задача
+отменяется после заданного числа запросов), затем запускается заново с тем
+же каталогом контрольных точек. Таблицы продолжения — в памяти и в
+CSV-архиве писателя — должны совпасть с непрерванным обходом и с прежним
+рекурсивным, а уже обработанные узлы не должны запрашиваться повторно.
+
+Запуск: python projects/okato_oktmo/bench_checkpoint.py
+"""
+
+import io
+import os
+import sys
+import json
+import asyncio
+import zipfile
+import tempfile
+import contextlib
+from typing import Dict, Optional
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import okato_crawler
+from okato_checkpoint import CrawlCheckpoint
+from okato_crawler import OkatoCrawler
+from okato_fixture import FixtureApi, reference_frames, same_frames
+from okato_writers import create_writer
+
+FANOUT = (6, 5, 8)
+LATENCY = 0.01  # секунд на ответ сервера-заглушки
+MAX_DEPTH = len(FANOUT) - 1
+CHUNK = 4  # узлов между контрольными точками
+INTERRUPT_AFTER = (6, 16, 25)  # запросов до отмены: посреди глубин 1 и 2
+
+
+async def interrupted_crawl(crawler: OkatoCrawler, api: FixtureApi, after: int):
+    """Запускает обход и отменяет его, когда сервер получил after запросов."""
+    task = asyncio.ensure_future(crawler.crawl())
+    while sum(api.requests.values()) < after and not task.done():
+        await asyncio.sleep(0.001)
+    assert not task.done(), "обход завершился раньше прерывания"
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
+
+
+def read_csv_zip(path: str) -> Dict[int, pd.DataFrame]:
+    frames = {}
+    with zipfile.ZipFile(path) as archive:
+        for depth, name in enumerate(sorted(archive.namelist())):
+            frames[depth] = pd.read_csv(
+                io.BytesIO(archive.read(name)), dtype=str, keep_default_na=False
+            )
+    return frames
+
+
+def crawl(url: str, directory: str, after: Optional[int], api: FixtureApi, writer=None):
+    crawler = OkatoCrawler(
+        url,
+        max_depth=MAX_DEPTH,
+        writer=writer,
+        checkpoint=CrawlCheckpoint(directory, url, MAX_DEPTH),
+    )
+    with open(os.devnull, "w") as null, contextlib.redirect_stdout(null):
+        if after is None:
+            return asyncio.run(crawler.crawl())
+        asyncio.run(interrupted_crawl(crawler, api, after))
+
+
+def check_resume(api: FixtureApi, url: str, expected, after: int, with_writer: bool):
+    with tempfile.TemporaryDirectory() as directory:
+        checkpoints = os.path.join(directory, "checkpoint")
+        output = os.path.join(directory, "okato-oktmo.xlsx")
+
+        api.reset_stats()
+        writer = create_writer("csv", output) if with_writer else None
+        crawl(url, checkpoints, after, api, writer)
+        with open(os.path.join(checkpoints, CrawlCheckpoint.STATE_FILE)) as f:
+            state = json.load(f)
+
+        api.reset_stats()
+        writer = create_writer("csv", output) if with_writer else None
+        frames = crawl(url, checkpoints, None, api, writer)
+        if writer is not None:
+            writer.close()
+            frames = read_csv_zip(writer.path)
+        resumed = dict(api.requests)
+        cleared = not os.path.exists(checkpoints)
+
+    print(
+        f"Прерывание после {after} запросов ({'CSV' if with_writer else 'память'}): "
+        f"контрольная точка — глубина {state['depth']}, обработано "
+        f"{state['position']} узлов; при продолжении {sum(resumed.values())} "
+        f"запросов из {api.nodes()}"
+    )
+    assert 0 < state["position"], "обход прерван не посреди глубины"
+    assert same_frames(frames, expected), "таблицы продолжения расходятся"
+    assert cleared, "контрольные точки не удалены после обхода"
+    # Продолжение запрашивает только узлы после сохранённой позиции
+    # (узлы — в порядке обхода); прерванный запрос мог дойти до сервера
+    # уже после сброса счётчиков, поэтому сравниваются множества URL
+    urls = expected_urls(api)
+    depth_of = lambda code: code.count(".") + 1 if code else 0
+    processed = sum(depth_of(code) < state["depth"] for code in urls)
+    processed += state["position"]
+    assert set(resumed) == set(urls[processed:]), (processed, resumed)
+
+
+def expected_urls(api: FixtureApi):
+    """Коды ОКТМО запрашиваемых узлов (с детьми и корня) в порядке обхода."""
+    codes = [""]
+    level = [[]]
+    for width in api.fanout[:-1]:
+        level = [path + [str(i)] for path in level for i in range(width)]
+        codes += [".".join(path) for path in level]
+    return codes
+
+
+def main():
+    okato_crawler.CHECKPOINT_EVERY = CHUNK
+    api = FixtureApi(FANOUT, latency=LATENCY)
+    url = api.start()
+    try:
+        expected = reference_frames(url, MAX_DEPTH)
+        with tempfile.TemporaryDirectory() as directory:
+            api.reset_stats()
+            uninterrupted = crawl(url, os.path.join(directory, "checkpoint"), None, api)
+        assert same_frames(uninterrupted, expected), "непрерванный обход расходится"
+        for after in INTERRUPT_AFTER:
+            for with_writer in (False, True):
+                check_resume(api, url, uninterrupted, after, with_writer)
+    finally:
+        api.stop()
+    print("Все проверки пройдены.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Проверка асинхронного обходчика ОКАТО/ОКТМО на локальном сервере-заглушке:
+таблицы совпадают с прежним последовательным рекурсивным обходом, общий
+для нескольких родителей URL запрашивается один раз, одновременных
+запросов не больше concurrency, ответы 503 повторяются. С кэшем
+устаревшие ответы неизменившихся поддеревьев перепроверяются условными
+запросами.
+
+Запуск: python projects/okato_oktmo/bench_crawler.py
+"""
+
+import os
+import sys
+import time
+import asyncio
+import tempfile
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from okato_cache import ResponseCache
+from okato_crawler import OkatoCrawler
+from okato_fixture import FixtureApi, reference_frames, same_frames
+
+FANOUT = (8, 6, 5)
+LATENCY = 0.02  # секунд на ответ сервера-заглушки
+MAX_DEPTH = len(FANOUT) - 1
+
+
+def crawl(url: str, **kwargs):
+    crawler = OkatoCrawler(url, max_depth=MAX_DEPTH, **kwargs)
+    with open(os.devnull, "w") as null, contextlib.redirect_stdout(null):
+        started = time.perf_counter()
+        frames = asyncio.run(crawler.crawl())
+    return crawler, frames, time.perf_counter() - started
+
+
+def check_dedup_and_concurrency(concurrency: int = 4):
+    api = FixtureApi(FANOUT, latency=LATENCY, shared=True)
+    url = api.start()
+    try:
+        started = time.perf_counter()
+        expected = reference_frames(url, MAX_DEPTH)
+        sequential_time = time.perf_counter() - started
+        sequential_requests = sum(api.requests.values())
+
+        api.reset_stats()
+        crawler, frames, elapsed = crawl(url, concurrency=concurrency)
+    finally:
+        api.stop()
+
+    rows = sum(len(df) for df in frames.values())
+    print(
+        f"Последовательно: {sequential_requests} запросов, {sequential_time:.2f} сек; "
+        f"OkatoCrawler: {sum(api.requests.values())} запросов, {elapsed:.2f} сек, "
+        f"{rows} строк"
+    )
+    print(
+        f"Одновременных запросов: не больше {api.max_in_flight} "
+        f"(concurrency={concurrency}); ответов в памяти после обхода: "
+        f"{len(crawler._responses)}"
+    )
+    assert same_frames(frames, expected), "таблицы расходятся с прежним обходом"
+    # Общий узел встречается у каждого родителя глубины 1, но запрашивается один раз
+    assert max(api.requests.values()) == 1, api.requests.most_common(3)
+    assert len(api.requests) == api.nodes(), (len(api.requests), api.nodes())
+    assert api.max_in_flight <= concurrency, api.max_in_flight
+    assert not crawler._responses and not crawler._waiting
+
+
+def check_retry(fail_first: int = 2):
+    api = FixtureApi(FANOUT[:2], fail_first=fail_first)
+    url = api.start()
+    try:
+        crawler, frames, _ = crawl(url, retries=fail_first + 1, backoff=0.01)
+        failures = dict(api.requests)
+        api.reset_stats()
+        _, failed, _ = crawl(url, retries=fail_first - 1, backoff=0.01)
+        api.fail_first = 0
+        api.reset_stats()
+        expected = reference_frames(url, MAX_DEPTH)
+    finally:
+        api.stop()
+
+    print(
+        f"Повторы: {fail_first} ответа 503 на каждый URL, "
+        f"{crawler.requests} запросов на {len(failures)} узлов; "
+        f"без запаса повторов строк: {sum(len(df) for df in failed.values())}"
+    )
+    assert same_frames(frames, expected), "после повторов таблицы расходятся"
+    assert all(count == fail_first + 1 for count in failures.values()), failures
+    assert failed == {}, failed
+
+
+def check_cache_revalidation():
+    api = FixtureApi(FANOUT)
+    url = api.start()
+    leaf = "0.0.0"  # лист: его название — в ответе родителя на глубине 2
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "okato-cache.db")
+
+            def cached_crawl(max_age: float):
+                api.reset_stats()
+                cache = ResponseCache(path, max_age)
+                try:
+                    _, frames, _ = crawl(url, cache=cache)
+                finally:
+                    cache.close()
+                names = set(frames[2]["name_2"])
+                return frames, sum(api.requests.values()), api.not_modified, names
+
+            cached_crawl(3600)
+            api.rename(leaf)
+            _, trusted_requests, _, trusted_names = cached_crawl(3600)
+            frames, requests, not_modified, names = cached_crawl(0)
+            api.reset_stats()
+            expected = reference_frames(url, MAX_DEPTH)
+    finally:
+        api.stop()
+
+    print(
+        f"Кэш: свежий — {trusted_requests} запрос; после max_age — {requests} "
+        f"условных запросов, из них 304: {not_modified}"
+    )
+    # В пределах max_age поддерево неизменившегося корня берётся из кэша
+    assert trusted_requests == 1 and f"n{leaf}v1" in trusted_names
+    # После max_age перепроверяется всё дерево, изменение в глубине видно
+    assert requests == api.nodes() and not_modified == api.nodes() - 1
+    assert f"n{leaf}v2" in names and same_frames(frames, expected)
+
+
+def main():
+    check_dedup_and_concurrency()
+    check_retry()
+    check_cache_revalidation()
+    print("Все проверки пройдены.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Пиковая память (RSS) полного обхода ОКАТО/ОКТМО с записью выгрузки
+в разные форматы.
+
+Сервер-заглушка (okato_fixture) работает в основном процессе, а каждый
+формат — отдельным процессом с настоящим обходом OkatoCrawler и
+писателем; прежний путь (таблицы в памяти и pd.ExcelWriter) — для
+сравнения. Число строк каждой глубины сверяется с деревом заглушки.
+
+Запуск: python projects/okato_oktmo/bench_writers.py [листьев на узел]
+"""
+
+import os
+import sys
+import time
+import asyncio
+import resource
+import tempfile
+import contextlib
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from okato_crawler import OkatoCrawler
+from okato_fixture import FixtureApi
+from okato_writers import SHEET_NAME, create_writer
+
+FORMATS = ("pandas", "xlsx", "csv", "parquet")
+FANOUT = (10, 50, 200)  # 100 000 строк на последней глубине
+PADDING = 200  # символов в строковом свойстве каждой территории
+
+
+def peak_rss_mb() -> float:
+    # На Linux ru_maxrss — в килобайтах
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def expected_rows(fanout) -> dict:
+    rows, level = {}, 1
+    for depth, width in enumerate(fanout):
+        level *= width
+        rows[depth] = level
+    return rows
+
+
+def run_format(output_format: str, url: str, fanout, directory: str):
+    baseline = peak_rss_mb()
+    path = os.path.join(directory, "okato-oktmo.xlsx")
+    writer = None if output_format == "pandas" else create_writer(output_format, path)
+    crawler = OkatoCrawler(url, max_depth=len(fanout) - 1, writer=writer)
+
+    started = time.perf_counter()
+    with open(os.devnull, "w") as null, contextlib.redirect_stdout(null):
+        result = asyncio.run(crawler.crawl())
+    if writer is None:
+        import pandas as pd
+
+        with pd.ExcelWriter(path, engine="xlsxwriter") as excel:
+            for depth, df in result.items():
+                df.to_excel(
+                    excel, sheet_name=SHEET_NAME.format(depth=depth), index=False
+                )
+        rows = {depth: len(df) for depth, df in result.items()}
+    else:
+        writer.close()
+        path = writer.path
+        rows = result
+    elapsed = time.perf_counter() - started
+
+    size = os.path.getsize(path) / 1024 / 1024
+    print(
+        f"{output_format:8} {elapsed:6.2f} сек  пик RSS {peak_rss_mb():7.1f} МБ"
+        f" (+{peak_rss_mb() - baseline:.1f} МБ на обход)  файл {size:.1f} МБ"
+    )
+    assert rows == expected_rows(fanout), rows
+
+
+def main():
+    fanout = FANOUT[:-1] + (int(sys.argv[1]),) if len(sys.argv) > 1 else FANOUT
+    api = FixtureApi(fanout, padding=PADDING)
+    url = api.start()
+    print(
+        f"Дерево {fanout}: {api.nodes()} запросов, "
+        f"{expected_rows(fanout)[len(fanout) - 1]} строк на последней глубине"
+    )
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            for output_format in FORMATS:
+                subprocess.run(
+                    [
+                        sys.executable,
+                        __file__,
+                        "--format",
+                        output_format,
+                        url,
+                        ",".join(map(str, fanout)),
+                        directory,
+                    ],
+                    check=True,
+                )
+    finally:
+        api.stop()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--format":
+        fanout = tuple(int(width) for width in sys.argv[4].split(","))
+        run_format(sys.argv[2], sys.argv[3], fanout, sys.argv[5])
+    else:
+        main()
@@ -0,0 +1,97 @@
+import time
+import sqlite3
+import hashlib
+from typing import NamedTuple, Optional
+
+CACHE_MAX_AGE = 24 * 3600  # секунд, сколько ответ считается подтверждённым
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    digest: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+
+def body_digest(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+
+class ResponseCache:
+    """
+    Ответы API на диске (SQLite), ключ — URL запроса.
+
+    Вместе с телом хранятся ETag и Last-Modified для условных запросов и
+    хэш тела: по нему видно, изменился ли ответ, даже если сервер не
+    поддерживает If-None-Match/If-Modified-Since.
+
+    fetched_at — когда сервер последний раз прислал или подтвердил (304)
+    ответ; старше max_age секунд ответ снова перепроверяется условным
+    запросом, даже если ответ родителя не изменился.
+    """
+
+    def __init__(self, path: str, max_age: float = CACHE_MAX_AGE):
+        self.path = path
+        self.max_age = max_age
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " url TEXT PRIMARY KEY,"
+            " body BLOB NOT NULL,"
+            " digest TEXT NOT NULL,"
+            " etag TEXT,"
+            " last_modified TEXT,"
+            " fetched_at REAL NOT NULL)"
+        )
+        self.connection.commit()
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        row = self.connection.execute(
+            "SELECT body, digest, etag, last_modified, fetched_at"
+            " FROM responses WHERE url = ?",
+            (url,),
+        ).fetchone()
+        return CachedResponse(*row) if row else None
+
+    def put(
+        self,
+        url: str,
+        body: bytes,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> str:
+        digest = body_digest(body)
+        self.connection.execute(
+            "INSERT OR REPLACE INTO responses"
+            " (url, body, digest, etag, last_modified, fetched_at)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (url, body, digest, etag, last_modified, time.time()),
+        )
+        return digest
+
+    def is_fresh(self, cached: CachedResponse) -> bool:
+        return time.time() - cached.fetched_at < self.max_age
+
+    def touch(self, url: str):
+        """Ответ 304: тело в кэше подтверждено сервером."""
+        self.connection.execute(
+            "UPDATE responses SET fetched_at = ? WHERE url = ?", (time.time(), url)
+        )
+
+    def conditional_headers(self, cached: Optional[CachedResponse]) -> dict:
+        headers = {}
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+        return headers
+
+    def commit(self):
+        self.connection.commit()
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
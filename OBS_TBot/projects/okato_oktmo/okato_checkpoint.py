@@ -0,0 +1,122 @@
+import os
+import json
+import shutil
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from okato_crawler import Block, Node
+
+
+class CrawlCheckpoint:
+    """
+    Контрольные точки обхода ОКАТО/ОКТМО: прерванный обход продолжается
+    с того места, где остановился.
+
+    В каталоге хранятся:
+    - frontier-<глубина>.jsonl — узлы глубины в порядке обхода (для
+      следующей глубины файл дописывается по мере обнаружения детей);
+    - blocks-<глубина>.jsonl — разобранные ответы, то есть частичный вывод;
+    - state.json — глубина, число уже обработанных узлов этой глубины
+      (обработанные узлы — её префикс) и длины файлов на момент сохранения.
+
+    state.json подменяется атомарно после того, как дописанные файлы
+    сброшены на диск; при продолжении файлы обрезаются до записанных длин,
+    так что хвост, дописанный после последней точки, отбрасывается.
+    """
+
+    STATE_FILE = "state.json"
+
+    def __init__(self, directory: str, url: str, max_depth: int):
+        self.directory = directory
+        self.url = url
+        self.max_depth = max_depth
+        self.lengths: Dict[str, int] = {}
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    # ——— Чтение ———
+
+    def resume(self) -> Optional[Tuple[int, int]]:
+        """
+        (глубина, обработано узлов) прерванного обхода того же URL и той же
+        max_depth, либо None — тогда каталог очищается для нового обхода.
+        """
+        try:
+            with open(self._path(self.STATE_FILE), "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = None
+
+        if (
+            not state
+            or state.get("url") != self.url
+            or state.get("max_depth") != self.max_depth
+        ):
+            self.clear()
+            os.makedirs(self.directory, exist_ok=True)
+            return None
+
+        self.lengths = state["lengths"]
+        for name, length in self.lengths.items():
+            with open(self._path(name), "r+b") as f:
+                f.truncate(length)
+        return state["depth"], state["position"]
+
+    def _read_lines(self, name: str):
+        if name not in self.lengths:
+            return
+        with open(self._path(name), "r", encoding="utf-8") as f:
+            for line in f:
+                yield json.loads(line)
+
+    def frontier(self, depth: int) -> List[Node]:
+        return [
+            Node(url, depth, tuple(parents), trusted)
+            for url, parents, trusted in self._read_lines(f"frontier-{depth}.jsonl")
+        ]
+
+    def blocks(self, depth: int) -> Iterator[Block]:
+        """Блоки глубины по одному, без чтения файла в память целиком."""
+        return (Block(*fields) for fields in self._read_lines(f"blocks-{depth}.jsonl"))
+
+    # ——— Запись ———
+
+    def _append(self, name: str, items: list):
+        with open(self._path(name), "a", encoding="utf-8") as f:
+            for item in items:
+                f.write(json.dumps(item, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+            self.lengths[name] = f.tell()
+
+    def add_nodes(self, depth: int, nodes: List[Node]):
+        self._append(
+            f"frontier-{depth}.jsonl",
+            [[node.url, list(node.parents), node.trusted] for node in nodes],
+        )
+
+    def add_blocks(self, depth: int, blocks: List[Block]):
+        self._append(
+            f"blocks-{depth}.jsonl",
+            [[b.header, b.constants, b.columns, b.size] for b in blocks],
+        )
+
+    def save(self, depth: int, position: int):
+        state = {
+            "url": self.url,
+            "max_depth": self.max_depth,
+            "depth": depth,
+            "position": position,
+            "lengths": self.lengths,
+        }
+        tmp_path = self._path(self.STATE_FILE + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._path(self.STATE_FILE))
+
+    def clear(self):
+        """Обход завершён: контрольные точки больше не нужны."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self.lengths = {}
@@ -0,0 +1,548 @@
+import json
+import asyncio
+import random
+import tempfile
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import aiohttp
+import pandas as pd
+
+from okato_cache import CachedResponse, ResponseCache
+
+CONCURRENCY = 8  # одновременных запросов к API
+RETRIES = 4  # повторов при сетевых ошибках и ответах 429/5xx
+BACKOFF = 0.5  # базовая пауза перед повтором, удваивается с каждой попыткой
+REQUEST_TIMEOUT = 60  # секунд на запрос
+
+# Узлов в части глубины: после каждой части блоки уходят на диск (писателю)
+# и сохраняется контрольная точка
+CHECKPOINT_EVERY = 200
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def child_url(url: str, oktmo: str) -> str:
+    return url.split("&query=")[0] + f"&query={oktmo}"
+
+
+class Block:
+    """Ответ API, разобранный по столбцам."""
+
+    __slots__ = ("header", "constants", "columns", "size")
+
+    def __init__(self, header: list, constants: list, columns: list, size: int):
+        self.header = header
+        # Значения родителей и feature_collection — одни на весь ответ
+        self.constants = constants
+        # Столбцы свойств features, по списку на столбец
+        self.columns = columns
+        self.size = size
+
+
+def parse_response(data: dict, parent_data_list: List[dict]):
+    """
+    Разбирает ответ API в блок строк текущей глубины.
+
+    Returns:
+        (block, children) — Block и список дочерних элементов (oktmo, данные
+        родителя для их строк), либо None, если в ответе нет данных.
+    """
+    data_obj = data.get("data", {})
+    feature_collection_properties = data_obj.get("properties", {})
+    features = data_obj.get("features", [])
+
+    if isinstance(feature_collection_properties, dict):
+        feature_collection_header = list(feature_collection_properties.keys())
+        prefixed_feature_collection_header = [
+            "feature_collection_" + key for key in feature_collection_header
+        ]
+    else:
+        print("Используется пустой заголовок для feature_collection_properties.")
+        feature_collection_properties = {}
+        feature_collection_header = []
+        prefixed_feature_collection_header = []
+
+    if not features:
+        print("Предупреждение: В JSON файле нет данных о 'features'.")
+        return None
+
+    properties = features[0].get("properties", {})
+    if isinstance(properties, dict):
+        feature_header = list(properties.keys())
+    else:
+        print("Используется пустой заголовок для feature properties.")
+        feature_header = []
+
+    header = []
+    parent_depth = 0
+    for parent_data in parent_data_list:
+        header.extend(f"{key}_{parent_depth}" for key in parent_data.keys())
+        parent_depth += 1
+    header.extend(f"{key}_{parent_depth}" for key in prefixed_feature_collection_header)
+    header.extend(f"{key}_{parent_depth}" for key in feature_header)
+
+    parent_values = [
+        value for parent_data in parent_data_list for value in parent_data.values()
+    ]
+    feature_collection_values = [
+        feature_collection_properties.get(h, "") for h in feature_collection_header
+    ]
+
+    features_properties = []
+    for feature in features:
+        feature_properties = feature.get("properties", {})
+        if not isinstance(feature_properties, dict):
+            feature_properties = {}
+        features_properties.append(feature_properties)
+
+    columns = [
+        [feature_properties.get(h, "") for feature_properties in features_properties]
+        for h in feature_header
+    ]
+
+    children = []
+    for feature_properties in features_properties:
+        if feature_properties.get("hasChildren") == True:
+            oktmo = feature_properties.get("oktmo")
+            if oktmo:
+                current_data = dict(
+                    zip(prefixed_feature_collection_header, feature_collection_values)
+                )
+                current_data.update(
+                    (h, feature_properties.get(h, "")) for h in feature_header
+                )
+                children.append((oktmo, current_data))
+
+    block = Block(
+        header,
+        parent_values + feature_collection_values,
+        columns,
+        len(features_properties),
+    )
+    return block, children
+
+
+class DepthBuffer:
+    """
+    Столбцы одной глубины, которые накапливаются по мере ответов API.
+
+    Блоки дописываются в списки столбцов без копирования уже собранных
+    строк (прежний pd.concat на каждый ответ копировал их снова и снова);
+    DataFrame строится один раз в to_frame(). Столбцы объединяются в
+    порядке появления, отсутствующие в блоке значения заполняются None —
+    как при concat.
+    """
+
+    def __init__(self):
+        self.columns: Dict[str, list] = {}
+        self.size = 0
+
+    def _column(self, name: str) -> list:
+        column = self.columns.get(name)
+        if column is None:
+            column = self.columns[name] = [None] * self.size
+        return column
+
+    def add(self, block: Block):
+        n_constants = len(block.constants)
+        for name, value in zip(block.header, block.constants):
+            self._column(name).extend([value] * block.size)
+        for name, values in zip(block.header[n_constants:], block.columns):
+            self._column(name).extend(values)
+
+        self.size += block.size
+        for column in self.columns.values():
+            if len(column) < self.size:
+                column.extend([None] * (self.size - len(column)))
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.columns, columns=list(self.columns))
+
+
+class LevelRows:
+    """
+    Строки одной глубины поверх блоков ответов, без копирования в таблицу.
+
+    header — объединение столбцов в порядке появления (как у DepthBuffer);
+    итерация разворачивает блоки по одной строке, отсутствующие значения —
+    None. Перебирать строки можно несколько раз. blocks — список или
+    BlockSpool; для него index уже посчитан и передаётся сразу.
+    """
+
+    def __init__(self, blocks: Iterable[Block], index: Optional[Dict[str, int]] = None):
+        self.blocks = blocks
+        if index is None:
+            index = {}
+            for block in blocks:
+                for name in block.header:
+                    index.setdefault(name, len(index))
+        self.index = index
+        self.header = list(index)
+
+    def __len__(self) -> int:
+        return sum(block.size for block in self.blocks)
+
+    def __iter__(self):
+        width = len(self.header)
+        for block in self.blocks:
+            n_constants = len(block.constants)
+            template = [None] * width
+            for name, value in zip(block.header, block.constants):
+                template[self.index[name]] = value
+            positions = [self.index[name] for name in block.header[n_constants:]]
+            for i in range(block.size):
+                row = template.copy()
+                for position, column in zip(positions, block.columns):
+                    row[position] = column[i]
+                yield row
+
+
+class BlockSpool:
+    """
+    Блоки одной глубины во временном файле.
+
+    Части глубины дописываются в файл, как только загружены, а при записи
+    глубины блоки читаются с диска по одному — в памяти не копится даже
+    самая большая глубина. Объединение столбцов (index) считается при
+    добавлении, чтобы не читать файл лишний раз. Перебирать блоки можно
+    несколько раз, но не одновременно.
+    """
+
+    def __init__(self):
+        self._file = tempfile.TemporaryFile("w+", encoding="utf-8")
+        self.index: Dict[str, int] = {}
+        self.size = 0
+
+    def add(self, block: Block):
+        for name in block.header:
+            self.index.setdefault(name, len(self.index))
+        fields = [block.header, block.constants, block.columns, block.size]
+        self._file.write(json.dumps(fields, ensure_ascii=False) + "\n")
+        self.size += block.size
+
+    def __iter__(self):
+        self._file.flush()
+        self._file.seek(0)
+        for line in self._file:
+            yield Block(*json.loads(line))
+
+    def close(self):
+        self._file.close()
+
+
+class Node:
+    """
+    Узел обхода: URL запроса, глубина и данные всех родителей.
+
+    trusted — ответ родителя не изменился с прошлой выгрузки, поэтому
+    закэшированный ответ узла используется без обращения к серверу, пока
+    он не старше max_age кэша.
+    """
+
+    __slots__ = ("url", "depth", "parents", "trusted")
+
+    def __init__(
+        self,
+        url: str,
+        depth: int,
+        parents: Tuple[dict, ...] = (),
+        trusted: bool = False,
+    ):
+        self.url = url
+        self.depth = depth
+        self.parents = parents
+        self.trusted = trusted
+
+
+class OkatoCrawler:
+    """
+    Асинхронный обход иерархии ОКАТО/ОКТМО в ширину.
+
+    Уровень дерева загружается параллельно (не больше concurrency запросов
+    через общий пул соединений), затем строки уровня добавляются в порядке
+    узлов — так таблицы совпадают с прежним рекурсивным обходом. URL,
+    который встречается у нескольких родителей одной глубины, запрашивается
+    один раз; ответ хранится, только пока его ждут узлы этой глубины.
+    Сетевые ошибки и ответы 429/5xx повторяются с экспоненциальной паузой.
+
+    С кэшем (ResponseCache) ответы перепроверяются условными запросами
+    (ETag/If-Modified-Since). Если ответ узла не изменился, его поддерево
+    берётся из кэша без запросов; заново загружаются только поддеревья
+    изменившихся узлов. Ответы старше max_age кэша перепроверяются и в
+    неизменившемся поддереве (обычно это дешёвые ответы 304), так что
+    изменения в глубине дерева не теряются навсегда. В режиме cache_only
+    сеть не используется вовсе.
+
+    С писателем (okato_writers.OutputWriter) блоки каждой части глубины
+    сразу уходят во временный файл (BlockSpool), а загруженная глубина
+    записывается строками с диска: в памяти держится одна часть узлов
+    (CHECKPOINT_EVERY), а не весь набор данных.
+
+    С контрольной точкой (okato_checkpoint.CrawlCheckpoint) прогресс
+    сохраняется каждые CHECKPOINT_EVERY узлов, и прерванный обход
+    (ошибка, таймаут скрипта в боте) продолжается со следующего запуска.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        max_depth: int = 0,
+        concurrency: int = CONCURRENCY,
+        retries: int = RETRIES,
+        backoff: float = BACKOFF,
+        cache: Optional[ResponseCache] = None,
+        cache_only: bool = False,
+        writer=None,
+        checkpoint=None,
+    ):
+        if cache_only and cache is None:
+            raise ValueError("Для режима cache_only нужен кэш ответов")
+        self.url = url
+        self.max_depth = max_depth
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.cache = cache
+        self.cache_only = cache_only
+        self.writer = writer
+        self.checkpoint = checkpoint
+        self.buffers: Dict[int, DepthBuffer] = {}
+        self._spools: Dict[int, BlockSpool] = {}
+        # Запросы текущей глубины и число её узлов, которые ещё ждут ответа
+        self._responses: Dict[str, asyncio.Future] = {}
+        self._waiting: Counter = Counter()
+        self.requests = 0
+        self.not_modified = 0
+        self.from_cache = 0
+
+    def _cached(self, cached: CachedResponse, unchanged: bool):
+        self.from_cache += 1
+        return json.loads(cached.body), unchanged
+
+    async def _get_json(
+        self, session: aiohttp.ClientSession, url: str, trusted: bool = False
+    ) -> Optional[Tuple[dict, bool]]:
+        """
+        Returns:
+            (data, unchanged) — ответ и признак того, что он совпадает с
+            закэшированным, либо None при ошибке.
+        """
+        cached = self.cache.get(url) if self.cache is not None else None
+        if cached is not None and (
+            self.cache_only or (trusted and self.cache.is_fresh(cached))
+        ):
+            return self._cached(cached, True)
+        if self.cache_only:
+            print(f"Предупреждение: Ответа нет в кэше: {url}")
+            return None
+
+        headers = self.cache.conditional_headers(cached) if self.cache else {}
+        for attempt in range(self.retries + 1):
+            try:
+                self.requests += 1
+                async with session.get(url, headers=headers) as response:
+                    if response.status == 304 and cached is not None:
+                        self.not_modified += 1
+                        self.cache.touch(url)
+                        return self._cached(cached, True)
+                    if response.status >= 400 and response.status not in RETRY_STATUSES:
+                        print(
+                            f"Ошибка при загрузке данных из URL: {response.status} {url}"
+                        )
+                        return None
+                    response.raise_for_status()
+                    body = await response.read()
+                    data = json.loads(body)
+                    if self.cache is None:
+                        return data, False
+                    digest = self.cache.put(
+                        url,
+                        body,
+                        response.headers.get("ETag"),
+                        response.headers.get("Last-Modified"),
+                    )
+                    return data, cached is not None and cached.digest == digest
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == self.retries:
+                    print(f"Ошибка при загрузке данных из URL: {e}")
+                    if cached is not None:
+                        print(f"Используется ответ из кэша: {url}")
+                        return self._cached(cached, False)
+                    return None
+                delay = self.backoff * 2**attempt
+                await asyncio.sleep(delay + random.uniform(0, delay / 2))
+            except ValueError:
+                print(f"Ошибка: Ответ от URL не является корректным JSON.")
+                return None
+        return None
+
+    def fetch(
+        self, session: aiohttp.ClientSession, url: str, trusted: bool = False
+    ) -> asyncio.Future:
+        """Один запрос на URL: повторные обращения получают тот же результат."""
+        future = self._responses.get(url)
+        if future is None:
+            future = asyncio.ensure_future(self._get_json(session, url, trusted))
+            self._responses[url] = future
+        return future
+
+    def _release(self, url: str):
+        """Узел получил ответ; когда его ждать больше некому, ответ забывается."""
+        self._waiting[url] -= 1
+        if self._waiting[url] <= 0:
+            del self._waiting[url]
+            self._responses.pop(url, None)
+
+    async def _visit(
+        self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore, node: Node
+    ):
+        async with semaphore:
+            try:
+                response = await self.fetch(session, node.url, node.trusted)
+            finally:
+                self._release(node.url)
+        if response is None:
+            return None
+        data, unchanged = response
+        parsed = parse_response(data, list(node.parents))
+        if parsed is None:
+            return None
+        return parsed + (unchanged,)
+
+    def _collect(self, depth: int, blocks: Iterable[Block]):
+        """Блоки части глубины: в таблицу глубины или на диск для писателя."""
+        levels = self._spools if self.writer is not None else self.buffers
+        for block in blocks:
+            level = levels.get(depth)
+            if level is None:
+                level = levels[depth] = (
+                    BlockSpool() if self.writer is not None else DepthBuffer()
+                )
+            level.add(block)
+
+    def _finish_level(self, depth: int):
+        """Глубина загружена: писатель получает её строки с диска."""
+        spool = self._spools.pop(depth, None)
+        if spool is None:
+            return
+        try:
+            rows = LevelRows(spool, spool.index)
+            self.writer.write_depth(depth, rows.header, rows)
+        finally:
+            spool.close()
+
+    def _resume(self) -> Tuple[int, int, List[Node], List[Node]]:
+        """Состояние обхода: новое или восстановленное из контрольной точки."""
+        root = [Node(self.url, 0)]
+        if self.checkpoint is None:
+            return 0, 0, root, []
+
+        state = self.checkpoint.resume()
+        if state is None:
+            self.checkpoint.add_nodes(0, root)
+            self.checkpoint.save(0, 0)
+            return 0, 0, root, []
+
+        depth, position = state
+        for finished in range(depth):
+            self._collect(finished, self.checkpoint.blocks(finished))
+            self._finish_level(finished)
+        self._collect(depth, self.checkpoint.blocks(depth))
+        frontier = self.checkpoint.frontier(depth)
+        print(
+            f"Продолжение прерванного обхода: глубина {depth}, "
+            f"обработано {position} из {len(frontier)} узлов."
+        )
+        return depth, position, frontier, self.checkpoint.frontier(depth + 1)
+
+    async def _visit_chunk(self, session, semaphore, depth: int, nodes: List[Node]):
+        results = await asyncio.gather(
+            *(self._visit(session, semaphore, node) for node in nodes)
+        )
+        blocks = []
+        children_nodes = []
+        for node, result in zip(nodes, results):
+            if result is None:
+                continue
+            block, children, unchanged = result
+            blocks.append(block)
+            for oktmo, current_data in children:
+                url = child_url(node.url, oktmo)
+                print(
+                    f"Обнаружен дочерний элемент.  Загрузка с URL: {url} (глубина: {depth+1})"
+                )
+                children_nodes.append(
+                    Node(
+                        url,
+                        depth + 1,
+                        node.parents + (current_data,),
+                        trusted=unchanged,
+                    )
+                )
+        return blocks, children_nodes
+
+    async def crawl(self) -> Dict[int, pd.DataFrame]:
+        """
+        Returns:
+            Словарь глубина -> DataFrame; с писателем — глубина -> число
+            записанных строк.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        connector = aiohttp.TCPConnector(limit=self.concurrency, ssl=False)
+        timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+
+        depth, position, frontier, next_frontier = self._resume()
+        try:
+            async with aiohttp.ClientSession(
+                connector=connector, timeout=timeout
+            ) as session:
+                while frontier:
+                    if depth > self.max_depth:
+                        print(
+                            f"Предупреждение: Достигнута максимальная глубина рекурсии ({self.max_depth})."
+                        )
+                        break
+
+                    self._waiting = Counter(node.url for node in frontier[position:])
+                    # С писателем или контрольными точками глубина обходится
+                    # частями: после каждой части блоки уходят на диск
+                    chunk = (
+                        CHECKPOINT_EVERY
+                        if self.checkpoint or self.writer
+                        else len(frontier)
+                    )
+                    for start in range(position, len(frontier), chunk):
+                        nodes = frontier[start : start + chunk]
+                        blocks, children = await self._visit_chunk(
+                            session, semaphore, depth, nodes
+                        )
+                        self._collect(depth, blocks)
+                        next_frontier.extend(children)
+                        if self.cache is not None:
+                            self.cache.commit()
+                        if self.checkpoint is not None:
+                            self.checkpoint.add_blocks(depth, blocks)
+                            self.checkpoint.add_nodes(depth + 1, children)
+                            self.checkpoint.save(depth, start + len(nodes))
+
+                    self._finish_level(depth)
+                    frontier, next_frontier = next_frontier, []
+                    depth, position = depth + 1, 0
+                    if self.checkpoint is not None:
+                        self.checkpoint.save(depth, 0)
+        finally:
+            for spool in self._spools.values():
+                spool.close()
+            self._spools.clear()
+
+        if self.checkpoint is not None:
+            self.checkpoint.clear()
+        if self.cache is not None:
+            print(
+                f"Запросов к API: {self.requests}, не изменилось (304): "
+                f"{self.not_modified}, взято из кэша: {self.from_cache}"
+            )
+        if self.writer is not None:
+            return dict(self.writer.rows)
+        return {depth: buffer.to_frame() for depth, buffer in self.buffers.items()}
@@ -0,0 +1,238 @@
+"""
+Локальный сервер-заглушка API карты ОКАТО/ОКТМО для проверок обходчика
+(bench_crawler.py, bench_checkpoint.py, bench_writers.py).
+
+Дерево территорий строится детерминированно по fanout — числу детей на
+каждой глубине. Сервер считает запросы, следит за числом одновременных
+запросов, отдаёт ETag и 304 на If-None-Match, может отвечать 503 на
+первые запросы каждого URL и подмешивать общий для всех родителей
+дочерний узел (один URL у нескольких родителей одной глубины).
+
+Здесь же — reference_frames: прежний последовательный рекурсивный обход,
+эталон для сравнения таблиц.
+"""
+
+import json
+import time
+import hashlib
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+import requests
+
+SHARED = "shared"  # код ОКТМО общего дочернего узла
+
+
+class FixtureApi:
+    """
+    Args:
+        fanout: число детей у узла на каждой глубине; у листьев
+            (глубина len(fanout)) детей нет.
+        latency: задержка ответа, секунд.
+        shared: у каждого узла глубины 1 есть общий ребёнок SHARED с
+            собственными детьми-листьями.
+        fail_first: столько первых запросов каждого URL получают 503.
+        padding: длина строкового свойства, которое раздувает ответы.
+    """
+
+    def __init__(
+        self,
+        fanout: Sequence[int] = (5, 4, 3),
+        latency: float = 0.0,
+        shared: bool = False,
+        fail_first: int = 0,
+        padding: int = 0,
+    ):
+        self.fanout = tuple(fanout)
+        self.latency = latency
+        self.shared = shared
+        self.fail_first = fail_first
+        self.padding = padding
+        # Версия названия узла: меняя её, имитируем изменения на сервере
+        self.versions: Dict[str, int] = {}
+        self.requests: Counter = Counter()
+        self.not_modified = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    # ——— Дерево ———
+
+    def _children(self, oktmo: str) -> List[dict]:
+        if oktmo == SHARED:
+            return [{"oktmo": f"{SHARED}.{i}", "hasChildren": False} for i in range(3)]
+        path = oktmo.split(".") if oktmo else []
+        depth = len(path)
+        if depth >= len(self.fanout):
+            return []
+        children = [
+            {
+                "oktmo": ".".join(path + [str(i)]),
+                "hasChildren": depth + 1 < len(self.fanout),
+            }
+            for i in range(self.fanout[depth])
+        ]
+        if self.shared and depth == 1:
+            children.append({"oktmo": SHARED, "hasChildren": True})
+        return children
+
+    def body(self, oktmo: str) -> bytes:
+        features = []
+        for child in self._children(oktmo):
+            properties = {
+                "name": f"n{child['oktmo']}v{self.versions.get(child['oktmo'], 1)}",
+                "oktmo": child["oktmo"],
+                "hasChildren": child["hasChildren"],
+            }
+            if self.padding:
+                properties["description"] = "x" * self.padding
+            features.append({"type": "Feature", "properties": properties})
+        data = {"data": {"properties": {"parent": oktmo}, "features": features}}
+        return json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+    def rename(self, oktmo: str):
+        """Меняет название узла — меняется ответ его родителя."""
+        self.versions[oktmo] = self.versions.get(oktmo, 1) + 1
+
+    def nodes(self) -> int:
+        """Сколько запросов нужно на полный обход без повторов."""
+        count, level = 1, 1
+        for i, width in enumerate(self.fanout[:-1]):
+            level *= width
+            count += level
+            if self.shared and i == 0:
+                count += 1
+        return count
+
+    # ——— Сервер ———
+
+    def handle(self, handler: BaseHTTPRequestHandler):
+        query = parse_qs(urlparse(handler.path).query)
+        oktmo = query.get("query", [""])[0]
+        with self._lock:
+            self.requests[oktmo] += 1
+            attempt = self.requests[oktmo]
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+            if attempt <= self.fail_first:
+                handler.send_response(503)
+                handler.send_header("Content-Length", "0")
+                handler.end_headers()
+                return
+            body = self.body(oktmo)
+            etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+            if handler.headers.get("If-None-Match") == etag:
+                with self._lock:
+                    self.not_modified += 1
+                handler.send_response(304)
+                handler.send_header("ETag", etag)
+                handler.end_headers()
+                return
+            handler.send_response(200)
+            handler.send_header("Content-Type", "application/json; charset=utf-8")
+            handler.send_header("Content-Length", str(len(body)))
+            handler.send_header("ETag", etag)
+            handler.end_headers()
+            handler.wfile.write(body)
+        except ConnectionError:
+            # Клиент отменил запрос (прерванный обход) — ответ не нужен
+            pass
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def reset_stats(self):
+        with self._lock:
+            self.requests.clear()
+            self.not_modified = 0
+            self.max_in_flight = 0
+
+    def start(self) -> str:
+        """Запускает сервер в фоновом потоке и возвращает URL корня."""
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                api.handle(self)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self.url
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}/api/map?country=russia"
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def reference_frames(url: str, max_depth: int) -> Dict[int, pd.DataFrame]:
+    """Прежний алгоритм: последовательные запросы, рекурсия и concat на ответ."""
+    frames: Dict[int, pd.DataFrame] = {}
+
+    def visit(url: str, parents: List[dict], depth: int):
+        if depth > max_depth:
+            return
+        response = requests.get(url, timeout=10)
+        response.raise_for_status()
+        data = response.json()["data"]
+        collection = data.get("properties", {})
+        features = data.get("features", [])
+        if not features:
+            return
+        feature_header = list(features[0].get("properties", {}))
+        header = [f"{key}_{i}" for i, parent in enumerate(parents) for key in parent]
+        header += [f"feature_collection_{key}_{depth}" for key in collection]
+        header += [f"{key}_{depth}" for key in feature_header]
+        parent_values = [value for parent in parents for value in parent.values()]
+        rows = [
+            parent_values
+            + list(collection.values())
+            + [feature["properties"].get(key, "") for key in feature_header]
+            for feature in features
+        ]
+        df = pd.DataFrame(rows, columns=header)
+        frames[depth] = (
+            df
+            if depth not in frames
+            else pd.concat([frames[depth], df], ignore_index=True)
+        )
+        for feature in features:
+            properties = feature["properties"]
+            if properties.get("hasChildren") == True and properties.get("oktmo"):
+                current = {f"feature_collection_{k}": v for k, v in collection.items()}
+                current.update((key, properties.get(key, "")) for key in feature_header)
+                child = url.split("&query=")[0] + f"&query={properties['oktmo']}"
+                visit(child, parents + [current], depth + 1)
+
+    visit(url, [], 0)
+    return frames
+
+
+def same_frames(left: Dict[int, pd.DataFrame], right: Dict[int, pd.DataFrame]) -> bool:
+    """Одинаковые глубины, столбцы и значения (пропуски и типы не различаются)."""
+    if sorted(left) != sorted(right):
+        return False
+    for depth in left:
+        a, b = left[depth], right[depth]
+        if list(a.columns) != list(b.columns) or len(a) != len(b):
+            return False
+        if not a.fillna("").astype(str).equals(b.fillna("").astype(str)):
+            return False
+    return True
@@ -0,0 +1,211 @@
+import os
+import io
+import csv
+import zipfile
+import tempfile
+import itertools
+from typing import Dict, Iterable, List
+
+import xlsxwriter
+
+SHEET_NAME = "okato-oktmo-depth-{depth}"
+PARQUET_ROW_GROUP = 10_000  # строк в группе Parquet
+
+
+def _depth_name(depth: int) -> str:
+    return SHEET_NAME.format(depth=depth)
+
+
+class OutputWriter:
+    """
+    Запись таблиц глубин по мере обхода.
+
+    Обходчик передаёт каждую глубину, как только она загружена целиком:
+    заголовок (объединение столбцов в порядке появления) и строки —
+    перечитываемую последовательность, которая читает блоки ответов из
+    временного файла глубины и разворачивает их по одной строке. В памяти
+    писатель держит не больше группы строк.
+    """
+
+    extension = ""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.rows: Dict[int, int] = {}
+
+    def write_depth(self, depth: int, header: List[str], rows: Iterable[list]):
+        self.rows[depth] = self._write_depth(depth, header, rows)
+
+    def _write_depth(self, depth: int, header: List[str], rows: Iterable[list]) -> int:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def discard(self):
+        """Закрывает писатель и удаляет файл — например, если данных не оказалось."""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def _excel_value(value):
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+class ExcelWriter(OutputWriter):
+    """Книга xlsx, лист на глубину; xlsxwriter в режиме constant_memory."""
+
+    extension = ".xlsx"
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self.workbook = xlsxwriter.Workbook(
+            path, {"constant_memory": True, "strings_to_urls": False}
+        )
+        # Как заголовок в DataFrame.to_excel
+        self.header_format = self.workbook.add_format(
+            {"bold": True, "border": 1, "align": "center", "valign": "top"}
+        )
+
+    def _write_depth(self, depth, header, rows):
+        worksheet = self.workbook.add_worksheet(_depth_name(depth))
+        worksheet.write_row(0, 0, header, self.header_format)
+        count = 0
+        for count, row in enumerate(rows, start=1):
+            for col, value in enumerate(row):
+                if value is not None:
+                    worksheet.write(count, col, _excel_value(value))
+        return count
+
+    def close(self):
+        self.workbook.close()
+
+
+class CsvWriter(OutputWriter):
+    """Zip-архив с CSV-файлом на глубину."""
+
+    extension = ".zip"
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self.archive = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED)
+
+    def _write_depth(self, depth, header, rows):
+        count = 0
+        with self.archive.open(f"{_depth_name(depth)}.csv", "w") as raw:
+            with io.TextIOWrapper(raw, encoding="utf-8", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(header)
+                for count, row in enumerate(rows, start=1):
+                    writer.writerow(row)
+        return count
+
+    def close(self):
+        self.archive.close()
+
+
+def _arrow_type(kinds: set):
+    import pyarrow as pa
+
+    if kinds == {bool}:
+        return pa.bool_()
+    if kinds and kinds <= {int}:
+        return pa.int64()
+    if kinds and kinds <= {int, float}:
+        return pa.float64()
+    return pa.string()
+
+
+class ParquetWriter(OutputWriter):
+    """
+    Zip-архив с Parquet-файлом на глубину.
+
+    Типы столбцов выводятся по всем значениям глубины (первый проход по
+    строкам), смешанные столбцы записываются строками; затем строки
+    пишутся группами по PARQUET_ROW_GROUP.
+    """
+
+    extension = ".zip"
+
+    def __init__(self, path: str):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise RuntimeError("Для записи в Parquet установите pyarrow")
+        super().__init__(path)
+        self.archive = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_STORED)
+
+    def _schema(self, header, rows):
+        import pyarrow as pa
+
+        kinds = [set() for _ in header]
+        for row in rows:
+            for col, value in enumerate(row):
+                if value is not None:
+                    kinds[col].add(type(value))
+        return pa.schema(
+            [(name, _arrow_type(kind)) for name, kind in zip(header, kinds)]
+        )
+
+    def _batch(self, schema, rows):
+        import pyarrow as pa
+
+        arrays = []
+        for field, values in zip(schema, zip(*rows)):
+            if pa.types.is_string(field.type):
+                values = [None if v is None else str(v) for v in values]
+            arrays.append(pa.array(values, type=field.type))
+        return pa.Table.from_arrays(arrays, schema=schema)
+
+    def _write_depth(self, depth, header, rows):
+        import pyarrow.parquet as pq
+
+        # Вывод типов — отдельный проход: rows перечитываются (см. LevelRows)
+        schema = self._schema(header, rows)
+
+        fd, tmp_path = tempfile.mkstemp(
+            suffix=".parquet", dir=os.path.dirname(os.path.abspath(self.path))
+        )
+        os.close(fd)
+        try:
+            count = 0
+            iterator = iter(rows)
+            with pq.ParquetWriter(tmp_path, schema) as writer:
+                while True:
+                    batch = list(itertools.islice(iterator, PARQUET_ROW_GROUP))
+                    if not batch:
+                        break
+                    writer.write_table(self._batch(schema, batch))
+                    count += len(batch)
+            self.archive.write(tmp_path, f"{_depth_name(depth)}.parquet")
+        finally:
+            os.remove(tmp_path)
+        return count
+
+    def close(self):
+        self.archive.close()
+
+
+WRITERS = {
+    "xlsx": ExcelWriter,
+    "csv": CsvWriter,
+    "parquet": ParquetWriter,
+}
+
+
+def create_writer(output_format: str, path: str) -> OutputWriter:
+    """
+    Создаёт писатель формата output_format. Расширение файла заменяется на
+    расширение формата (.xlsx или .zip для CSV и Parquet).
+    """
+    try:
+        writer_class = WRITERS[output_format]
+    except KeyError:
+        raise ValueError(
+            f"Неизвестный формат вывода '{output_format}', доступны: {', '.join(WRITERS)}"
+        )
+    path = os.path.splitext(path)[0] + writer_class.extension
+    return writer_class(path)
@@ -0,0 +1,75 @@
+# script_worker.py
+"""
+Код, выполняемый в процессах скриптов (см. handlers/script_runner.py).
+
+Модуль намеренно не зависит от пакета handlers: рабочему процессу не нужны
+ни бот, ни хранилища — только скомпилированный код скрипта.
+"""
+
+import io
+import sys
+import types
+import pickle
+import marshal
+import contextlib
+
+
+class ProgressWriter(io.TextIOBase):
+    """Подменяет stdout скрипта: каждая напечатанная строка уходит в очередь прогресса."""
+
+    def __init__(self, queue):
+        self.queue = queue
+        self._buffer = ""
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        sys.__stdout__.write(text)  # вывод скрипта по-прежнему виден в консоли
+        self._buffer += text
+        while "\n" in self._buffer:
+            line, self._buffer = self._buffer.split("\n", 1)
+            if line.strip():
+                try:
+                    self.queue.put_nowait(line.strip())
+                except Exception:
+                    pass  # прогресс не важнее самого скрипта
+        return len(text)
+
+
+def run_script(module_name: str, path: str, code_bytes: bytes, progress_queue=None):
+    """Выполняет скомпилированный скрипт как свежий модуль и возвращает результат main()."""
+    code = marshal.loads(code_bytes)
+    module = types.ModuleType(module_name)
+    module.__file__ = path
+
+    stdout = ProgressWriter(progress_queue) if progress_queue is not None else None
+    with contextlib.redirect_stdout(stdout) if stdout else contextlib.nullcontext():
+        exec(code, module.__dict__)
+        result = module.main()
+
+    # Результат возвращается в процесс бота — непередаваемое превращаем в строку
+    try:
+        pickle.dumps(result)
+    except Exception:
+        result = str(result)
+    return result
+
+
+def run_in_process(
+    connection, module_name: str, path: str, code_bytes: bytes, progress_queue=None
+):
+    """
+    Точка входа процесса скрипта: ("ok", результат) или ("error", исключение)
+    отправляется боту через connection.
+    """
+    try:
+        reply = ("ok", run_script(module_name, path, code_bytes, progress_queue))
+    except BaseException as e:
+        try:
+            pickle.dumps(e)
+        except Exception:
+            e = RuntimeError(f"{type(e).__name__}: {e}")
+        reply = ("error", e)
+    connection.send(reply)
+    connection.close()
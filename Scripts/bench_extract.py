@@ -0,0 +1,134 @@
+"""
+Сравнение извлечения аннотаций из сохранённых страниц патентов:
+дерево BeautifulSoup с несколькими проходами регулярных выражений против
+потокового AbstractExtractor.
+
+Сначала оба пути сверяются на граничных случаях разметки (комментарии,
+script и style, CDATA, вложенные блоки), в том числе при подаче страницы
+кусками в несколько символов.
+
+Запуск: python Scripts/bench_extract.py [каталог со страницами *.html]
+Без каталога страницы генерируются (как в bench_patents.py).
+"""
+
+import os
+import re
+import sys
+import glob
+import time
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from patent_extract import NOT_FOUND, extract_abstract
+
+SYNTHETIC_PAGES = 50
+
+EDGE_CASES = [
+    '<div class="abstract">a<!-- c -->b</div>',
+    '<div class="abstract">a<!-- <div> -->b</div>c',
+    '<div class="abstract">a<script>var s = "</div>";</script>b</div>',
+    '<div class="abstract">a<style>p { color: red }</style>b</div>',
+    '<div class="abstract">a<script/>b<style></style>c</div>',
+    '<div class="abstract">a<![CDATA[x < y]]>b<?pi data?>c</div>',
+    '<div class="abstract">a&amp;b&nbsp;c<div>d<div/>e</div>f</div>',
+    "<script>document.write('<div class=\"abstract\">x</div>')</script>"
+    '<!-- <div class="abstract">y</div> --><div class="abstract">z</div>',
+    '<div class="abstract"> <b>a</b>\n\t<i>b</i>\u200b </div>',
+    '<div class="abstract"></div>',
+    "<div>без аннотации</div>",
+]
+
+
+def soup_abstract(html: str) -> str:
+    """Прежнее извлечение: полное дерево и три прохода по тексту."""
+    soup = BeautifulSoup(html, "html.parser")
+    abstract_div = soup.find("div", class_="abstract")
+    if abstract_div:
+        text = abstract_div.get_text(" ")
+        text = re.sub(r"[\n\r\t\xa0\u200b]", " ", text)
+        text = re.sub(r" +", " ", text)
+        return text.strip()
+    return NOT_FOUND
+
+
+def check_edge_cases():
+    """AbstractExtractor совпадает с BeautifulSoup на граничных случаях."""
+    for html in EDGE_CASES:
+        expected = soup_abstract(html)
+        for chunk_size in (1, 2, 3, len(html)):
+            text = extract_abstract(html, chunk_size)
+            assert text == expected, (html, chunk_size, text, expected)
+    print(f"Граничные случаи разметки: {len(EDGE_CASES)}, совпадают с BeautifulSoup")
+
+
+def load_corpus(directory: str):
+    pages = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.html"))):
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            pages.append(f.read())
+    return pages
+
+
+def synthetic_corpus(count: int):
+    from bench_patents import make_page
+
+    pages = []
+    for i in range(count):
+        page = make_page(i).decode("utf-8")
+        # Вложенные блоки, сущности и разные пробелы внутри аннотации
+        page = page.replace(
+            "слово 3.",
+            "слово&nbsp;3.\n\t<div><b>формула</b> &amp; <i>чертёж</i></div>\u200b",
+        )
+        pages.append(page)
+    return pages
+
+
+def measure(extract, pages):
+    started = time.perf_counter()
+    texts = [extract(page) for page in pages]
+    elapsed = time.perf_counter() - started
+
+    peak = 0
+    for page in pages[:20]:
+        tracemalloc.start()
+        extract(page)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return texts, elapsed, peak
+
+
+def main():
+    check_edge_cases()
+    if len(sys.argv) > 1:
+        pages = load_corpus(sys.argv[1])
+        source = sys.argv[1]
+    else:
+        pages = synthetic_corpus(SYNTHETIC_PAGES)
+        source = "сгенерированные страницы"
+    if not pages:
+        print("Страниц для сравнения нет.")
+        return
+
+    size = sum(len(page) for page in pages) / len(pages) / 1024
+    print(f"{len(pages)} страниц ({source}), в среднем {size:.0f} КБ")
+
+    expected = None
+    for name, extract in (
+        ("BeautifulSoup + re", soup_abstract),
+        ("AbstractExtractor", extract_abstract),
+    ):
+        texts, elapsed, peak = measure(extract, pages)
+        expected = expected or texts
+        print(
+            f"{name:25} {len(pages) / elapsed:8.1f} стр/сек, "
+            f"пик памяти на страницу {peak / 1024 / 1024:6.2f} МБ, "
+            f"совпадает: {texts == expected}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Задержка поиска по индексу патентов (handlers/patent_search.py) на
+синтетической базе.
+
+В базу формата PatentStore записываются аннотации из слов словаря в
+разных формах. Прежний путь запроса — update() перед каждым поиском: у
+только что запущенного бота это полный проход по таблицам, дальше —
+подсчёт патентов на каждый запрос. Его задержка сравнивается с поиском по
+индексу, который обновляется в фоне. Новые патенты находятся после
+очередного update().
+
+Запуск: python Scripts/bench_patent_search.py [патентов]
+"""
+
+import os
+import sys
+import time
+import random
+import tempfile
+import statistics
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+BOT_DIR = os.path.join(os.path.dirname(SCRIPTS_DIR), "OBS_TBot")
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, BOT_DIR)
+# Логгеры бота пишут в logs/ текущего каталога — как при запуске бота
+os.chdir(BOT_DIR)
+
+from patent_requests import PatentStore, patent_number
+from handlers.patent_search import PatentIndex
+
+PATENTS = 10000
+WORDS = 30  # слов в аннотации
+ADDED = 100  # патентов, загруженных после построения индекса
+ROUNDS = 200  # запросов для средней задержки
+SEED = 1
+
+FORMS = [
+    ("способ", "способа", "способом", "способы"),
+    ("очистка", "очистки", "очистку", "очисткой"),
+    ("вода", "воды", "воду", "водой"),
+    ("устройство", "устройства", "устройством", "устройств"),
+    ("насос", "насоса", "насосом", "насосы"),
+    ("фильтр", "фильтра", "фильтром", "фильтры"),
+    ("двигатель", "двигателя", "двигателем", "двигатели"),
+    ("корпус", "корпуса", "корпусом", "корпусе"),
+    ("датчик", "датчика", "датчиком", "датчики"),
+    ("сплав", "сплава", "сплавом", "сплавы"),
+    ("покрытие", "покрытия", "покрытием", "покрытий"),
+    ("изобретение", "изобретения", "изобретением", "изобретений"),
+]
+FILLER = [f"термин{i}" for i in range(2000)]
+QUERIES = [
+    "способ очистки воды",
+    "насосом",
+    "фильтры двигателя",
+    "датчик корпуса",
+    "покрытие сплава",
+    "устройство для очистки",
+]
+NEW_WORD = "гидрокавитатор"
+
+
+def abstract(rng: random.Random, extra: str = "") -> str:
+    words = [
+        rng.choice(rng.choice(FORMS)) if rng.random() < 0.3 else rng.choice(FILLER)
+        for _ in range(WORDS)
+    ]
+    return " ".join(words + ([extra] if extra else [])).capitalize() + "."
+
+
+def fill(path: str, start: int, count: int, rng: random.Random, extra: str = ""):
+    store = PatentStore(path)
+    rows = []
+    for number in range(start, start + count):
+        url = f"https://patents.example.com/patent/RU{number}C1/ru"
+        rows.append((url, patent_number(url), abstract(rng, extra), None, time.time()))
+    with store.connection:
+        store.connection.executemany(
+            "INSERT OR REPLACE INTO patents (url, number, abstract, error, fetched_at)"
+            " VALUES (?, ?, ?, ?, ?)",
+            rows,
+        )
+    store.close()
+
+
+def timed(func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    return result, (time.perf_counter() - started) * 1000
+
+
+def search_with_update(index: PatentIndex, query: str):
+    """Прежний путь запроса: индекс обновлялся перед каждым поиском."""
+    index.update()
+    return index.search(query)
+
+
+def main():
+    patents = int(sys.argv[1]) if len(sys.argv) > 1 else PATENTS
+    rng = random.Random(SEED)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "patents.db")
+        fill(path, 0, patents, rng)
+
+        builder = PatentIndex(path)
+        added, build = timed(builder.update)
+        builder.close()
+        assert added == patents, added
+        print(f"{patents} патентов: индекс построен за {build:.0f} мс")
+
+        # Первый запрос после перезапуска бота
+        old, new = PatentIndex(path), PatentIndex(path)
+        old_hits, old_first = timed(search_with_update, old, QUERIES[0])
+        new_hits, new_first = timed(new.search, QUERIES[0])
+        print(
+            f"Первый запрос после запуска: с update() {old_first:.1f} мс, "
+            f"по индексу {new_first:.1f} мс"
+        )
+        assert old_hits == new_hits and new_hits, (old_hits, new_hits)
+        assert new_first < old_first, (new_first, old_first)
+
+        # Установившийся режим: update() на каждый запрос ничего не добавляет
+        old_times, new_times = [], []
+        for i in range(ROUNDS):
+            query = QUERIES[i % len(QUERIES)]
+            old_hits, elapsed = timed(search_with_update, old, query)
+            old_times.append(elapsed)
+            new_hits, elapsed = timed(new.search, query)
+            new_times.append(elapsed)
+            assert old_hits == new_hits, query
+        print(
+            f"Средняя задержка {ROUNDS} запросов: с update() "
+            f"{statistics.mean(old_times):.2f} мс, по индексу "
+            f"{statistics.mean(new_times):.2f} мс"
+        )
+
+        # Новые патенты попадают в поиск после фонового обновления
+        fill(path, patents, ADDED, rng, NEW_WORD)
+        assert new.search(NEW_WORD) == [], "поиск обновил индекс сам"
+        added, elapsed = timed(new.update)
+        found = new.search(NEW_WORD, limit=ADDED)
+        print(f"Дозагрузка {ADDED} патентов: индекс обновлён за {elapsed:.0f} мс")
+        assert added == ADDED, added
+        assert len(found) == ADDED, len(found)
+
+        old.close()
+        new.close()
+    print("Все проверки пройдены.")
+
+
+if __name__ == "__main__":
+    main()
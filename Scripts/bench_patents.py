@@ -0,0 +1,126 @@
+"""
+Сравнение загрузки аннотаций патентов: прежний последовательный
+requests + BeautifulSoup по всей странице против PatentFetcher.
+
+Страницы отдаёт локальный сервер-заглушка с задержкой ответа; аннотация
+стоит в начале страницы, за ней — объёмный остаток, как у Google Patents.
+
+Запуск: python Scripts/bench_patents.py [страниц]
+"""
+
+import os
+import sys
+import time
+import asyncio
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_extract import soup_abstract
+from patent_requests import PatentFetcher, PatentStore, headers
+
+PAGES = 50
+LATENCY = 0.05  # секунд на ответ сервера-заглушки
+TAIL_SIZE = 300 * 1024  # байт страницы после аннотации
+
+
+def make_page(number: int) -> bytes:
+    abstract = " ".join(
+        f"Изобретение {number} относится к области техники, слово {i}."
+        for i in range(40)
+    )
+    tail = "<div class='description'><p>Описание изобретения.</p></div>\n" * (
+        TAIL_SIZE // 60
+    )
+    return (
+        "<html><head><title>Патент</title></head><body>"
+        f'<section><div class="abstract" num="0001">{abstract}</div></section>'
+        f"{tail}</body></html>"
+    ).encode("utf-8")
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        number = int(self.path.rstrip("/").rsplit("/", 1)[-1])
+        body = make_page(number)
+        time.sleep(LATENCY)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # клиент прочитал аннотацию и закрыл соединение
+
+
+def sequential(links):
+    texts = []
+    for link in links:
+        response = requests.get(link, headers=headers, timeout=10)
+        response.raise_for_status()
+        response.encoding = "utf-8"
+        texts.append(soup_abstract(response.text))
+    return texts
+
+
+def concurrent(links, directory):
+    store = PatentStore(os.path.join(directory, "patents.db"))
+    fetcher = PatentFetcher(host_interval=0)
+    try:
+        asyncio.run(fetcher.fetch_all(links, store))
+        texts = [
+            text
+            for (text,) in store.connection.execute(
+                "SELECT abstract FROM patents ORDER BY CAST(number AS INTEGER)"
+            )
+        ]
+    finally:
+        store.close()
+    return texts, fetcher.bytes_read
+
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else PAGES
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    links = [f"http://127.0.0.1:{server.server_port}/patent/{i}" for i in range(pages)]
+
+    started = time.perf_counter()
+    expected = sequential(links)
+    sequential_time = time.perf_counter() - started
+
+    with tempfile.TemporaryDirectory() as directory, open(os.devnull, "w") as null:
+        stdout, sys.stdout = sys.stdout, null
+        try:
+            started = time.perf_counter()
+            texts, bytes_read = concurrent(links, directory)
+            concurrent_time = time.perf_counter() - started
+        finally:
+            sys.stdout = stdout
+    server.shutdown()
+
+    page_size = len(make_page(0))
+    print(f"{pages} страниц по {page_size / 1024:.0f} КБ, задержка {LATENCY} сек")
+    print(
+        f"requests + BeautifulSoup: {sequential_time:.2f} сек "
+        f"({pages / sequential_time:.1f} стр/сек), прочитано "
+        f"{pages * page_size / 1024 / 1024:.1f} МБ"
+    )
+    print(
+        f"PatentFetcher:            {concurrent_time:.2f} сек "
+        f"({pages / concurrent_time:.1f} стр/сек), прочитано "
+        f"{bytes_read / 1024 / 1024:.1f} МБ"
+    )
+    print(f"Аннотации совпадают: {texts == expected}")
+
+
+if __name__ == "__main__":
+    main()
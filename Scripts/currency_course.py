@@ -1,41 +1,194 @@
+import os
+import json
 import requests
 import xml.etree.ElementTree as ET
+from datetime import date, datetime, time, timedelta
+from typing import Dict, NamedTuple, Optional
+from zoneinfo import ZoneInfo
 
 API_URL = "http://www.cbr.ru/scripts/XML_daily.asp"
+DYNAMIC_URL = "http://www.cbr.ru/scripts/XML_dynamic.asp"
 
+CURRENCIES = ["USD", "EUR", "CNY", "BYN", "TRY", "INR"]
 
-def get_currency_rate(currency_code):
-    """Получает курс валюты по ее коду из API ЦБ РФ."""
+CBR_TIMEZONE = ZoneInfo("Europe/Moscow")
+# ЦБ публикует курсы на следующий день в рабочие дни около 15:30 МСК;
+# до этого времени загруженный документ не устаревает
+PUBLICATION_TIME = time(15, 30)
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".currency_cache")
+REQUEST_TIMEOUT = 30
+
+
+class DailyRates(NamedTuple):
+    """Курсы ЦБ из одного документа XML_daily: индекс CharCode -> курс."""
+
+    date: str  # дата, на которую установлены курсы (ДД.ММ.ГГГГ)
+    rates: Dict[str, float]  # рублей за одну единицу валюты
+    ids: Dict[str, str]  # внутренние коды ЦБ (нужны для истории)
+    expires_at: float  # timestamp следующей публикации
+
+
+def next_publication(moment: datetime) -> datetime:
+    """Ближайшая после moment публикация курсов (субботу и воскресенье ЦБ пропускает)."""
+    moment = moment.astimezone(CBR_TIMEZONE)
+    candidate = datetime.combine(moment.date(), PUBLICATION_TIME, CBR_TIMEZONE)
+    if candidate <= moment:
+        candidate += timedelta(days=1)
+    while candidate.weekday() >= 5:
+        candidate += timedelta(days=1)
+    return candidate
+
+
+def _rate(element) -> float:
+    value = element.find("Value").text
+    nominal = element.find("Nominal").text
+    return float(value.replace(",", ".")) / float(nominal)
+
+
+def _write_json(path: str, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path: str):
     try:
-        response = requests.get(API_URL)
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class RateService:
+    """
+    Курсы валют ЦБ РФ.
+
+    Ежедневный документ загружается один раз и разбирается в индекс
+    CharCode -> курс; он хранится в памяти и на диске до следующей
+    публикации ЦБ, поэтому с тёплым кэшем курсы отдаются без обращения
+    к сети. История курсов за диапазон дат кэшируется на диске по дням:
+    прошедшие дни не меняются, и загружаются только недостающие.
+    """
+
+    def __init__(self, cache_dir: str = CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.daily_path = os.path.join(cache_dir, "daily.json")
+        self._daily: Optional[DailyRates] = None
+
+    def _fetch(self, url: str, params: Optional[dict] = None) -> ET.Element:
+        response = requests.get(url, params=params, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         response.encoding = "windows-1251"
-        root = ET.fromstring(response.text)
+        return ET.fromstring(response.text)
+
+    # ——— Курсы на сегодня ———
 
+    def _load_daily(self) -> DailyRates:
+        root = self._fetch(API_URL)
+        rates = {}
+        ids = {}
         for valute in root.findall("Valute"):
-            if valute.find("CharCode").text == currency_code:
-                value = valute.find("Value").text
-                nominal = valute.find("Nominal").text
-                return float(value.replace(",", ".")) / float(nominal)
+            code = valute.find("CharCode").text
+            rates[code] = _rate(valute)
+            ids[code] = valute.get("ID")
+        expires_at = next_publication(datetime.now(CBR_TIMEZONE)).timestamp()
+        return DailyRates(root.get("Date"), rates, ids, expires_at)
 
-        return None  # Если валюта не найдена
+    def daily(self) -> Optional[DailyRates]:
+        """Актуальные курсы или None, если загрузить их не удалось."""
+        now = datetime.now().timestamp()
+        if self._daily is not None and self._daily.expires_at > now:
+            return self._daily
+
+        cached = _read_json(self.daily_path)
+        if cached and cached.get("expires_at", 0) > now:
+            self._daily = DailyRates(**cached)
+            return self._daily
+
+        try:
+            self._daily = self._load_daily()
+        except requests.exceptions.RequestException as e:
+            print(f"Ошибка при запросе к API: {e}")
+            return None
+        except (ET.ParseError, AttributeError, ValueError) as e:
+            print(f"Ошибка при обработке XML: {e}")
+            return None
+        _write_json(self.daily_path, self._daily._asdict())
+        return self._daily
+
+    def rate(self, currency_code: str) -> Optional[float]:
+        daily = self.daily()
+        if daily is None:
+            return None
+        return daily.rates.get(currency_code)
+
+    # ——— История ———
+
+    def history(self, currency_code: str, start: date, end: date) -> Dict[date, float]:
+        """
+        Курсы валюты за каждый день диапазона, на который ЦБ их устанавливал.
+        С диска берутся уже загруженные прошедшие дни, остальные
+        запрашиваются одним запросом XML_dynamic.
+        """
+        path = os.path.join(self.cache_dir, f"history-{currency_code}.json")
+        cached = _read_json(path) or {"rates": {}, "covered": []}
+        rates = cached["rates"]
+        covered = set(cached["covered"])
+
+        days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+        missing = [day for day in days if day.isoformat() not in covered]
+        if missing:
+            daily = self.daily()
+            if daily is None or currency_code not in daily.ids:
+                print(f"Неизвестный код валюты: {currency_code}")
+                return {}
+            try:
+                root = self._fetch(
+                    DYNAMIC_URL,
+                    {
+                        "date_req1": missing[0].strftime("%d/%m/%Y"),
+                        "date_req2": missing[-1].strftime("%d/%m/%Y"),
+                        "VAL_NM_RQ": daily.ids[currency_code],
+                    },
+                )
+                for record in root.findall("Record"):
+                    day = datetime.strptime(record.get("Date"), "%d.%m.%Y").date()
+                    rates[day.isoformat()] = _rate(record)
+            except requests.exceptions.RequestException as e:
+                print(f"Ошибка при запросе к API: {e}")
+            except (ET.ParseError, AttributeError, ValueError) as e:
+                print(f"Ошибка при обработке XML: {e}")
+            else:
+                # Прошедшие дни больше не изменятся — их можно не запрашивать
+                today = datetime.now(CBR_TIMEZONE).date()
+                covered.update(day.isoformat() for day in missing if day < today)
+                _write_json(path, {"rates": rates, "covered": sorted(covered)})
+
+        return {day: rates[day.isoformat()] for day in days if day.isoformat() in rates}
+
+
+rate_service = RateService()
+
+
+def get_currency_rate(currency_code):
+    """Получает курс валюты по ее коду из API ЦБ РФ."""
+    return rate_service.rate(currency_code)
 
-    except requests.exceptions.RequestException as e:
-        print(f"Ошибка при запросе к API: {e}")
-        return None
-    except ET.ParseError as e:
-        print(f"Ошибка при обработке XML: {e}")
-        return None
 
+def main(currencies=CURRENCIES):
+    daily = rate_service.daily()
+    lines = [f"Курсы валют ЦБ РФ на {daily.date}:" if daily else "Курсы валют ЦБ РФ:"]
+    for currency in currencies:
+        rate = daily.rates.get(currency) if daily else None
+        if rate is not None:
+            lines.append(f"{currency}: {rate:.4f} руб.")
+        else:
+            lines.append(f"{currency}: не удалось получить курс")
+    return "\n".join(lines)
 
-# Получаем курсы валют
-currencies = ["USD", "EUR", "CNY", "BYN", "TRY", "INR"]
-rates = {code: get_currency_rate(code) for code in currencies}
 
-# Выводим результаты
-print("Курсы валют ЦБ РФ:")
-for currency, rate in rates.items():
-    if rate is not None:
-        print(f"{currency}: {rate:.4f} руб.")
-    else:
-        print(f"{currency}: не удалось получить курс")
+if __name__ == "__main__":
+    print(main())
@@ -0,0 +1,303 @@
+import os
+import sys
+import json
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from currency_course import CACHE_DIR, CBR_TIMEZONE, CURRENCIES, rate_service
+
+SERIES_DIR = os.path.join(CACHE_DIR, "series")
+BACKFILL_YEARS = 5
+REPORT_WINDOW = 30  # дней для скользящего среднего и изменения в отчёте
+
+
+class CurrencySeries:
+    """
+    Курсы ЦБ по дням в столбцовом хранилище: NumPy memmap формы
+    (дни, валюты), float64, рублей за единицу валюты.
+
+    В каждый календарный день записан действующий курс: выходные и
+    праздники заполняются последним установленным, дни без данных — NaN.
+    Диапазон дат и список валют — в meta.json рядом с массивом. Запросы
+    векторные и читают только нужный срез файла.
+    """
+
+    def __init__(self, directory: str = SERIES_DIR):
+        self.directory = directory
+        self.meta_path = os.path.join(directory, "meta.json")
+        self.data_path = os.path.join(directory, "rates.f8")
+        self.start: Optional[date] = None
+        self.currencies: List[str] = []
+        self.data: Optional[np.ndarray] = None
+        self._signature = None
+
+    # ——— Файлы ———
+
+    def _file_signature(self):
+        try:
+            stat = os.stat(self.meta_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def open(self) -> bool:
+        """Открывает (или переоткрывает изменившееся) хранилище; False, если его нет."""
+        signature = self._file_signature()
+        if signature is None:
+            return False
+        if signature == self._signature:
+            return True
+        with open(self.meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.start = date.fromisoformat(meta["start"])
+        self.currencies = meta["currencies"]
+        self.data = np.memmap(
+            self.data_path,
+            dtype=np.float64,
+            mode="r",
+            shape=(meta["days"], len(self.currencies)),
+        )
+        self._signature = signature
+        return True
+
+    def _write(self, start: date, currencies: List[str], data: np.ndarray):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_data = f"{self.data_path}.tmp"
+        out = np.memmap(tmp_data, dtype=np.float64, mode="w+", shape=data.shape)
+        out[:] = data
+        out.flush()
+        del out
+        os.replace(tmp_data, self.data_path)
+
+        tmp_meta = f"{self.meta_path}.tmp"
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "start": start.isoformat(),
+                    "days": int(data.shape[0]),
+                    "currencies": currencies,
+                },
+                f,
+            )
+        os.replace(tmp_meta, self.meta_path)
+        self._signature = None
+
+    # ——— Загрузка ———
+
+    def backfill(
+        self, start: date, end: date, currencies: List[str] = CURRENCIES
+    ) -> bool:
+        """
+        Дополняет хранилище курсами за [start, end]. Сеть нужна только для
+        дней, которых ещё нет в дисковом кэше истории (RateService.history).
+
+        Если не удалось получить ни одного курса (например, ЦБ недоступен),
+        хранилище не записывается — иначе пустой массив, покрывающий
+        сегодняшний день, выглядел бы загруженным. Возвращает False в этом
+        случае.
+        """
+        if self.open():
+            start = min(start, self.start)
+            end = max(end, self.start + timedelta(days=len(self.data) - 1))
+            currencies = self.currencies + [
+                c for c in currencies if c not in self.currencies
+            ]
+
+        days = (end - start).days + 1
+        data = np.full((days, len(currencies)), np.nan)
+        for column, code in enumerate(currencies):
+            history = rate_service.history(code, start, end)
+            if not history:
+                continue
+            index = np.fromiter(((day - start).days for day in history), dtype=np.int64)
+            data[index, column] = np.fromiter(history.values(), dtype=np.float64)
+
+        if np.isnan(data).all():
+            return False
+        self._write(start, currencies, _forward_fill(data))
+        self.open()
+        return True
+
+    # ——— Запросы ———
+
+    def _rows(self, start: Optional[date], end: Optional[date]) -> Tuple[int, int]:
+        """
+        Строки первого и последнего дня окна относительно начала хранилища,
+        без ограничения его границами: дни вне хранилища — за ними.
+        """
+        first = (start - self.start).days if start else 0
+        last = (end - self.start).days if end else len(self.data) - 1
+        return first, last
+
+    def dates(self, start: date, end: date) -> np.ndarray:
+        first, last = self._rows(start, end)
+        return np.datetime64(self.start) + np.arange(first, last + 1)
+
+    def series(
+        self, code: str, start: Optional[date] = None, end: Optional[date] = None
+    ) -> np.ndarray:
+        """
+        Курс валюты (рублей за единицу) за каждый день [start, end]. Дни окна
+        вне хранилища — NaN: значение i всегда относится к дню start + i.
+        """
+        first, last = self._rows(start, end)
+        days = max(last - first + 1, 0)
+        if code == "RUB":
+            return np.ones(days)
+        try:
+            column = self.currencies.index(code)
+        except ValueError:
+            raise KeyError(f"Валюты {code} нет в хранилище")
+        values = np.full(days, np.nan)
+        # Пересечение окна с [0, len(data)) читается из memmap, остальное — NaN
+        low, high = max(first, 0), min(last, len(self.data) - 1)
+        if low <= high:
+            values[low - first : high - first + 1] = self.data[low : high + 1, column]
+        return values
+
+    def moving_average(self, code: str, window: int, start=None, end=None):
+        """
+        Скользящее среднее; значение i — среднее дней [i, i + window) с
+        известным курсом. Дни без данных (NaN) пропускаются, окно совсем без
+        данных даёт NaN.
+        """
+        values = self.series(code, start, end)
+        known = ~np.isnan(values)
+        sums = np.cumsum(np.insert(np.where(known, values, 0.0), 0, 0.0))
+        counts = np.cumsum(np.insert(known, 0, False))
+        with np.errstate(invalid="ignore"):
+            return (sums[window:] - sums[:-window]) / (
+                counts[window:] - counts[:-window]
+            )
+
+    def pct_change(self, code: str, periods: int = 1, start=None, end=None):
+        """
+        Изменение курса в процентах за periods дней; значение i — от дня i к
+        дню i + periods. Пары, где курс одного из дней неизвестен, не
+        считаются и дают NaN.
+        """
+        values = self.series(code, start, end)
+        before, after = values[:-periods], values[periods:]
+        known = ~np.isnan(before) & ~np.isnan(after)
+        changes = np.full(len(after), np.nan)
+        changes[known] = (after[known] / before[known] - 1) * 100
+        return changes
+
+    def cross_rate(self, base: str, quote: str, start=None, end=None):
+        """Сколько единиц quote стоит единица base (через рубль)."""
+        return self.series(base, start, end) / self.series(quote, start, end)
+
+    def extremes(
+        self, code: str, start=None, end=None
+    ) -> Optional[Tuple[tuple, tuple]]:
+        """
+        ((минимум, дата), (максимум, дата)) за окно [start, end]; None, если
+        в окне нет ни одного известного курса.
+        """
+        values = self.series(code, start, end)
+        if np.isnan(values).all():
+            return None
+        offset = self._rows(start, end)[0]
+        low, high = np.nanargmin(values), np.nanargmax(values)
+        return (
+            (values[low], self.start + timedelta(days=int(offset + low))),
+            (values[high], self.start + timedelta(days=int(offset + high))),
+        )
+
+    def rolling_extremes(self, code: str, window: int, start=None, end=None):
+        """
+        Минимум и максимум в каждом скользящем окне из window дней по дням с
+        известным курсом; окно совсем без данных даёт NaN.
+        """
+        values = self.series(code, start, end)
+        known = ~np.isnan(values)
+        # Неизвестные дни не могут быть ни минимумом, ни максимумом окна
+        lows = sliding_window_view(np.where(known, values, np.inf), window)
+        highs = sliding_window_view(np.where(known, values, -np.inf), window)
+        empty = ~sliding_window_view(known, window).any(axis=1)
+        low, high = lows.min(axis=1), highs.max(axis=1)
+        low[empty] = high[empty] = np.nan
+        return low, high
+
+
+def _forward_fill(data: np.ndarray) -> np.ndarray:
+    """Заполняет NaN последним известным значением столбца (векторно)."""
+    rows = np.arange(len(data))[:, None]
+    last = np.where(np.isnan(data), 0, rows)
+    np.maximum.accumulate(last, axis=0, out=last)
+    # До первого известного значения остаётся NaN: last указывает на строку 0
+    return data[last, np.arange(data.shape[1])]
+
+
+currency_series = CurrencySeries()
+
+
+def report(query: str = "") -> str:
+    """
+    Ответ на запрос вида "USD", "EUR/USD" или "CNY 90" (окно в днях).
+    Без запроса — сводка по всем валютам хранилища.
+    """
+    today = datetime.now(CBR_TIMEZONE).date()
+    if not currency_series.open():
+        first = today - timedelta(days=365 * BACKFILL_YEARS)
+        if not currency_series.backfill(first, today):
+            return "Не удалось загрузить курсы ЦБ РФ, попробуйте позже."
+    elif currency_series.start + timedelta(days=len(currency_series.data)) <= today:
+        currency_series.backfill(today, today)
+
+    parts = query.upper().split()
+    window = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else REPORT_WINDOW
+    pairs = [parts[0]] if parts else currency_series.currencies
+    start = today - timedelta(days=window)
+
+    # Валюту, которой ещё нет в хранилище, но которую знает ЦБ, догружаем
+    known = rate_service.daily()
+    requested = {code for pair in pairs for code in pair.split("/")}
+    new_codes = [
+        code
+        for code in sorted(requested - set(currency_series.currencies) - {"RUB"})
+        if known is not None and code in known.ids
+    ]
+    if new_codes:
+        currency_series.backfill(currency_series.start, today, new_codes)
+
+    lines = [f"Курсы ЦБ РФ на {today:%d.%m.%Y}, окно {window} дн.:"]
+    for pair in pairs:
+        base, _, quote = pair.partition("/")
+        quote = quote or "RUB"
+        try:
+            rates = currency_series.cross_rate(base, quote, start, today)
+            if np.isnan(rates).all():
+                # За окно нет ни одного курса (например, прошлая загрузка
+                # не удалась) — пробуем загрузить его снова
+                codes = [code for code in (base, quote) if code != "RUB"]
+                if currency_series.backfill(start, today, codes):
+                    rates = currency_series.cross_rate(base, quote, start, today)
+        except KeyError as e:
+            lines.append(str(e.args[0]))
+            continue
+        rates = rates[~np.isnan(rates)]
+        if not len(rates):
+            lines.append(f"{base}/{quote}: нет данных")
+            continue
+        average = rates.mean()
+        change = (rates[-1] / rates[0] - 1) * 100
+        lines.append(
+            f"{base}/{quote}: {rates[-1]:.4f}, среднее {average:.4f}, "
+            f"изменение {change:+.2f}%, мин {rates.min():.4f}, "
+            f"макс {rates.max():.4f}"
+        )
+    return "\n".join(lines)
+
+
+def main(query: str = ""):
+    return report(query)
+
+
+if __name__ == "__main__":
+    print(main(" ".join(sys.argv[1:])))
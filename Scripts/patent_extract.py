@@ -0,0 +1,116 @@
+import re
+from html.parser import HTMLParser
+from typing import List, Optional
+
+NOT_FOUND = "Не найден текст в указанном div."
+
+# Содержимое этих тегов — код, а не текст: в аннотацию не попадает
+SKIPPED_TAGS = {"script", "style"}
+
+# Переводы строк, табуляции, неразрывные и нулевой ширины пробелы и их
+# серии заменяются одним пробелом за один проход
+WHITESPACE = re.compile(r"[ \n\r\t\xa0\u200b]+")
+
+
+def normalize_whitespace(text: str) -> str:
+    return WHITESPACE.sub(" ", text).strip()
+
+
+class AbstractExtractor(HTMLParser):
+    """
+    Потоковое (SAX) извлечение текста первого div.abstract без построения
+    дерева документа.
+
+    Страница подаётся кусками через feed(); как только блок закрылся,
+    done становится True и остаток страницы можно не читать и не
+    разбирать. Текст собирается так же, как BeautifulSoup get_text(" "):
+    текстовые узлы блока через пробел; комментарии и инструкции обработки
+    разделяют узлы, но в текст не входят, CDATA — отдельный узел,
+    содержимое script и style пропускается.
+    """
+
+    def __init__(self, class_name: str = "abstract"):
+        super().__init__(convert_charrefs=True)
+        self.class_name = class_name
+        self.done = False
+        self.found = False
+        self._depth = 0
+        self._parts: List[str] = []
+        self._node: List[str] = []
+        self._skipped: Optional[str] = None
+
+    def _flush_node(self):
+        if self._node:
+            self._parts.append("".join(self._node))
+            self._node = []
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        if self._depth:
+            self._flush_node()
+            if tag in SKIPPED_TAGS:
+                self._skipped = tag
+            elif tag == "div":
+                self._depth += 1
+        elif tag == "div":
+            classes = (dict(attrs).get("class") or "").split()
+            if self.class_name in classes:
+                self.found = True
+                self._depth = 1
+
+    def handle_startendtag(self, tag, attrs):
+        # <div/> не открывает блок, а внутри блока только разделяет текст
+        if self._depth and not self.done:
+            self._flush_node()
+
+    def handle_endtag(self, tag):
+        if not self._depth or self.done:
+            return
+        self._flush_node()
+        if tag == self._skipped:
+            self._skipped = None
+        elif tag == "div":
+            self._depth -= 1
+            if self._depth == 0:
+                self.done = True
+
+    def handle_data(self, data):
+        # Текстовый узел может прийти несколькими кусками — склеиваем их
+        if self._depth and not self.done and not self._skipped:
+            self._node.append(data)
+
+    def handle_comment(self, data):
+        if self._depth and not self.done:
+            self._flush_node()
+
+    def handle_pi(self, data):
+        if self._depth and not self.done:
+            self._flush_node()
+
+    def unknown_decl(self, data):
+        # <![CDATA[...]]> — отдельный текстовый узел, как у BeautifulSoup
+        if self._depth and not self.done:
+            self._flush_node()
+            if data.startswith("CDATA["):
+                self._parts.append(data[len("CDATA[") :])
+
+    def text(self) -> Optional[str]:
+        """Нормализованный текст блока или None, если блок не найден."""
+        if not self.found:
+            return None
+        self._flush_node()
+        return normalize_whitespace(" ".join(self._parts))
+
+
+def extract_abstract(html: str, chunk_size: int = 16 * 1024) -> str:
+    """Текст div.abstract страницы; разбор останавливается на конце блока."""
+    extractor = AbstractExtractor()
+    for start in range(0, len(html), chunk_size):
+        extractor.feed(html[start : start + chunk_size])
+        if extractor.done:
+            break
+    else:
+        extractor.close()
+    text = extractor.text()
+    return NOT_FOUND if text is None else text
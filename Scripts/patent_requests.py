@@ -1,6 +1,33 @@
-import requests
-from bs4 import BeautifulSoup
+import os
 import re
+import sys
+import codecs
+import time
+import random
+import sqlite3
+import asyncio
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from patent_extract import NOT_FOUND, AbstractExtractor
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+LINKS_FILE = os.path.join(BASE_DIR, "links.txt")
+OUTPUT_DB = os.path.join(BASE_DIR, "patents.db")
+
+HOST_CONCURRENCY = 4  # одновременных запросов к одному хосту
+HOST_INTERVAL = 0.5  # секунд между началами запросов к одному хосту
+RETRIES = 3
+BACKOFF = 1.0
+REQUEST_TIMEOUT = 30
+CHUNK_SIZE = 16 * 1024
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+headers = {"User-Agent": "Mozilla/5.0"}
 
 
 def read_links_from_file(filename):
@@ -13,51 +40,192 @@ def read_links_from_file(filename):
     return links
 
 
-# Пример использования:
-filename = "links.txt"  # замени на имя твоего файла
-links = read_links_from_file(filename)
-
-
-headers = {"User-Agent": "Mozilla/5.0"}
-
-# for i, link in enumerate(links, start=1):
-#     try:
-#         response = requests.get(link, headers=headers, timeout=10)
-#         response.raise_for_status()
-
-#         # Явно указываем кодировку UTF-8
-#         response.encoding = "utf-8"
-
-#         soup = BeautifulSoup(response.text, "html.parser")
-
-#         # Ищем нужный div
-#         abstract_div = soup.find("div", class_="abstract")
-
-#         if abstract_div:
-#             text = abstract_div.get_text(" ")
-#             text = re.sub(r"[\n\r\t\xa0\u200b]", " ", text)
-#             text = re.sub(r" +", " ", text)
-#             text = text.strip()
-#         else:
-#             text = "Не найден текст в указанном div."
-
-#     except Exception as e:
-#         text = f"Ошибка: {e}"
-
-#     print(f"Ссылка {i}: {link}")
-#     print(text)
-#     print("")
-# print("-" * 80)
-
-# Сохраняем в файл
-#     filename = f"doc{i}.txt"
-#     with open(filename, "w", encoding="utf-8") as file:
-#         file.write(text)
-
-# print("=" * 80)
-
-for i, link in enumerate(links, start=1):
-
-    print(f"Патент {i}: {link}")
-    print("")
-    print("")
+class PatentStore:
+    """Результаты в одной базе SQLite вместо файла doc{i}.txt на патент."""
+
+    def __init__(self, path: str = OUTPUT_DB):
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS patents ("
+            " url TEXT PRIMARY KEY,"
+            " number TEXT,"
+            " abstract TEXT,"
+            " error TEXT,"
+            " fetched_at REAL NOT NULL)"
+        )
+        self.connection.commit()
+
+    def done(self) -> set:
+        """
+        Ссылки, аннотации которых уже получены. Страницы без аннотации
+        (NOT_FOUND, в том числе записанные прежними версиями как аннотация)
+        не считаются полученными и загружаются снова.
+        """
+        rows = self.connection.execute(
+            "SELECT url FROM patents WHERE error IS NULL AND abstract IS NOT ?",
+            (NOT_FOUND,),
+        ).fetchall()
+        return {url for (url,) in rows}
+
+    def save(self, url: str, abstract: Optional[str], error: Optional[str] = None):
+        """Сохраняет результат; страница без аннотации записывается как ошибка."""
+        if abstract == NOT_FOUND:
+            abstract, error = None, error or NOT_FOUND
+        self.connection.execute(
+            "INSERT OR REPLACE INTO patents (url, number, abstract, error, fetched_at)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (url, patent_number(url), abstract, error, time.time()),
+        )
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+
+def patent_number(url: str) -> str:
+    match = re.search(r"/patent/([^/]+)", url)
+    return match.group(1) if match else url
+
+
+class HostLimiter:
+    """Ограничение на хост: не больше concurrency запросов и пауза между ними."""
+
+    def __init__(self, concurrency: int, interval: float):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.interval = interval
+        self._lock = asyncio.Lock()
+        self._next_start = 0.0
+
+    async def __aenter__(self):
+        await self.semaphore.acquire()
+        try:
+            async with self._lock:
+                loop = asyncio.get_running_loop()
+                delay = self._next_start - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                self._next_start = max(loop.time(), self._next_start) + self.interval
+        except BaseException:
+            # Задачу отменили во время паузы: __aexit__ не вызовется,
+            # слот хоста освобождаем здесь
+            self.semaphore.release()
+            raise
+
+    async def __aexit__(self, *exc):
+        self.semaphore.release()
+
+
+class PatentFetcher:
+    """
+    Параллельная загрузка аннотаций патентов.
+
+    Один пул соединений на все запросы, отдельный лимит и пауза на каждый
+    хост, повторы с экспоненциальной паузой при сетевых ошибках и 429/5xx
+    (с учётом Retry-After). Страница читается потоком и только до конца
+    блока div.abstract (см. patent_extract) — остаток не загружается.
+    """
+
+    def __init__(
+        self,
+        host_concurrency: int = HOST_CONCURRENCY,
+        host_interval: float = HOST_INTERVAL,
+        retries: int = RETRIES,
+        backoff: float = BACKOFF,
+    ):
+        self.host_concurrency = host_concurrency
+        self.host_interval = host_interval
+        self.retries = retries
+        self.backoff = backoff
+        self._limiters: Dict[str, HostLimiter] = {}
+        self.bytes_read = 0
+
+    def _limiter(self, url: str) -> HostLimiter:
+        host = urlsplit(url).netloc
+        if host not in self._limiters:
+            self._limiters[host] = HostLimiter(
+                self.host_concurrency, self.host_interval
+            )
+        return self._limiters[host]
+
+    async def _read_abstract(self, response: aiohttp.ClientResponse) -> str:
+        """Разбирает страницу по мере чтения и перестаёт читать после div.abstract."""
+        extractor = AbstractExtractor()
+        # Явно указываем кодировку UTF-8
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+            self.bytes_read += len(chunk)
+            extractor.feed(decoder.decode(chunk))
+            if extractor.done:
+                break
+        else:
+            extractor.feed(decoder.decode(b"", final=True))
+            extractor.close()
+        text = extractor.text()
+        return NOT_FOUND if text is None else text
+
+    async def fetch(self, session: aiohttp.ClientSession, url: str) -> str:
+        limiter = self._limiter(url)
+        for attempt in range(self.retries + 1):
+            retry_after = None
+            try:
+                async with limiter:
+                    async with session.get(url, headers=headers) as response:
+                        if response.status in RETRY_STATUSES:
+                            retry_after = response.headers.get("Retry-After")
+                            raise aiohttp.ClientResponseError(
+                                response.request_info,
+                                response.history,
+                                status=response.status,
+                            )
+                        response.raise_for_status()
+                        return await self._read_abstract(response)
+            except aiohttp.ClientResponseError as e:
+                if e.status not in RETRY_STATUSES or attempt == self.retries:
+                    raise
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if attempt == self.retries:
+                    raise
+            delay = self.backoff * 2**attempt
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, float(retry_after))
+            await asyncio.sleep(delay + random.uniform(0, delay / 2))
+
+    async def fetch_all(self, links: List[str], store: PatentStore):
+        connector = aiohttp.TCPConnector(limit=0, ttl_dns_cache=300)
+        timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+        async with aiohttp.ClientSession(
+            connector=connector, timeout=timeout
+        ) as session:
+
+            async def one(i: int, link: str):
+                try:
+                    text = await self.fetch(session, link)
+                    store.save(link, text)
+                except Exception as e:
+                    text = f"Ошибка: {e}"
+                    store.save(link, None, text)
+                print(f"Патент {i}: {link}")
+                print(text)
+                print("")
+
+            await asyncio.gather(
+                *(one(i, link) for i, link in enumerate(links, start=1))
+            )
+
+
+def main(filename: str = LINKS_FILE, output: str = OUTPUT_DB):
+    links = read_links_from_file(filename)
+    store = PatentStore(output)
+    try:
+        # Уже полученные аннотации повторно не загружаются
+        done = store.done()
+        pending = [link for link in links if link not in done]
+        print(f"Ссылок: {len(links)}, к загрузке: {len(pending)}")
+        asyncio.run(PatentFetcher().fetch_all(pending, store))
+    finally:
+        store.close()
+    return output
+
+
+if __name__ == "__main__":
+    main()